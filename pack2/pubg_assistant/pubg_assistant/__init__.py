@@ -5,12 +5,22 @@
 PUBG Assistant 包
 """
 
-from pubg_assistant.config.resolution_config import ResolutionConfig
-from pubg_assistant.config.config_manager import ConfigManager
-from pubg_assistant.managers.ui_manager import UIManager, CharacterDisplayApp
-from pubg_assistant.managers.input_manager import InputManager, Action
-from pubg_assistant.processors.image_processor import ImageProcessor
-from pubg_assistant.processors.action_processor import ActionProcessor
-from pubg_assistant.monitors.posture_monitor import PostureMonitor
+from pubg_assistant import _lazy
 
-__version__ = '1.0.0' 
\ No newline at end of file
+_LAZY_ATTRS = {
+    'ResolutionConfig': 'pubg_assistant.config.resolution_config',
+    'ConfigManager': 'pubg_assistant.config.config_manager',
+    'UIManager': 'pubg_assistant.managers.ui_manager',
+    'CharacterDisplayApp': 'pubg_assistant.managers.ui_manager',
+    'NullUIManager': 'pubg_assistant.managers.null_ui_manager',
+    'InputManager': 'pubg_assistant.managers.input_manager',
+    'Action': 'pubg_assistant.managers.input_manager',
+    'StateStore': 'pubg_assistant.managers.state_store',
+    'ImageProcessor': 'pubg_assistant.processors.image_processor',
+    'ActionProcessor': 'pubg_assistant.processors.action_processor',
+    'PostureMonitor': 'pubg_assistant.monitors.posture_monitor',
+}
+
+_lazy.install(globals(), _LAZY_ATTRS)
+
+__version__ = '1.0.0'
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+延迟导入模块
+为各子包安装 PEP 562 的 __getattr__ 和 __dir__，导入包时不加载子模块及其重量级依赖
+"""
+
+import importlib
+
+def install(namespace, mapping):
+    """在包的命名空间中安装按需导入的 __getattr__ 和 __dir__
+
+    Args:
+        namespace: 包的 globals()
+        mapping: {属性名: 定义该属性的模块路径}
+    """
+    package = namespace["__name__"]
+
+    def __getattr__(name):
+        """按需导入子模块中的类，导入后缓存到包的命名空间"""
+        module_path = mapping.get(name)
+        if module_path is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_path), name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        """列出包属性，包含尚未导入的类"""
+        return sorted(set(namespace) | set(mapping))
+
+    namespace["__getattr__"] = __getattr__
+    namespace["__dir__"] = __dir__
@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark suite for PUBG Assistant
+"""
+
+# 基准测试模块初始化文件，各基准通过 python -m pubg_assistant.benchmarks.<name> 运行
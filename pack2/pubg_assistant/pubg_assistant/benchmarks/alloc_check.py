@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+内存分配检查模块
+用 tracemalloc 统计稳定运行后每次 detect_weapon 新分配的内存，超过预算时返回非零退出码
+
+用法:
+    python -m pubg_assistant.benchmarks.alloc_check [--engines template cascade] [--budget-kb 16]
+"""
+
+import sys
+import argparse
+import tracemalloc
+
+import cv2 as cv
+
+from pubg_assistant.config.resolution_config import ResolutionConfig
+from pubg_assistant.processors.frame_source import ReplayFrameSource
+from pubg_assistant.processors.image_processor import ImageProcessor
+
+def build_processor(frames_dir=None):
+    """创建使用回放帧的图像处理器
+
+    Args:
+        frames_dir: 回放帧目录，为空时用模板库中的第一个模板作为截图
+
+    Returns:
+        ImageProcessor: 图像处理器
+    """
+    if frames_dir:
+        frame_source = ReplayFrameSource.from_directory(frames_dir)
+    else:
+        frame_source = ReplayFrameSource()
+    image_processor = ImageProcessor(ResolutionConfig(), frame_source=frame_source)
+    image_processor.swap_delay = 0
+    image_processor.retry_delay = 0
+    if not frames_dir:
+        bank = image_processor.gun_img_dict
+        if not bank:
+            raise LookupError("模板库为空，请用 --frames 指定回放帧")
+        template = bank[sorted(bank)[0]]
+        frame_source.add_frames(None, [ReplayFrameSource.frame_from_array(cv.cvtColor(template, cv.COLOR_GRAY2BGRA))])
+    return image_processor
+
+def measure(image_processor, engine, iterations=200, warmup=20):
+    """统计稳定运行后的内存分配
+
+    Args:
+        image_processor: 图像处理器
+        engine: 识别引擎名称
+        iterations: 统计的识别次数
+        warmup: 统计前的预热次数，用于分配缓冲区和模板缓存
+
+    Returns:
+        dict: 每次识别的平均净分配字节数及统计期间的分配峰值
+    """
+    image_processor.recognizers.set_active(engine)
+    for _ in range(warmup):
+        image_processor.detect_weapon(1)
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(iterations):
+            image_processor.detect_weapon(1)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "engine": engine,
+        "net_bytes_per_detection": (current - baseline) / iterations,
+        "peak_bytes": peak - baseline,
+    }
+
+def main(argv=None):
+    """命令行入口
+
+    Args:
+        argv: 命令行参数
+
+    Returns:
+        int: 退出码，超过预算时为1
+    """
+    parser = argparse.ArgumentParser(description="检查识别热路径的内存分配")
+    parser.add_argument("--frames", default=None, help="回放帧目录")
+    parser.add_argument("--engines", nargs="+", default=["template", "cascade"], help="需要检查的识别引擎")
+    parser.add_argument("--iterations", type=int, default=200, help="统计的识别次数")
+    parser.add_argument("--budget-kb", type=float, default=16, help="统计期间允许的分配峰值（KB）")
+    args = parser.parse_args(argv)
+
+    image_processor = build_processor(args.frames)
+    failed = False
+    for engine in args.engines:
+        result = measure(image_processor, engine, args.iterations)
+        over = result["peak_bytes"] > args.budget_kb * 1024
+        failed = failed or over
+        print(f"{engine}: 每次净分配 {result['net_bytes_per_detection']:.1f} B, "
+              f"分配峰值 {result['peak_bytes'] / 1024:.1f} KB{' 超出预算' if over else ''}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
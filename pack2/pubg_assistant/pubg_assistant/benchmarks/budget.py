@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+资源预算基准模块
+用回放压测驱动完整处理流程，统计每个动作消耗的CPU时间和峰值常驻内存，超出预算时返回非零退出码
+
+用法:
+    python -m pubg_assistant.benchmarks.budget --frames DIR [--cpu-ms-per-action 5] [--rss-mb 300]
+"""
+
+import sys
+import argparse
+
+from pubg_assistant.managers.input_recorder import InputReplayer
+from pubg_assistant.processors.frame_source import ReplayFrameSource
+from pubg_assistant.monitors.resource_monitor import ResourceMonitor
+from pubg_assistant.benchmarks import replay_load
+
+def measure(events, frame_source):
+    """回放事件并统计资源占用
+
+    Args:
+        events: 事件列表
+        frame_source: 帧来源
+
+    Returns:
+        dict: 处理的动作数、每个动作的CPU毫秒数、峰值常驻内存及压测结果
+    """
+    result = replay_load.run(events, frame_source)
+    processed = max(1, result["processed"])
+    return {
+        "processed": result["processed"],
+        "cpu_ms_per_action": round(result["cpu_s"] * 1000 / processed, 3),  # 不含流程搭建的启动开销
+        "rss_mb": ResourceMonitor.read_rss_mb(),
+        "replay": result,
+    }
+
+def main(argv=None):
+    """命令行入口
+
+    Args:
+        argv: 命令行参数
+
+    Returns:
+        int: 退出码，超出预算时为1
+    """
+    parser = argparse.ArgumentParser(description="检查处理流程的CPU和内存预算")
+    parser.add_argument("--frames", required=True, help="回放帧目录（PNG截图）")
+    parser.add_argument("--mash", type=int, default=200, help="合成按键次数")
+    parser.add_argument("--cpu-ms-per-action", type=float, default=5.0, help="每个动作的CPU时间预算（毫秒）")
+    parser.add_argument("--rss-mb", type=float, default=300.0, help="常驻内存预算（MB）")
+    args = parser.parse_args(argv)
+
+    events = InputReplayer.key_mash(count=args.mash, interval=0)
+    result = measure(events, ReplayFrameSource.from_directory(args.frames))
+    failed = []
+    if result["cpu_ms_per_action"] > args.cpu_ms_per_action:
+        failed.append(f"CPU {result['cpu_ms_per_action']}ms/动作 > {args.cpu_ms_per_action}ms")
+    if result["rss_mb"] is not None and result["rss_mb"] > args.rss_mb:
+        failed.append(f"内存 {result['rss_mb']:.1f}MB > {args.rss_mb}MB")
+    print(f"完成 {result['processed']} 个动作, CPU {result['cpu_ms_per_action']}ms/动作, "
+          f"常驻内存 {result['rss_mb']}MB")
+    for message in failed:
+        print(f"超出预算: {message}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+回放压测基准模块
+在无界面、无真实输入的情况下，把录制的或合成的按键序列回放到完整的 ActionProcessor 流程，
+截图由回放帧来源提供，统计吞吐量和按键到配置写入的尾延迟
+
+用法:
+    python -m pubg_assistant.benchmarks.replay_load --frames DIR [--events FILE | --mash 200 --interval 10] [--speed 0]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import os
+
+from pubg_assistant.config.resolution_config import ResolutionConfig
+from pubg_assistant.config.config_manager import ConfigManager
+from pubg_assistant.managers.state_store import StateStore
+from pubg_assistant.managers.null_ui_manager import NullUIManager
+from pubg_assistant.managers.input_manager import InputManager
+from pubg_assistant.managers.input_recorder import InputReplayer
+from pubg_assistant.processors.frame_source import ReplayFrameSource
+from pubg_assistant.processors.image_processor import ImageProcessor
+from pubg_assistant.processors.action_processor import ActionProcessor
+from pubg_assistant.metrics.tracing import TraceCollector
+
+def build_pipeline(frame_source, config_dir, trace_collector, swap_delay=0.0, retry_delay=0.0):
+    """搭建无界面的完整处理流程
+
+    Args:
+        frame_source: 帧来源
+        config_dir: 配置文件输出目录
+        trace_collector: 追踪汇总器
+        swap_delay: 切枪等待时间（秒）
+        retry_delay: 识别重试等待时间（秒）
+
+    Returns:
+        tuple: (InputManager, ActionProcessor)
+    """
+    resolution_config = ResolutionConfig()
+    config_manager = ConfigManager(config_dir=config_dir)
+    image_processor = ImageProcessor(resolution_config, frame_source=frame_source)
+    image_processor.swap_delay = swap_delay
+    image_processor.retry_delay = retry_delay
+
+    action_processor = ActionProcessor(image_processor, config_manager, NullUIManager(log=False), StateStore())
+    action_processor.trace_collector = trace_collector
+
+    input_manager = InputManager()
+    input_manager.trace_collector = trace_collector
+    input_manager.set_action_processor(action_processor)
+    input_manager.start(listen=False)
+    return input_manager, action_processor
+
+def run(events, frame_source, speed=0.0, swap_delay=0.0, retry_delay=0.0):
+    """回放事件并统计吞吐量和延迟
+
+    Args:
+        events: 事件列表 [(相对时间秒, Action), ...]
+        frame_source: 帧来源
+        speed: 回放速度倍数，0表示尽快回放
+        swap_delay: 切枪等待时间（秒）
+        retry_delay: 识别重试等待时间（秒）
+
+    Returns:
+        dict: 压测结果
+    """
+    work_dir = tempfile.mkdtemp(prefix="pubg_replay_")
+    trace_collector = TraceCollector(enabled=True, trace_path=os.path.join(work_dir, "traces.jsonl"))
+    input_manager, _ = build_pipeline(frame_source, work_dir, trace_collector, swap_delay, retry_delay)
+
+    # 计时从流程搭建完成后开始，不包含模板加载等启动开销
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    InputReplayer(input_manager, events, speed).replay()
+    input_manager.action_queue.join()
+    elapsed = time.perf_counter() - start
+    cpu_seconds = time.process_time() - cpu_start
+    input_manager.stop()
+    trace_collector.close()
+
+    latency = {row["name"]: row for row in trace_collector.summary()}
+    processed = sum(row["count"] for name, row in latency.items()
+                    if name.startswith("total.") and name not in ("total.dropped", "total.error"))
+    return {
+        "events": len(events),
+        "processed": processed,
+        "dropped": latency.get("total.dropped", {}).get("count", 0),
+        "errors": latency.get("total.error", {}).get("count", 0),
+        "elapsed_s": round(elapsed, 3),
+        "cpu_s": round(cpu_seconds, 4),
+        "throughput_per_s": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency": latency,
+        "work_dir": work_dir,
+    }
+
+def main(argv=None):
+    """运行回放压测
+
+    Args:
+        argv: 命令行参数列表
+
+    Returns:
+        int: 返回码
+    """
+    parser = argparse.ArgumentParser(description="PUBG Assistant 回放压测")
+    parser.add_argument("--frames", required=True, help="回放帧目录（PNG截图）")
+    parser.add_argument("--events", default=None, help="录制的输入文件（--record 生成），为空时合成连续按键")
+    parser.add_argument("--mash", type=int, default=200, help="合成按键次数")
+    parser.add_argument("--interval", type=float, default=10, help="合成按键间隔（毫秒）")
+    parser.add_argument("--speed", type=float, default=0, help="回放速度倍数，0为尽快回放")
+    parser.add_argument("--swap-delay", type=float, default=0, help="切枪等待时间（秒）")
+    parser.add_argument("--retry-delay", type=float, default=0, help="识别重试等待时间（秒）")
+    args = parser.parse_args(argv)
+
+    if args.events:
+        events = InputReplayer.load(args.events)
+    else:
+        events = InputReplayer.key_mash(count=args.mash, interval=args.interval / 1000)
+
+    result = run(events, ReplayFrameSource.from_directory(args.frames),
+                 args.speed, args.swap_delay, args.retry_delay)
+    print(f"事件 {result['events']}, 完成 {result['processed']}, 丢弃 {result['dropped']}, 失败 {result['errors']}, "
+          f"耗时 {result['elapsed_s']}s, 吞吐 {result['throughput_per_s']}/s")
+    for name, row in sorted(result["latency"].items()):
+        print(f"  {name}: p50 {row['p50_ms']}ms, p90 {row['p90_ms']}ms, p99 {row['p99_ms']}ms, max {row['max_ms']}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时基准模块
+使用 -X importtime 统计各模块导入耗时，并测量 main() 初始化完成所需时间
+
+用法:
+    python -m pubg_assistant.benchmarks.startup [--top 15] [--budget-ms 1500]
+"""
+
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+READY_LINE = re.compile(r"启动耗时: ([\d.]+)ms")
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出
+
+    Args:
+        stderr: 子进程标准错误输出
+
+    Returns:
+        list: [(模块名, 自身耗时us, 累计耗时us, 嵌套深度), ...]
+    """
+    records = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+def measure_import(module, python=sys.executable):
+    """测量导入模块的耗时
+
+    Args:
+        module: 模块名
+        python: Python解释器路径
+
+    Returns:
+        tuple: (导入记录，格式同 parse_importtime, 返回码)
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    return parse_importtime(result.stderr), result.returncode
+
+def measure_time_to_ready(python=sys.executable):
+    """测量 main() 从进程启动到初始化完成的耗时（无界面模式）
+
+    Args:
+        python: Python解释器路径
+
+    Returns:
+        tuple: (进程总耗时ms, main()自报的启动耗时ms或None, 返回码)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python, "-m", "pubg_assistant.main", "--headless", "--exit-after-ready"],
+        capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    match = READY_LINE.search(result.stdout)
+    ready_ms = float(match.group(1)) if match else None
+    return wall_ms, ready_ms, result.returncode
+
+def print_report(title, records, top):
+    """打印导入耗时报告
+
+    Args:
+        title: 报告标题
+        records: 导入记录
+        top: 显示最慢的前N个模块
+    """
+    total_us = sum(record[2] for record in records if record[3] == 0)
+    print(f"== {title}: 共 {len(records)} 个模块, 累计 {total_us / 1000:.1f}ms")
+    for name, self_us, cumulative_us, _ in sorted(records, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f}ms (累计 {cumulative_us / 1000:8.1f}ms)  {name}")
+
+def main(argv=None):
+    """运行启动耗时基准
+
+    Args:
+        argv: 命令行参数列表
+
+    Returns:
+        int: 返回码，超出预算时为1
+    """
+    parser = argparse.ArgumentParser(description="PUBG Assistant 启动耗时基准")
+    parser.add_argument("--top", type=int, default=15, help="显示最慢的前N个模块")
+    parser.add_argument("--budget-ms", type=float, default=None, help="启动耗时预算，超出时返回失败")
+    args = parser.parse_args(argv)
+
+    for module in ("pubg_assistant", "pubg_assistant.main"):
+        records, returncode = measure_import(module)
+        print_report(f"import {module}", records, args.top)
+        if returncode != 0:
+            print(f"  导入 {module} 失败，返回码 {returncode}")
+
+    wall_ms, ready_ms, returncode = measure_time_to_ready()
+    ready_text = f"{ready_ms:.1f}ms" if ready_ms is not None else "未知"
+    print(f"== main() 启动: 进程总耗时 {wall_ms:.1f}ms, 初始化耗时 {ready_text}, 返回码 {returncode}")
+
+    if args.budget_ms is not None and (returncode != 0 or wall_ms > args.budget_ms):
+        print(f"启动失败或耗时超出预算 {args.budget_ms:.1f}ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+识别阈值调参模块
+用带标注的截图数据集（DatasetWriter 录制）对每个识别引擎打分，
+在达到目标准确率的前提下选出期望决策耗时最短的阈值，按分辨率写入 resources/thresholds.json
+
+每张截图的得分和耗时只测量一次，之后对全部候选阈值离线模拟：
+- 期望耗时 = 识别耗时 + 未达到 min_score 的概率 * (重试等待 + 再识别一次)
+- 准确率 = 被确认的结果中与标注一致的比例，错误确认比重试代价更大
+
+标注取索引记录的 label 字段，没有时使用录制时的识别结果 id（可先手工修正 index.jsonl）；
+与 ImageProcessor.classify_roi 一样，标注和识别结果都按武器ID比较，同一武器的不同模板视为一致
+
+用法:
+    python -m pubg_assistant.benchmarks.tune_thresholds --corpus DIR [--resolution 2560x1440] [--target 0.99]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import cv2 as cv
+
+from pubg_assistant.config.resolution_config import ResolutionConfig
+from pubg_assistant.config.roi_calibration import RoiCalibrator
+from pubg_assistant.processors.bank_optimizer import BankOptimizer
+from pubg_assistant.processors.dataset_writer import DatasetWriter
+from pubg_assistant.processors.image_processor import ImageProcessor
+
+def load_corpus(directory):
+    """读取带标注的截图数据集
+
+    Args:
+        directory: 数据集目录
+
+    Returns:
+        tuple: (标注数组, RGB截图列表)，没有标注的截图被跳过
+    """
+    labels, rois = [], []
+    for entry, frame in DatasetWriter.read(directory):
+        label = entry.get("label", entry.get("id", ""))
+        if not label:
+            continue
+        labels.append(BankOptimizer.gun_id_of(str(label)))
+        rois.append(cv.cvtColor(frame, cv.COLOR_BGRA2RGB))
+    return np.array(labels), rois
+
+def evaluate(labels, predicted, scores, seconds, min_score, retry_delay):
+    """评估一组阈值下的准确率和期望决策耗时
+
+    Args:
+        labels: 标注数组
+        predicted: 识别结果数组
+        scores: 最佳得分数组
+        seconds: 识别耗时数组（秒）
+        min_score: 认为识别成功的最低得分
+        retry_delay: 识别失败后重试前的等待时间（秒）
+
+    Returns:
+        dict: 准确率、召回率、确认比例和期望耗时（毫秒）
+    """
+    accepted = scores >= min_score
+    correct = accepted & (predicted == labels)
+    accepted_count = int(accepted.sum())
+    expected = seconds + np.where(accepted, 0.0, retry_delay + seconds)
+    return {
+        "precision": round(float(correct.sum()) / accepted_count, 4) if accepted_count else 0.0,
+        "recall": round(float(correct.sum()) / len(labels), 4),
+        "accepted": round(accepted_count / len(labels), 4),
+        "expected_ms": round(float(expected.mean()) * 1000, 3),
+    }
+
+def choose(results, target):
+    """在达到目标准确率的结果中选择期望耗时最短的一组阈值
+
+    Args:
+        results: [(阈值, 评估结果), ...]
+        target: 目标准确率
+
+    Returns:
+        tuple: (阈值, 评估结果)，没有结果达到目标时选择准确率最高的，评估结果的 met 为False；
+            没有候选阈值（例如得分全为0）时阈值为None
+    """
+    if not results:
+        return None, {"met": False}
+    passing = [item for item in results if item[1]["precision"] >= target]
+    if passing:
+        params, metrics = min(passing, key=lambda item: (item[1]["expected_ms"], -item[1]["recall"]))
+        return params, dict(metrics, met=True)
+    params, metrics = max(results, key=lambda item: (item[1]["precision"], -item[1]["expected_ms"]))
+    return params, dict(metrics, met=False)
+
+def score_grid(scores, limit=64):
+    """从观测到的得分中选出候选阈值
+
+    Args:
+        scores: 得分数组
+        limit: 最多保留的候选个数，超出时按分位数抽取
+
+    Returns:
+        list: 升序的候选阈值
+    """
+    values = np.unique(scores[scores > 0]).astype(int)
+    if len(values) > limit:
+        values = np.unique(np.quantile(values, np.linspace(0, 1, limit)).astype(int))
+    return [int(value) for value in values]
+
+def tune_sequential(recognizer, labels, rois, retry_delay, target, repeat=3):
+    """为逐个比较模板的引擎（ORB）调整 accept_score 和 min_score
+
+    每张截图按模板库顺序记录每个模板的得分和耗时，提前确认只是在此顺序上截断
+
+    Args:
+        recognizer: 识别引擎
+        labels: 标注数组
+        rois: 截图列表
+        retry_delay: 重试等待时间（秒）
+        target: 目标准确率
+        repeat: 重复测量次数，耗时取最小值
+
+    Returns:
+        dict: {params, metrics, baseline}
+    """
+    gun_ids = list(recognizer.bank)
+    count = len(gun_ids)
+    scores = np.zeros((len(rois), count), dtype=np.int32)
+    seconds = np.full((len(rois), count), np.inf)
+    prepare_seconds = np.full(len(rois), np.inf)
+    recognizer.classify(rois[0])  # 预热，创建线程内的检测器
+    for _ in range(repeat):
+        for row, roi in enumerate(rois):
+            start = time.perf_counter()
+            roi_data = recognizer._prepare_roi(roi)
+            prepare_seconds[row] = min(prepare_seconds[row], time.perf_counter() - start)
+            for column, gun_id in enumerate(gun_ids):
+                start = time.perf_counter()
+                scores[row, column] = recognizer._score(gun_id, roi_data)
+                seconds[row, column] = min(seconds[row, column], time.perf_counter() - start)
+    cumulative = np.cumsum(seconds, axis=1)
+    columns = np.arange(count)
+    rows = np.arange(len(rois))
+    id_array = np.array([BankOptimizer.gun_id_of(gun_id) for gun_id in gun_ids])
+
+    def simulate(accept_score):
+        reached = scores >= accept_score
+        stop = np.where(reached.any(axis=1), reached.argmax(axis=1), count - 1)
+        visible = np.where(columns[None, :] <= stop[:, None], scores, -1)
+        best = visible.argmax(axis=1)  # 与逐个比较相同，得分相同时取靠前的模板
+        return id_array[best], visible[rows, best], prepare_seconds + cumulative[rows, stop]
+
+    results = []
+    baseline = None
+    for accept_score in score_grid(scores) + [int(scores.max()) + 1]:
+        predicted, best_scores, total = simulate(accept_score)
+        for min_score in score_grid(best_scores):
+            if min_score > accept_score:
+                continue
+            metrics = evaluate(labels, predicted, best_scores, total, min_score, retry_delay)
+            results.append(({"accept_score": accept_score, "min_score": min_score}, metrics))
+    predicted, best_scores, total = simulate(recognizer.accept_score)
+    baseline = evaluate(labels, predicted, best_scores, total, recognizer.min_score, retry_delay)
+    params, metrics = choose(results, target)
+    return {"params": params, "metrics": metrics, "baseline": baseline}
+
+def tune_template(recognizer, labels, rois, retry_delay, target, repeat=3):
+    """为模板匹配引擎调整 min_score，一次比较全部模板，耗时与阈值无关
+
+    Args:
+        recognizer: 识别引擎
+        labels: 标注数组
+        rois: 截图列表
+        retry_delay: 重试等待时间（秒）
+        target: 目标准确率
+        repeat: 重复测量次数，耗时取最小值
+
+    Returns:
+        dict: {params, metrics, baseline}
+    """
+    predicted, scores = [], []
+    seconds = np.full(len(rois), np.inf)
+    for row, roi in enumerate(rois):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            gun_id, score, _ = recognizer.classify(roi)
+            seconds[row] = min(seconds[row], time.perf_counter() - start)
+        predicted.append(BankOptimizer.gun_id_of(gun_id))
+        scores.append(score)
+    predicted, scores = np.array(predicted), np.array(scores)
+    results = [
+        ({"min_score": min_score}, evaluate(labels, predicted, scores, seconds, min_score, retry_delay))
+        for min_score in score_grid(scores)
+    ]
+    baseline = evaluate(labels, predicted, scores, seconds, recognizer.min_score, retry_delay)
+    params, metrics = choose(results, target)
+    return {"params": params, "metrics": metrics, "baseline": baseline}
+
+def tune_cascade(recognizer, labels, rois, retry_delay, target, repeat=3):
+    """为级联引擎调整 min_similarity、margin 和 min_score
+
+    每张截图记录廉价阶段的最高、次高相似度，以及昂贵引擎复核前几名的结果，
+    不同阈值只改变哪些截图在廉价阶段直接确认
+
+    Args:
+        recognizer: 级联识别引擎
+        labels: 标注数组
+        rois: 截图列表
+        retry_delay: 重试等待时间（秒）
+        target: 目标准确率
+        repeat: 重复测量次数，耗时取最小值
+
+    Returns:
+        dict: {params, metrics, baseline}
+    """
+    count = len(rois)
+    cheap_ids, cheap_best, cheap_second = [], np.zeros(count), np.zeros(count)
+    expensive_ids, expensive_scores = [], np.zeros(count, dtype=np.int32)
+    cheap_seconds, expensive_seconds = np.full(count, np.inf), np.full(count, np.inf)
+    for row, roi in enumerate(rois):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hash_ids, similarity = recognizer.hash_similarity(recognizer._gray(roi))
+            order = np.argsort(similarity)[::-1]
+            cheap_seconds[row] = min(cheap_seconds[row], time.perf_counter() - start)
+            shortlist = [hash_ids[i] for i in order[:recognizer.top_k]]
+            start = time.perf_counter()
+            gun_id, score, _ = recognizer.expensive.classify(roi, shortlist)
+            expensive_seconds[row] = min(expensive_seconds[row], time.perf_counter() - start)
+        cheap_ids.append(BankOptimizer.gun_id_of(hash_ids[order[0]]))
+        cheap_best[row] = similarity[order[0]]
+        cheap_second[row] = similarity[order[1]] if len(order) > 1 else 0.0
+        expensive_ids.append(BankOptimizer.gun_id_of(gun_id))
+        expensive_scores[row] = score
+    cheap_ids, expensive_ids = np.array(cheap_ids), np.array(expensive_ids)
+    cheap_scores = (cheap_best * 100).astype(np.int32)
+
+    def simulate(min_similarity, margin):
+        cheap = (cheap_best >= min_similarity) & (cheap_best - cheap_second >= margin)
+        predicted = np.where(cheap, cheap_ids, expensive_ids)
+        scores = np.where(cheap, cheap_scores, expensive_scores)
+        return predicted, scores, cheap_seconds + np.where(cheap, 0.0, expensive_seconds)
+
+    min_scores = score_grid(np.concatenate([cheap_scores, expensive_scores]))
+    results = []
+    for min_similarity in np.round(np.arange(0.70, 1.001, 0.01), 2):
+        for margin in np.round(np.arange(0.0, 0.301, 0.01), 2):
+            predicted, scores, total = simulate(min_similarity, margin)
+            for min_score in min_scores:
+                metrics = evaluate(labels, predicted, scores, total, min_score, retry_delay)
+                params = {"min_similarity": float(min_similarity), "margin": float(margin), "min_score": min_score}
+                results.append((params, metrics))
+    predicted, scores, total = simulate(recognizer.min_similarity, recognizer.margin)
+    baseline = evaluate(labels, predicted, scores, total, recognizer.min_score, retry_delay)
+    params, metrics = choose(results, target)
+    return {"params": params, "metrics": metrics, "baseline": baseline}
+
+TUNERS = {
+    "orb": tune_sequential,
+    "template": tune_template,
+    "cascade": tune_cascade,
+}
+
+def save(path, resolution_key, settings):
+    """把调参结果合并写入阈值配置文件，其他分辨率的结果保持不变
+
+    Args:
+        path: 配置文件路径
+        resolution_key: 分辨率，如 2560x1440
+        settings: {引擎名称: 阈值}
+    """
+    data = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    data[resolution_key] = dict(data.get(resolution_key, {}), **settings)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+
+def main(argv=None):
+    """命令行入口
+
+    Args:
+        argv: 命令行参数
+
+    Returns:
+        int: 退出码，有引擎达不到目标准确率时为1
+    """
+    parser = argparse.ArgumentParser(description="按标注数据集调整识别阈值")
+    parser.add_argument("--corpus", required=True, help="DatasetWriter 录制的数据集目录")
+    parser.add_argument("--resolution", default=None, help="游戏分辨率，如 2560x1440；为空时使用主显示器的分辨率")
+    parser.add_argument("--engines", nargs="+", default=list(TUNERS), help="需要调参的识别引擎")
+    parser.add_argument("--target", type=float, default=0.99, help="目标准确率（被确认结果中正确的比例）")
+    parser.add_argument("--retry-delay", type=float, default=None, help="识别失败后的重试等待（秒），默认与图像处理器一致")
+    parser.add_argument("--repeat", type=int, default=3, help="每张截图重复测量的次数")
+    parser.add_argument("--output", default=None, help="阈值配置文件路径，默认写入资源目录下的 thresholds.json")
+    parser.add_argument("--dry-run", action="store_true", help="只输出调参结果，不写入配置文件")
+    args = parser.parse_args(argv)
+
+    if args.resolution:
+        width, height = (int(value) for value in args.resolution.lower().split("x"))
+        resolution_config = ResolutionConfig(width, height)
+    else:
+        resolution_config = ResolutionConfig.from_screen()
+    image_processor = ImageProcessor(resolution_config)
+    calibrator = RoiCalibrator(resolution_config, image_processor)
+    calibration = calibrator.load()
+    if calibration:
+        calibrator.apply(calibration)  # 数据集按校准后的识别区域录制时，模板需要同样裁剪
+    retry_delay = image_processor.retry_delay if args.retry_delay is None else args.retry_delay
+
+    labels, rois = load_corpus(args.corpus)
+    if not rois:
+        print(f"数据集中没有带标注的截图: {args.corpus}")
+        return 1
+    print(f"数据集: {len(rois)} 张截图, {len(set(labels.tolist()))} 种武器")
+
+    settings = {}
+    failed = False
+    for name in args.engines:
+        result = TUNERS[name](image_processor.recognizers.get(name), labels, rois,
+                              retry_delay, args.target, args.repeat)
+        metrics = result["metrics"]
+        failed = failed or not metrics["met"]
+        if result["params"] is None:
+            print(f"{name}: 数据集中没有得分大于0的截图，无法选出阈值，保留原有设置")
+            continue
+        settings[name] = dict(result["params"], metrics=metrics)
+        print(f"{name}: 阈值 {result['params']}, 调参后 {metrics}, 调参前 {result['baseline']}"
+              f"{'' if metrics['met'] else ' 未达到目标准确率'}")
+
+    if not args.dry_run:
+        path = args.output or image_processor.thresholds_path
+        save(path, f"{resolution_config.width}x{resolution_config.height}", settings)
+        print(f"识别阈值已写入: {path}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
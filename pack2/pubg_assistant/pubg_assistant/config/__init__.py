@@ -6,7 +6,15 @@ Configuration modules for PUBG Assistant
 """
 
 # 配置模块初始化文件
-from pubg_assistant.config.resolution_config import ResolutionConfig
-from pubg_assistant.config.config_manager import ConfigManager
 
-__all__ = ['ResolutionConfig', 'ConfigManager'] 
\ No newline at end of file
+from pubg_assistant import _lazy
+
+_LAZY_ATTRS = {
+    'ResolutionConfig': 'pubg_assistant.config.resolution_config',
+    'ConfigManager': 'pubg_assistant.config.config_manager',
+    'RoiCalibrator': 'pubg_assistant.config.roi_calibration',
+}
+
+__all__ = ['ResolutionConfig', 'ConfigManager', 'RoiCalibrator']
+
+_lazy.install(globals(), _LAZY_ATTRS)
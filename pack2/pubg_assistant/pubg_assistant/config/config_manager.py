@@ -11,16 +11,20 @@ import json
 import threading
 from typing import Dict, Any
 
+from pubg_assistant.metrics.stage_timer import get_stage_timer
+
 class ConfigManager:
     """配置管理器类，负责管理和持久化配置"""
     
-    def __init__(self, config_dir="D:\\pubg\\"):
+    def __init__(self, config_dir="D:\\pubg\\", stage_timer=None):
         """初始化配置管理器
         
         Args:
             config_dir: 配置文件目录
+            stage_timer: 阶段计时器，为空时使用全局计时器
         """
         self.config_dir = config_dir
+        self.stage_timer = stage_timer if stage_timer else get_stage_timer()
         self.lock = threading.Lock()
         
         # 计算资源目录的基础路径
@@ -33,20 +37,23 @@ class ConfigManager:
         # 确保dict目录存在
         os.makedirs(self.dict_dir, exist_ok=True)
     
-    def save_config(self, title, content):
+    def save_config(self, title, content, trace=None):
         """保存配置到文件
         
         Args:
             title: 配置项名称
             content: 配置项内容
+            trace: 链路追踪记录，写入完成后打点
         """
-        with self.lock:
+        with self.stage_timer.stage("config.save"), self.lock:
             file_path = os.path.join(self.config_dir, f"{title}.lua")
             field = title
             if title == "gun":
                 field = "weaponNo"
             with open(file_path, "w+") as file:
                 file.write(f"{field}={content}")
+        if trace:
+            trace.mark("config_written")
     
     def load_gun_dict(self, dict_path=None):
         """加载枪械字典
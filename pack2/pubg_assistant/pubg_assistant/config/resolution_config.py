@@ -9,7 +9,41 @@
 import os
 
 class ResolutionConfig:
-    """分辨率配置类"""
+    """分辨率配置类
+    
+    识别区域以2560x1440的布局为基准，按界面缩放规则换算到任意分辨率：
+    界面整体按 min(宽/2560, 高/1440) 等比缩放，水平方向以屏幕中心为锚点，垂直方向以屏幕底边为锚点。
+    已实测的分辨率使用实测坐标。
+    """
+    
+    BASE_WIDTH = 2560
+    BASE_HEIGHT = 1440
+    BASE_RESOURCES = "25601440"
+    ATTACHMENT_SLOTS = 4  # 配件栏按宽度等分的格数
+    
+    # 2560x1440下的基准布局
+    BASE_LAYOUT = {
+        "ui_position": {"x": 1560, "y": 1370},
+        "weapon_area": {"left": 1940, "top": 1325, "width": 195, "height": 100},
+        "weapon_area_2": {"left": 1940, "top": 1245, "width": 195, "height": 100},
+        # 配件栏位于武器区域底部，与武器识别共用同一张截图（位置按实测调整）
+        "attachment_area": {"left": 1945, "top": 1400, "width": 184, "height": 22},
+        "attachment_area_2": {"left": 1945, "top": 1320, "width": 184, "height": 22},
+        "posture_area_1": {"left": 962, "top": 1308, "width": 5, "height": 5},
+        "posture_area_2": {"left": 960, "top": 1315, "width": 5, "height": 5},
+    }
+    
+    # 实测过的分辨率：(宽, 高) -> (资源目录, 布局)
+    MEASURED_LAYOUTS = {
+        (2560, 1440): ("25601440", BASE_LAYOUT),
+        (2313, 1440): ("23131440", {
+            "ui_position": {"x": 1400, "y": 1370},
+            "weapon_area": {"left": 1755, "top": 1325, "width": 175, "height": 100},
+            "weapon_area_2": {"left": 1755, "top": 1245, "width": 175, "height": 100},
+            "posture_area_1": {"left": 870, "top": 1308, "width": 5, "height": 5},
+            "posture_area_2": {"left": 868, "top": 1315, "width": 5, "height": 5},
+        }),
+    }
     
     def __init__(self, width=2560, height=1440):
         """初始化分辨率配置
@@ -20,60 +54,127 @@ class ResolutionConfig:
         """
         self.width = width
         self.height = height
+        self.ui_scale = min(width / self.BASE_WIDTH, height / self.BASE_HEIGHT)
         
         # 计算资源目录的基础路径（项目根目录下的resources文件夹）
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         resources_base = os.path.join(base_dir, "resources")
+        self.base_resources_dir = os.path.join(resources_base, self.BASE_RESOURCES)
         
         # 根据分辨率选择配置
-        if width == 2560 and height == 1440:
-            self.resources_dir = os.path.join(resources_base, "25601440")
-            # 绝对位置配置
-            self.ui_position = {"x": 1560, "y": 1370}
-            self.weapon_area = {
-                "left": 1940, "top": 1325, "width": 195, "height": 100
-            }
-            self.weapon_area_2 = {
-                "left": 1940, "top": 1245, "width": 195, "height": 100
-            }
-            self.posture_area_1 = {
-                "left": 962, "top": 1308, "width": 5, "height": 5
-            }
-            self.posture_area_2 = {
-                "left": 960, "top": 1315, "width": 5, "height": 5
-            }
-        elif width == 2313 and height == 1440:
-            self.resources_dir = os.path.join(resources_base, "23131440")
-            # 绝对位置配置
-            self.ui_position = {"x": 1400, "y": 1370}
-            self.weapon_area = {
-                "left": 1755, "top": 1325, "width": 175, "height": 100
-            }
-            self.weapon_area_2 = {
-                "left": 1755, "top": 1245, "width": 175, "height": 100
-            }
-            self.posture_area_1 = {
-                "left": 870, "top": 1308, "width": 5, "height": 5
-            }
-            self.posture_area_2 = {
-                "left": 868, "top": 1315, "width": 5, "height": 5
-            }
+        measured = self.MEASURED_LAYOUTS.get((width, height))
+        if measured:
+            resources_name, layout = measured
+        else:
+            resources_name, layout = None, self._scale_layout(self.BASE_LAYOUT)
+        
+        # 没有为该分辨率单独截取模板时，使用基准模板按界面缩放比例缩放
+        resources_dir = os.path.join(resources_base, resources_name) if resources_name else None
+        if resources_dir and os.path.isdir(resources_dir):
+            self.resources_dir = resources_dir
+            self.template_scale = 1.0
         else:
-            # 默认使用2560x1440的绝对位置
-            self.resources_dir = os.path.join(resources_base, "25601440")
-            self.ui_position = {"x": 1560, "y": 1370}
-            self.weapon_area = {
-                "left": 1940, "top": 1325, "width": 195, "height": 100
-            }
-            self.weapon_area_2 = {
-                "left": 1940, "top": 1245, "width": 195, "height": 100
-            }
-            self.posture_area_1 = {
-                "left": 962, "top": 1308, "width": 5, "height": 5
-            }
-            self.posture_area_2 = {
-                "left": 960, "top": 1315, "width": 5, "height": 5
-            }
+            self.resources_dir = self.base_resources_dir
+            self.template_scale = self.ui_scale
+        
+        # 实测布局中没有的区域按基准布局换算
+        if "attachment_area" not in layout:
+            scaled = self._scale_layout(self.BASE_LAYOUT)
+            layout = dict(layout, attachment_area=scaled["attachment_area"],
+                          attachment_area_2=scaled["attachment_area_2"])
+        
+        # 绝对位置配置
+        self.ui_position = dict(layout["ui_position"])
+        self.weapon_area = dict(layout["weapon_area"])
+        self.weapon_area_2 = dict(layout["weapon_area_2"])
+        self.attachment_area = dict(layout["attachment_area"])
+        self.attachment_area_2 = dict(layout["attachment_area_2"])
+        self.posture_area_1 = dict(layout["posture_area_1"])
+        self.posture_area_2 = dict(layout["posture_area_2"])
+    
+    @classmethod
+    def from_screen(cls):
+        """按主显示器的实际分辨率创建配置，获取失败时使用默认分辨率
+        
+        Returns:
+            ResolutionConfig: 分辨率配置
+        """
+        try:
+            from mss import mss  # 延迟导入截图库
+            
+            with mss() as sct:
+                monitor = sct.monitors[1]
+                return cls(monitor["width"], monitor["height"])
+        except Exception as e:
+            print(f"获取屏幕分辨率失败，使用默认分辨率: {e}")
+            return cls()
+    
+    def _scale_x(self, x):
+        """把基准布局的横坐标换算到当前分辨率（以屏幕中心为锚点）"""
+        return int(round(self.width / 2 + (x - self.BASE_WIDTH / 2) * self.ui_scale))
+    
+    def _scale_y(self, y):
+        """把基准布局的纵坐标换算到当前分辨率（以屏幕底边为锚点）"""
+        return int(round(self.height - (self.BASE_HEIGHT - y) * self.ui_scale))
+    
+    def _scale_layout(self, layout):
+        """把基准布局换算到当前分辨率
+        
+        Args:
+            layout: 基准布局
+            
+        Returns:
+            dict: 换算后的布局
+        """
+        scaled = {}
+        for name, area in layout.items():
+            if "left" in area:
+                scaled[name] = {
+                    "left": self._scale_x(area["left"]),
+                    "top": self._scale_y(area["top"]),
+                    "width": max(1, int(round(area["width"] * self.ui_scale))),
+                    "height": max(1, int(round(area["height"] * self.ui_scale))),
+                }
+            else:
+                scaled[name] = {"x": self._scale_x(area["x"]), "y": self._scale_y(area["y"])}
+        return scaled
+    
+    def apply_calibration(self, calibration):
+        """使用校准得到的紧凑武器识别区域
+        
+        Args:
+            calibration: 校准结果，包含 weapon_area 和 weapon_area_2
+        """
+        self.weapon_area = dict(calibration["weapon_area"])
+        self.weapon_area_2 = dict(calibration["weapon_area_2"])
+    
+    def crop_weapon_areas(self, crop):
+        """把武器识别区域缩小到模板的有效像素范围
+        
+        Args:
+            crop: 相对识别区域左上角的裁剪区域 {left, top, width, height}
+        """
+        for area in (self.weapon_area, self.weapon_area_2):
+            area["left"] += crop["left"]
+            area["top"] += crop["top"]
+            area["width"] = crop["width"]
+            area["height"] = crop["height"]
+    
+    def get_ui_scale(self):
+        """获取界面缩放比例（相对2560x1440）
+        
+        Returns:
+            float: 缩放比例
+        """
+        return self.ui_scale
+    
+    def get_template_scale(self):
+        """获取模板需要的缩放比例，资源目录与分辨率匹配时为1
+        
+        Returns:
+            float: 缩放比例
+        """
+        return self.template_scale
     
     def get_ui_position(self):
         """获取UI位置
@@ -96,6 +197,19 @@ class ResolutionConfig:
             return self.weapon_area_2
         return self.weapon_area
     
+    def get_attachment_area(self, slot=1):
+        """获取配件栏区域
+        
+        Args:
+            slot: 武器槽位，1或2
+            
+        Returns:
+            dict: 配件栏区域字典
+        """
+        if slot == 2:
+            return self.attachment_area_2
+        return self.attachment_area
+    
     def get_posture_area(self, index=1):
         """获取姿势检测区域
         
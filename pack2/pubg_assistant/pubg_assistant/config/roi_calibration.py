@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+识别区域校准模块
+在整屏截图中用模板库一次性定位武器栏，计算只包含有效像素的紧凑识别区域，
+结果按分辨率保存，启动时做低成本校验后直接使用
+"""
+
+import os
+import json
+import time
+
+CALIBRATION_VERSION = 1
+
+class RoiCalibrator:
+    """识别区域校准类"""
+    
+    SEARCH_MARGIN = 60  # 在默认识别区域四周额外搜索的像素
+    MIN_CONFIDENCE = 0.7  # 模板匹配的最低相关系数
+    PADDING = 2  # 紧凑区域四周保留的像素
+    THRESHOLD = 200  # 与 extract_gun 相同的亮度阈值
+    
+    def __init__(self, resolution_config, image_processor, calibration_dir=None):
+        """初始化校准器
+        
+        Args:
+            resolution_config: 分辨率配置
+            image_processor: 图像处理器，提供模板库和截图
+            calibration_dir: 校准结果目录，为空时使用 resources/calibration
+        """
+        self.resolution_config = resolution_config
+        self.image_processor = image_processor
+        if calibration_dir is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            calibration_dir = os.path.join(base_dir, "resources", "calibration")
+        self.calibration_dir = calibration_dir
+    
+    def get_path(self):
+        """获取当前分辨率的校准文件路径
+        
+        Returns:
+            str: 文件路径
+        """
+        width, height = self.resolution_config.width, self.resolution_config.height
+        return os.path.join(self.calibration_dir, f"{width}x{height}.json")
+    
+    def _bank_signature(self, bank):
+        """计算模板库签名，模板增删或尺寸变化时校准结果失效
+        
+        Args:
+            bank: 模板库
+            
+        Returns:
+            str: 签名
+        """
+        return ";".join(f"{gun_id}:{bank[gun_id].shape[1]}x{bank[gun_id].shape[0]}" for gun_id in sorted(bank))
+    
+    def _grab_gray(self):
+        """截取整屏并转为阈值化后的灰度图
+        
+        Returns:
+            ndarray: 灰度图
+        """
+        import numpy as np
+        import cv2 as cv
+        
+        width, height = self.resolution_config.width, self.resolution_config.height
+        frame = self.image_processor.frame_source.grab((0, 0, width, height))
+        bgra = np.frombuffer(frame.bgra, dtype=np.uint8).reshape(frame.size[1], frame.size[0], 4)
+        gray = cv.cvtColor(bgra, cv.COLOR_BGRA2GRAY)
+        gray[gray <= self.THRESHOLD] = 0
+        return gray
+    
+    def _search_region(self, gray, area):
+        """截取默认识别区域加搜索边距的范围
+        
+        Args:
+            gray: 整屏灰度图
+            area: 默认识别区域
+            
+        Returns:
+            tuple: (范围左上角x, 范围左上角y, 灰度图)
+        """
+        left = max(0, area["left"] - self.SEARCH_MARGIN)
+        top = max(0, area["top"] - self.SEARCH_MARGIN)
+        right = min(gray.shape[1], area["left"] + area["width"] + self.SEARCH_MARGIN)
+        bottom = min(gray.shape[0], area["top"] + area["height"] + self.SEARCH_MARGIN)
+        return left, top, gray[top:bottom, left:right]
+    
+    def _locate(self, gray, area, bank):
+        """在默认识别区域附近搜索模板位置
+        
+        Args:
+            gray: 整屏灰度图
+            area: 默认识别区域
+            bank: 模板库
+            
+        Returns:
+            tuple: (模板左上角x, 模板左上角y, 相关系数, 武器ID)，未找到时为None
+        """
+        import cv2 as cv
+        
+        left, top, region = self._search_region(gray, area)
+        
+        best = None
+        for gun_id, template in bank.items():
+            if template.shape[0] > region.shape[0] or template.shape[1] > region.shape[1]:
+                continue
+            result = cv.matchTemplate(region, template, cv.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv.minMaxLoc(result)
+            if best is None or max_val > best[2]:
+                best = (left + max_loc[0], top + max_loc[1], float(max_val), gun_id)
+        return best
+    
+    def calibrate(self):
+        """搜索武器栏位置并计算紧凑识别区域，需要在至少一个武器栏有武器时执行
+        
+        Returns:
+            dict: 校准结果，失败时为None
+        """
+        if not self.image_processor.template_bank:
+            print("模板库为空，无法校准")
+            return None
+        
+        from pubg_assistant.processors.bank_optimizer import BankOptimizer
+        
+        gray = self._grab_gray()
+        area_1 = self.resolution_config.get_weapon_area(1)
+        area_2 = self.resolution_config.get_weapon_area(2)
+        
+        # 模板由基准模板缩放而来时，先在武器栏附近选出匹配度最高的金字塔级别
+        template_scale = None
+        pyramid = self.image_processor.template_pyramid
+        if pyramid:
+            best = max((pyramid.best_scale(self._search_region(gray, area)[2]) for area in (area_1, area_2)),
+                       key=lambda item: item[1])
+            if best[1] >= self.MIN_CONFIDENCE:
+                template_scale = best[0]
+                self.image_processor.select_template_scale(template_scale)
+                print(f"模板缩放比例: {template_scale}（相关系数 {best[1]:.3f}）")
+        
+        bank = self.image_processor.template_bank
+        crop = BankOptimizer.informative_box(bank, self.THRESHOLD, self.PADDING)
+        crop_x, crop_y, crop_w, crop_h = crop["left"], crop["top"], crop["width"], crop["height"]
+        
+        found = {}
+        for slot, area in ((1, area_1), (2, area_2)):
+            best = self._locate(gray, area, bank)
+            if best and best[2] >= self.MIN_CONFIDENCE:
+                found[slot] = best
+        if not found:
+            print("未在截图中找到武器栏，请在持有武器时重新校准")
+            return None
+        
+        # 只找到一个武器栏时，按默认布局中两个武器栏的相对位置推算另一个
+        offset_x = area_2["left"] - area_1["left"]
+        offset_y = area_2["top"] - area_1["top"]
+        if 1 not in found:
+            x, y, confidence, gun_id = found[2]
+            found[1] = (x - offset_x, y - offset_y, confidence, gun_id)
+        if 2 not in found:
+            x, y, confidence, gun_id = found[1]
+            found[2] = (x + offset_x, y + offset_y, confidence, gun_id)
+        
+        result = {
+            "version": CALIBRATION_VERSION,
+            "width": self.resolution_config.width,
+            "height": self.resolution_config.height,
+            "bank": self._bank_signature(bank),
+            "template_crop": crop,
+            "template_scale": template_scale,
+            "confidence": round(min(found[1][2], found[2][2]), 4),
+            "timestamp": time.time(),
+        }
+        for slot, name in ((1, "weapon_area"), (2, "weapon_area_2")):
+            x, y = found[slot][0], found[slot][1]
+            result[name] = {"left": int(x + crop_x), "top": int(y + crop_y), "width": crop_w, "height": crop_h}
+        return result
+    
+    def save(self, result):
+        """保存校准结果
+        
+        Args:
+            result: 校准结果
+            
+        Returns:
+            str: 文件路径
+        """
+        path = self.get_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(result, file, indent=2)
+        return path
+    
+    def load(self):
+        """读取并校验校准结果
+        
+        Returns:
+            dict: 校验通过的校准结果，没有或失效时为None
+        """
+        path = self.get_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as file:
+                result = json.load(file)
+        except Exception as e:
+            print(f"读取校准结果失败: {e}")
+            return None
+        # 模板库签名按校准时选出的金字塔级别计算，先切换到该级别再校验
+        if result.get("template_scale"):
+            self.image_processor.select_template_scale(result["template_scale"])
+        reason = self.validate(result)
+        if reason:
+            self.image_processor.select_template_scale(self.resolution_config.get_template_scale())
+            print(f"校准结果已失效（{reason}），请使用 --calibrate 重新校准")
+            return None
+        return result
+    
+    def validate(self, result):
+        """低成本校验校准结果，不需要截图
+        
+        Args:
+            result: 校准结果
+            
+        Returns:
+            str: 失效原因，有效时为空字符串
+        """
+        config = self.resolution_config
+        if result.get("version") != CALIBRATION_VERSION:
+            return "版本不匹配"
+        if (result.get("width"), result.get("height")) != (config.width, config.height):
+            return "分辨率不匹配"
+        if result.get("bank") != self._bank_signature(self.image_processor.template_bank):
+            return "模板库已变化"
+        for slot, name in ((1, "weapon_area"), (2, "weapon_area_2")):
+            area = result.get(name)
+            default = config.get_weapon_area(slot)
+            if not area:
+                return f"缺少{name}"
+            # 紧凑区域必须落在默认区域加搜索边距的范围内
+            if (area["left"] < default["left"] - self.SEARCH_MARGIN
+                    or area["top"] < default["top"] - self.SEARCH_MARGIN
+                    or area["left"] + area["width"] > default["left"] + default["width"] + self.SEARCH_MARGIN
+                    or area["top"] + area["height"] > default["top"] + default["height"] + self.SEARCH_MARGIN
+                    or area["left"] + area["width"] > config.width
+                    or area["top"] + area["height"] > config.height):
+                return f"{name}超出范围"
+        return ""
+    
+    def apply(self, result):
+        """把校准结果应用到分辨率配置和图像处理器
+        
+        Args:
+            result: 校准结果
+        """
+        self.resolution_config.apply_calibration(result)
+        self.image_processor.apply_template_crop(result["template_crop"])
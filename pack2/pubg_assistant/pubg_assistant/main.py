@@ -9,69 +9,280 @@ import os
 import sys
 import time
 import ctypes
+import argparse
 
 from pubg_assistant.config.resolution_config import ResolutionConfig
 from pubg_assistant.config.config_manager import ConfigManager
-from pubg_assistant.managers.ui_manager import UIManager
+from pubg_assistant.managers.null_ui_manager import NullUIManager
+from pubg_assistant.managers.state_store import StateStore
 from pubg_assistant.managers.input_manager import InputManager
 from pubg_assistant.processors.image_processor import ImageProcessor
 from pubg_assistant.processors.action_processor import ActionProcessor
 from pubg_assistant.monitors.posture_monitor import PostureMonitor
+from pubg_assistant.metrics.stage_timer import get_stage_timer
+from pubg_assistant.metrics.tracing import get_trace_collector
 
-def main():
-    """主函数"""
+def parse_args(argv=None):
+    """解析命令行参数
+    
+    Args:
+        argv: 命令行参数列表，为空时使用sys.argv
+        
+    Returns:
+        argparse.Namespace: 解析结果
+    """
+    parser = argparse.ArgumentParser(description="PUBG Assistant")
+    parser.add_argument("--headless", action="store_true",
+                        help="无界面模式：不创建覆盖层窗口，不执行控制台设置，状态输出到日志")
+    parser.add_argument("--exit-after-ready", action="store_true",
+                        help="所有模块初始化完成后立即退出，用于测量启动耗时")
+    parser.add_argument("--stats", action="store_true",
+                        help="启用识别流程各阶段的耗时统计，按F10导出")
+    parser.add_argument("--stats-file", default=None,
+                        help="阶段耗时统计导出路径，.csv结尾时导出CSV，否则导出JSON")
+    parser.add_argument("--stats-interval", type=float, default=0,
+                        help="定时导出阶段耗时统计的间隔（秒），0为不定时导出")
+    parser.add_argument("--trace", action="store_true",
+                        help="启用按键到配置写入的链路追踪")
+    parser.add_argument("--trace-file", default=None,
+                        help="链路追踪文件路径（按大小滚动）")
+    parser.add_argument("--record", default=None,
+                        help="把键盘鼠标动作录制到指定文件，用于回放压测")
+    parser.add_argument("--shadow", default=None,
+                        help="影子对比模式：指定在后台复核的识别引擎（orb / template / cascade）")
+    parser.add_argument("--resolution", default=None,
+                        help="游戏分辨率，如 2560x1440；为空时使用主显示器的分辨率")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="持有武器时执行一次识别区域校准，结果按分辨率保存")
+    parser.add_argument("--optimize-bank", action="store_true",
+                        help="裁剪模板到有效像素范围并合并几乎相同的模板")
+    parser.add_argument("--dataset", default=None,
+                        help="在后台把每次武器识别的截图和结果记录到指定目录，用于构建测试语料")
+    parser.add_argument("--hot-reload", action="store_true",
+                        help="监控资源目录，武器模板或枪械名称文件变化时自动重新加载")
+    parser.add_argument("--remote", nargs="?", const="", default=None,
+                        help="使用识别服务打分（可指定服务地址：套接字文件路径或 HOST:PORT），本地不加载模板库")
+    parser.add_argument("--async", dest="async_runtime", action="store_true",
+                        help="使用asyncio运行时代替主循环、姿势监控线程和输入消费者线程")
+    parser.add_argument("--resource-monitor", action="store_true",
+                        help="定时采样各模块的CPU和内存占用，超出预算时在覆盖层和日志中提示")
+    parser.add_argument("--cpu-budget", type=float, default=5.0,
+                        help="进程CPU占用预算（单核百分比）")
+    parser.add_argument("--rss-budget-mb", type=float, default=300.0,
+                        help="常驻内存预算（MB）")
+    parser.add_argument("--component-budget", action="append", default=[], metavar="NAME=PCT",
+                        help="覆盖单个模块的CPU占用预算（单核百分比），可重复指定，如 PostureMonitor=2；"
+                             "PCT为0时不检查该模块")
+    parser.add_argument("--trace-allocations", action="store_true",
+                        help="资源监控同时用tracemalloc统计分配热点（有额外开销）")
+    parser.add_argument("--burst", type=int, default=0,
+                        help="连拍投票：每次识别连续截取指定帧数并一次打分投票，代替失败后等待1秒的重试")
+    parser.add_argument("--change-detection", action="store_true",
+                        help="武器区域画面没有变化时沿用上次识别结果，跳过比例随阶段统计导出")
+    parser.add_argument("--auto-loadout", action="store_true",
+                        help="从武器识别截图中的配件栏自动识别满配/裸配，代替NumLock切换")
+    parser.add_argument("--session", nargs="?", const="", default=None,
+                        help="保存并在启动时恢复武器栏、锁定、姿势和截图指纹（可指定快照文件路径），"
+                             "截图与上次识别时一致的武器栏直接沿用结果")
+    return parser.parse_args(argv)
+
+def parse_component_budgets(items):
+    """在默认模块预算的基础上应用 --component-budget 的覆盖
+    
+    Args:
+        items: ["模块名=百分比", ...]，百分比为0时不检查该模块
+        
+    Returns:
+        dict: {模块名: 百分比}
+    """
+    from pubg_assistant.monitors.resource_monitor import DEFAULT_COMPONENT_BUDGETS
+    
+    budgets = dict(DEFAULT_COMPONENT_BUDGETS)
+    for item in items:
+        name, _, value = item.partition("=")
+        try:
+            budget = float(value)
+        except ValueError:
+            print(f"忽略无效的模块预算: {item}")
+            continue
+        if budget > 0:
+            budgets[name.strip()] = budget
+        else:
+            budgets.pop(name.strip(), None)
+    return budgets
+
+def main(argv=None):
+    """主函数
+    
+    Args:
+        argv: 命令行参数列表
+    """
+    args = parse_args(argv)
+    start_time = time.perf_counter()
     
     # 控制台设置
-    os.system("title PUBG Assistant")
-    os.system("mode con cols=50 lines=30")
+    if not args.headless:
+        os.system("title PUBG Assistant")
+        os.system("mode con cols=50 lines=30")
     
     # 初始化模块
     print("初始化中...")
     
+    # 阶段耗时统计
+    stage_timer = get_stage_timer()
+    if args.stats_file:
+        stage_timer.dump_path = args.stats_file
+    if args.stats:
+        stage_timer.enable()
+        if args.stats_interval > 0:
+            stage_timer.start_periodic_dump(args.stats_interval)
+    
+    # 链路追踪
+    trace_collector = get_trace_collector()
+    if args.trace_file:
+        trace_collector.trace_path = args.trace_file
+    if args.trace:
+        trace_collector.enable()
+    
     # 1. 初始化分辨率配置
-    resolution_config = ResolutionConfig()
-    print("分辨率配置初始化完成")
+    if args.resolution:
+        width, height = (int(value) for value in args.resolution.lower().split("x"))
+        resolution_config = ResolutionConfig(width, height)
+    else:
+        resolution_config = ResolutionConfig.from_screen()
+    print(f"分辨率配置初始化完成: {resolution_config.width}x{resolution_config.height}, "
+          f"界面缩放 {resolution_config.get_ui_scale():.3f}")
     
     # 2. 初始化配置管理器
     config_manager = ConfigManager()
     print("配置管理器初始化完成")
     
     # 3. 初始化UI管理器
-    ui_manager = UIManager()
+    state_store = StateStore()
+    if args.headless:
+        ui_manager = NullUIManager()
+    else:
+        from pubg_assistant.managers.ui_manager import UIManager
+        
+        ui_manager = UIManager()
+    ui_manager.bind_state(state_store)
     ui_position = resolution_config.get_ui_position()
     ui_manager.start_display("启动中...", ui_position["x"], ui_position["y"])
     print("UI管理器初始化完成")
     
     # 4. 初始化图像处理器
-    image_processor = ImageProcessor(resolution_config)
+    if args.remote is not None:
+        # 模板库、校准和引擎都在识别服务进程中，本地只负责截图
+        from pubg_assistant.service.protocol import parse_address
+        from pubg_assistant.service.recognition_client import RecognitionClient, RemoteImageProcessor
+        
+        image_processor = RemoteImageProcessor(resolution_config, RecognitionClient(parse_address(args.remote)))
+        print(f"使用识别服务: {image_processor.client.address}")
+    else:
+        image_processor = ImageProcessor(resolution_config)
+        if args.shadow:
+            image_processor.enable_shadow(args.shadow)
+        
+        # 识别区域校准：--calibrate 时重新搜索，否则使用已保存且校验通过的结果
+        from pubg_assistant.config.roi_calibration import RoiCalibrator
+        
+        calibrator = RoiCalibrator(resolution_config, image_processor)
+        calibration = calibrator.calibrate() if args.calibrate else calibrator.load()
+        if calibration:
+            if args.calibrate:
+                print(f"识别区域校准完成: {calibrator.save(calibration)}")
+            calibrator.apply(calibration)
+            print(f"使用校准识别区域: {calibration['weapon_area']}, {calibration['weapon_area_2']}")
+        if args.optimize_bank:
+            report = image_processor.optimize_bank()
+            print(f"模板库优化: 优化前 {report['before']}, 优化后 {report['after']}, 别名 {report['aliases']}, "
+                  f"未合并的相似武器 {report['conflicts']}")
+    if args.auto_loadout:
+        image_processor.enable_attachment_detection()
+    if args.change_detection:
+        image_processor.enable_change_detection()
+    if args.burst > 1:
+        image_processor.enable_burst(args.burst)
+    if args.dataset:
+        image_processor.enable_dataset(args.dataset)
     print("图像处理器初始化完成")
     
     # 5. 初始化动作处理器
-    action_processor = ActionProcessor(image_processor, config_manager, ui_manager)
+    action_processor = ActionProcessor(image_processor, config_manager, ui_manager, state_store)
+    session_store = None
+    if args.session is not None:
+        from pubg_assistant.managers.session_store import SessionStore
+        
+        session_store = SessionStore(args.session or None)
+        image_processor.enable_fingerprints()
+        action_processor.attach_session(session_store)
+        session_store.start()
+    action_processor._update_display()  # 发布初始状态
     print("动作处理器初始化完成")
     
-    # 6. 初始化姿势监控器
-    posture_monitor = PostureMonitor(image_processor, config_manager, action_processor)
-    posture_monitor.daemon = True
-    posture_monitor.start()
-    posture_monitor.pause()  # 默认暂停状态
-    print("姿势监控器初始化完成")
+    # 6. 初始化姿势监控器（异步运行时中姿势检测为周期任务）
+    posture_monitor = None
+    if not args.async_runtime:
+        posture_monitor = PostureMonitor(image_processor, config_manager, action_processor)
+        posture_monitor.daemon = True
+        posture_monitor.start()
+        posture_monitor.pause()  # 默认暂停状态
+        print("姿势监控器初始化完成")
+    
+    # 模板热加载
+    template_watcher = None
+    if args.hot_reload and args.remote is None:
+        from pubg_assistant.monitors.template_watcher import TemplateWatcher
+        
+        template_watcher = TemplateWatcher(image_processor, action_processor)
+        template_watcher.daemon = True
+        template_watcher.start()
+        print(f"模板热加载已启用: {template_watcher.resources_dir}")
+    
+    # 资源预算监控
+    resource_monitor = None
+    if args.resource_monitor:
+        from pubg_assistant.monitors.resource_monitor import ResourceMonitor
+        
+        component_budgets = parse_component_budgets(args.component_budget)
+        resource_monitor = ResourceMonitor(image_processor, state_store,
+                                           cpu_budget=args.cpu_budget, rss_budget_mb=args.rss_budget_mb,
+                                           component_budgets=component_budgets,
+                                           trace_allocations=args.trace_allocations)
+        resource_monitor.daemon = True
+        resource_monitor.start()
+        print(f"资源监控已启用，模块预算: {component_budgets}")
     
     # 7. 初始化输入管理器
     input_manager = InputManager()
     input_manager.set_action_processor(action_processor)
     input_manager.set_posture_monitor(posture_monitor)
-    input_manager.start()
+    recorder = None
+    if args.record:
+        from pubg_assistant.managers.input_recorder import InputRecorder
+        
+        recorder = InputRecorder(args.record)
+    input_manager.set_recorder(recorder)
+    async_runtime = None
+    if args.async_runtime:
+        from pubg_assistant.runtime.async_runtime import AsyncRuntime
+        
+        async_runtime = AsyncRuntime(action_processor, input_manager)
+    input_manager.start(consume=async_runtime is None)
     print("输入管理器初始化完成")
     
     print("所有模块初始化完成，程序已启动")
+    ready_time = time.perf_counter()
+    ready_cpu = time.process_time()
+    print(f"启动耗时: {(ready_time - start_time) * 1000:.1f}ms, 已加载tkinter: {'tkinter' in sys.modules}")
     
     try:
+        if async_runtime and not args.exit_after_ready:
+            # 事件循环运行到按F9退出，退出时统一取消全部任务
+            async_runtime.run()
+        
         # 主循环，保持程序运行
-        while True:
-            # 更新UI状态
-            action_processor._update_display()
-            
+        while not args.exit_after_ready and not async_runtime:
             # 检查是否请求退出程序
             if action_processor.is_exit_requested():
                 break
@@ -83,9 +294,43 @@ def main():
         print("正在退出程序...")
     finally:
         # 停止所有线程和服务
-        posture_monitor.stop()
+        if posture_monitor:
+            posture_monitor.stop()
+        if async_runtime:
+            print(f"异步运行时: {async_runtime.get_stats()}")
+        if template_watcher:
+            template_watcher.stop()
+        if resource_monitor:
+            resource_monitor.stop()
+            print(f"资源占用: {resource_monitor.sample()}, 峰值内存 {resource_monitor.peak_rss_mb:.1f}MB")
         input_manager.stop()
+        if session_store:
+            session_store.stop()
+            print(f"会话快照: {session_store.get_stats()}, 指纹命中 {image_processor.fingerprint_hits} 次")
+        if image_processor.change_detector:
+            print(f"画面变化检测: {image_processor.change_detector.get_stats()}")
+        if image_processor.shadow:
+            print(f"影子对比: {image_processor.shadow.get_stats()}")
+            image_processor.disable_shadow()
+        if image_processor.dataset_writer:
+            print(f"截图数据集: {image_processor.dataset_writer.get_stats()}")
+            image_processor.disable_dataset()
+        if recorder:
+            recorder.close()
+            print(f"已录制 {recorder.count} 个输入动作: {args.record}")
+        if stage_timer.enabled:
+            stage_timer.stop_periodic_dump()
+            print(f"阶段耗时统计已导出: {stage_timer.dump()}")
+        if trace_collector.enabled:
+            for row in trace_collector.summary():
+                print(f"链路延迟 {row['name']}: {row}")
+            trace_collector.close()
         ui_manager.stop_display()
+        print(f"UI渲染统计: {ui_manager.get_render_stats()}")
+        run_time = time.perf_counter() - ready_time
+        if run_time > 0:
+            cpu_percent = (time.process_time() - ready_cpu) / run_time * 100
+            print(f"运行 {run_time:.1f}s, 平均CPU占用: {cpu_percent:.2f}%")
         print("所有服务已停止，程序已退出")
 
 if __name__ == "__main__":
@@ -5,7 +5,21 @@
 管理器模块
 """
 
-from pubg_assistant.managers.ui_manager import UIManager, CharacterDisplayApp
-from pubg_assistant.managers.input_manager import InputManager, Action
+from pubg_assistant import _lazy
 
-__all__ = ['UIManager', 'InputManager'] 
\ No newline at end of file
+_LAZY_ATTRS = {
+    'UIManager': 'pubg_assistant.managers.ui_manager',
+    'CharacterDisplayApp': 'pubg_assistant.managers.ui_manager',
+    'NullUIManager': 'pubg_assistant.managers.null_ui_manager',
+    'InputManager': 'pubg_assistant.managers.input_manager',
+    'Action': 'pubg_assistant.managers.input_manager',
+    'StateStore': 'pubg_assistant.managers.state_store',
+    'InputRecorder': 'pubg_assistant.managers.input_recorder',
+    'InputReplayer': 'pubg_assistant.managers.input_recorder',
+    'SessionStore': 'pubg_assistant.managers.session_store',
+}
+
+__all__ = ['UIManager', 'NullUIManager', 'InputManager', 'StateStore',
+           'InputRecorder', 'InputReplayer', 'SessionStore']
+
+_lazy.install(globals(), _LAZY_ATTRS)
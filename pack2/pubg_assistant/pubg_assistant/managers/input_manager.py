@@ -7,22 +7,25 @@
 """
 
 import threading
-from queue import Queue
-from pynput import keyboard, mouse
-from pynput.mouse import Button
+from queue import Queue, Empty
+
+from pubg_assistant.metrics.tracing import get_trace_collector
+from pubg_assistant.monitors.resource_monitor import report_thread_time
 
 class Action:
     """动作类"""
     
-    def __init__(self, action_type, param):
+    def __init__(self, action_type, param, trace=None):
         """初始化动作
         
         Args:
             action_type: 动作类型 True为键盘动作 False为鼠标动作
             param: 动作参数
+            trace: 链路追踪记录，未启用追踪时为None
         """
         self.action_type = action_type
         self.param = param
+        self.trace = trace
     
     def get_type(self):
         """获取动作类型
@@ -39,6 +42,14 @@ class Action:
             any: 动作参数
         """
         return self.param
+    
+    def get_trace(self):
+        """获取链路追踪记录
+        
+        Returns:
+            Trace: 追踪记录，可能为None
+        """
+        return self.trace
 
 class InputManager:
     """输入管理器类"""
@@ -56,23 +67,39 @@ class InputManager:
         self.mouse_listener = None
         self.consumer_thread = None
         self.is_running = False
+        self.trace_collector = get_trace_collector()
+        self.recorder = None  # 输入记录器
+        self.dispatcher = None  # 设置后动作交给调度函数而不是放入队列
     
-    def start(self):
-        """启动输入管理器"""
+    def start(self, listen=True, consume=True):
+        """启动输入管理器
+        
+        Args:
+            listen: 是否启动键盘鼠标监听，回放测试时只启动消费者线程
+            consume: 是否启动消费者线程，由异步运行时处理动作时不需要
+        """
         self.is_running = True
         
         # 启动消费者线程
-        self.consumer_thread = threading.Thread(target=self._consumer)
-        self.consumer_thread.daemon = True
-        self.consumer_thread.start()
+        if consume:
+            self.consumer_thread = threading.Thread(target=self._consumer, name="InputManager")
+            self.consumer_thread.daemon = True
+            self.consumer_thread.start()
+        
+        if not listen:
+            return
+        
+        from pynput import keyboard, mouse  # 延迟导入，只在真正监听输入时加载pynput
         
         # 启动键盘监听器
         self.keyboard_listener = keyboard.Listener(on_release=self._on_key_release)
+        self.keyboard_listener.name = "InputKeyboard"
         self.keyboard_listener.daemon = True
         self.keyboard_listener.start()
         
         # 启动鼠标监听器
         self.mouse_listener = mouse.Listener(on_click=self._on_click)
+        self.mouse_listener.name = "InputMouse"
         self.mouse_listener.daemon = True
         self.mouse_listener.start()
     
@@ -99,12 +126,16 @@ class InputManager:
     def _consumer(self):
         """消费者线程"""
         while self.is_running:
+            action = self.action_queue.get()
             try:
-                action = self.action_queue.get()
+                if action.trace:
+                    action.trace.mark("dequeued")
                 self._process_action(action)
-                self.action_queue.task_done()
-            except:
-                pass
+            except Exception as e:
+                print(f"处理动作失败: {e}")
+            finally:
+                self.action_queue.task_done()  # 失败的动作同样计为完成，否则 join 会一直阻塞
+            report_thread_time()  # 供资源监控在没有 /proc 的平台上统计本线程CPU
     
     def _process_action(self, action):
         """处理动作
@@ -115,7 +146,7 @@ class InputManager:
         if hasattr(self, 'action_processor') and self.action_processor:
             if action.get_type():
                 # 键盘动作
-                self.action_processor.handle_keyboard_action(action.get_param())
+                self.action_processor.handle_keyboard_action(action.get_param(), action.get_trace())
             else:
                 # 鼠标动作
                 self.action_processor.handle_mouse_action(action.get_param())
@@ -129,54 +160,88 @@ class InputManager:
         Returns:
             bool: True继续监听，False停止监听
         """
+        from pynput import keyboard
+        
         try:
             if key == keyboard.Key.f1:
                 # 按下F1 将武器设值为0
-                self.action_queue.queue.clear()
-                action = Action(True, 0)
-                self.action_queue.put(action)
+                self.submit_key(0)
                 return True
             
             if key == keyboard.Key.f8:
                 # 按下F8 切换算法
-                self.action_queue.queue.clear()
-                action = Action(True, 8)  # 用8表示切换算法
-                self.action_queue.put(action)
+                self.submit_key(8)  # 用8表示切换算法
+                return True
+            
+            if key == keyboard.Key.f10:
+                # 按下F10 导出阶段耗时统计
+                self.submit_key(10)  # 用10表示导出统计
                 return True
             
             if key == keyboard.Key.f9:
                 # 按下F9 退出程序
-                self.action_queue.queue.clear()
-                action = Action(True, 9)  # 用9表示退出程序
-                self.action_queue.put(action)
+                self.submit_key(9)  # 用9表示退出程序
                 return True
             
             if key == keyboard.Key.num_lock:
                 # 按下numlock 变更numLock状态
-                self.action_queue.queue.clear()
-                action = Action(True, key)
-                self.action_queue.put(action)
+                self.submit_key(key)
                 return True
             
             if hasattr(key, 'char') and key.char == '`':
                 # 按下~ 锁定武器栏
-                self.action_queue.queue.clear()
-                action = Action(True, 4)
-                self.action_queue.put(action)
+                self.submit_key(4)
                 return True
             
             if hasattr(key, 'char') and key.char in ['1', '2']:
                 # 按下1或2 切换武器
-                key_num = int(key.char)
-                self.action_queue.queue.clear()
-                action = Action(True, key_num)
-                self.action_queue.put(action)
+                self.submit_key(int(key.char))
                 return True
         except:
             pass
         
         return True
     
+    def submit_key(self, param):
+        """提交键盘动作，真实监听和回放都通过此方法进入队列
+        
+        Args:
+            param: 动作参数 0/1/2/4/8/9/10 或 num_lock 按键对象
+        """
+        trace = None
+        if param == 1 or param == 2:
+            trace = self.trace_collector.start(f"key_{param}", "key_release")
+        # 导出统计不打断队列中尚未处理的动作，其余按键只保留最新的动作
+        self.put_action(Action(True, param, trace), clear=param != 10)
+    
+    def put_action(self, action, clear=True):
+        """放入动作队列
+        
+        Args:
+            action: 动作对象
+            clear: 是否先清空队列中尚未处理的动作
+        """
+        if self.recorder:
+            self.recorder.record(action)
+        if self.dispatcher:
+            self.dispatcher(action, clear)
+            return
+        if clear:
+            self._clear_pending()
+        if action.trace:
+            action.trace.mark("enqueued")
+        self.action_queue.put(action)
+    
+    def _clear_pending(self):
+        """清空队列中尚未处理的动作，被丢弃的追踪记为 dropped"""
+        while True:
+            try:
+                dropped = self.action_queue.get_nowait()
+            except Empty:
+                break
+            self.action_queue.task_done()
+            self.trace_collector.complete(dropped.trace, "dropped")
+    
     def _on_click(self, x, y, button, pressed):
         """鼠标点击事件处理
         
@@ -186,14 +251,42 @@ class InputManager:
             button: 鼠标按键
             pressed: 是否按下
         """
+        from pynput.mouse import Button
+        
         if Button.x2 == button:
-            if self.posture_monitor:
-                if pressed:
-                    # 按下鼠标侧键X2时开始姿势检测
-                    self.posture_monitor.resume()
-                else:
-                    # 释放鼠标侧键X2时停止姿势检测
-                    self.posture_monitor.pause()
+            self.handle_posture_button(pressed)
+    
+    def handle_posture_button(self, pressed):
+        """处理姿势检测按键（鼠标侧键X2）
+        
+        Args:
+            pressed: 是否按下
+        """
+        if self.recorder:
+            self.recorder.record(Action(False, {"button": "x2", "pressed": pressed}))
+        if self.posture_monitor:
+            if pressed:
+                # 按下鼠标侧键X2时开始姿势检测
+                self.posture_monitor.resume()
+            else:
+                # 释放鼠标侧键X2时停止姿势检测
+                self.posture_monitor.pause()
+    
+    def set_dispatcher(self, dispatcher):
+        """设置动作调度函数，代替动作队列和消费者线程
+        
+        Args:
+            dispatcher: 回调函数，参数为 (动作, 是否清空未处理的动作)，在监听线程中调用；为None时恢复使用队列
+        """
+        self.dispatcher = dispatcher
+    
+    def set_recorder(self, recorder):
+        """设置输入记录器
+        
+        Args:
+            recorder: 输入记录器，为None时停止记录
+        """
+        self.recorder = recorder
     
     def set_action_processor(self, action_processor):
         """设置动作处理器
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+输入录制回放模块
+负责把键盘鼠标动作按时间戳记录为JSON行文件，并按原速或加速回放到输入管理器
+"""
+
+import json
+import time
+import threading
+
+from pubg_assistant.managers.input_manager import Action
+
+class ReplayKey:
+    """回放时代替pynput按键对象的简单按键类"""
+    
+    def __init__(self, name):
+        """初始化回放按键
+        
+        Args:
+            name: 按键名称，如 num_lock
+        """
+        self.name = name
+    
+    def __repr__(self):
+        return f"ReplayKey({self.name!r})"
+
+def _encode_param(param):
+    """把动作参数转换为可写入JSON的值
+    
+    Args:
+        param: 动作参数
+        
+    Returns:
+        any: JSON值
+    """
+    if isinstance(param, (int, dict)):
+        return param
+    if hasattr(param, 'name'):
+        return {"key": param.name}
+    return str(param)
+
+def _decode_param(value):
+    """把JSON值还原为动作参数
+    
+    Args:
+        value: JSON值
+        
+    Returns:
+        any: 动作参数
+    """
+    if isinstance(value, dict) and "key" in value:
+        return ReplayKey(value["key"])
+    return value
+
+class InputRecorder:
+    """输入录制器类，由InputManager在每个动作入队时调用"""
+    
+    def __init__(self, path):
+        """初始化输入录制器
+        
+        Args:
+            path: 录制文件路径（JSON行格式）
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.count = 0
+        self.file = open(path, "w", encoding="utf-8")
+    
+    def record(self, action):
+        """记录一个动作
+        
+        Args:
+            action: 动作对象
+        """
+        line = json.dumps({
+            "t": round(time.monotonic() - self.start_time, 6),
+            "keyboard": action.get_type(),
+            "param": _encode_param(action.get_param()),
+        })
+        with self.lock:
+            if self.file:
+                self.file.write(line + "\n")
+                self.file.flush()
+                self.count += 1
+    
+    def close(self):
+        """关闭录制文件"""
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+class InputReplayer:
+    """输入回放器类，按录制的时间间隔把动作注入输入管理器"""
+    
+    def __init__(self, input_manager, events, speed=1.0):
+        """初始化输入回放器
+        
+        Args:
+            input_manager: 输入管理器
+            events: 事件列表 [(相对时间秒, Action), ...]
+            speed: 回放速度倍数，0表示不等待、尽快回放
+        """
+        self.input_manager = input_manager
+        self.events = events
+        self.speed = speed
+    
+    @staticmethod
+    def load(path):
+        """读取录制文件
+        
+        Args:
+            path: 录制文件路径
+            
+        Returns:
+            list: 事件列表 [(相对时间秒, Action), ...]
+        """
+        events = []
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                events.append((record["t"], Action(record["keyboard"], _decode_param(record["param"]))))
+        return events
+    
+    @staticmethod
+    def key_mash(keys=(1, 2), count=100, interval=0.01):
+        """生成连续快速按键的事件序列
+        
+        Args:
+            keys: 轮流按下的按键
+            count: 按键次数
+            interval: 按键间隔（秒）
+            
+        Returns:
+            list: 事件列表 [(相对时间秒, Action), ...]
+        """
+        return [(i * interval, Action(True, keys[i % len(keys)])) for i in range(count)]
+    
+    def replay(self):
+        """阻塞回放全部事件
+        
+        Returns:
+            int: 回放的事件数
+        """
+        start = time.monotonic()
+        for offset, action in self.events:
+            if self.speed > 0:
+                delay = start + offset / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if action.get_type():
+                self.input_manager.submit_key(action.get_param())
+            else:
+                self.input_manager.handle_posture_button(action.get_param().get("pressed", False))
+        return len(self.events)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+空UI管理器模块
+无界面模式下替代UIManager，不创建窗口，只把状态变化输出到日志
+"""
+
+class NullUIManager:
+    """空UI管理器类，接口与UIManager保持一致"""
+    
+    def __init__(self, log=True):
+        """初始化空UI管理器
+        
+        Args:
+            log: 是否把状态变化输出到控制台
+        """
+        self.log = log
+        self.running = False
+        self.state_store = None
+        self.render_count = 0
+    
+    def bind_state(self, state_store):
+        """绑定状态存储
+        
+        Args:
+            state_store: 状态存储
+        """
+        self.state_store = state_store
+        state_store.subscribe(self._on_state_changed)
+    
+    def _on_state_changed(self, version, state):
+        """状态变化回调
+        
+        Args:
+            version: 状态版本号
+            state: 状态快照
+        """
+        self.render_count += 1
+        if self.log:
+            print(f"[状态 v{version}] {state}")
+    
+    def refresh(self):
+        """刷新显示，无界面模式下不做任何事
+        
+        Returns:
+            bool: 始终为False
+        """
+        return False
+    
+    def start_display(self, initial_character="启动", x=1560, y=1370):
+        """启动显示
+        
+        Args:
+            initial_character: 初始显示字符
+            x: 窗口x坐标（忽略）
+            y: 窗口y坐标（忽略）
+        """
+        self.running = True
+        if self.log:
+            print(f"[无界面模式] {initial_character}")
+    
+    def update_display(self, gun_lock, gun_name, posture, gun_config):
+        """更新显示（忽略）"""
+        pass
+    
+    def update_display_with_algorithm(self, gun_lock, gun_name, posture, gun_config, use_template):
+        """更新显示（忽略）"""
+        pass
+    
+    def get_render_stats(self):
+        """获取渲染统计
+        
+        Returns:
+            dict: 状态变化次数
+        """
+        return {"renders": self.render_count}
+    
+    def stop_display(self):
+        """停止显示"""
+        self.running = False
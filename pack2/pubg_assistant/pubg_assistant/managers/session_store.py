@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+会话状态存储模块
+把武器栏、锁定、姿势、最近使用统计和武器区域截图指纹保存为紧凑的快照，
+状态变化时由后台线程合并写入，重启后加载，避免每个会话开头的按键都重新完整识别
+"""
+
+import os
+import json
+import threading
+
+class SessionStore:
+    """会话快照存储类，短时间内的多次变化只写入最后一次"""
+
+    VERSION = 1
+
+    def __init__(self, path=None, delay=0.5):
+        """初始化会话快照存储
+
+        Args:
+            path: 快照文件路径，为空时使用资源目录下的 session/session.json
+            delay: 收到变化后等待合并的时间（秒）
+        """
+        if not path:
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            path = os.path.join(base_dir, "resources", "session", "session.json")
+        self.path = path
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.pending = None  # 尚未写入的最新快照
+        self.changed = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.scheduled = 0
+        self.written = 0
+        self.failed = 0
+
+    def load(self):
+        """读取上次会话的快照
+
+        Returns:
+            dict: 快照内容，文件不存在、损坏或版本不符时为None
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except Exception as e:
+            print(f"读取会话快照失败: {e}")
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("version") != self.VERSION:
+            print(f"会话快照版本不符，忽略: {self.path}")
+            return None
+        return snapshot
+
+    def start(self):
+        """启动后台写入线程"""
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._worker, name="SessionStore")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """停止后台写入线程，并同步写入尚未保存的快照"""
+        self.stop_event.set()
+        self.changed.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        self.flush()
+
+    def schedule(self, state):
+        """提交最新状态，只替换待写入的快照，不阻塞调用线程
+
+        Args:
+            state: 会话状态字典，提交后调用方不应再修改
+        """
+        with self.lock:
+            self.pending = state
+            self.scheduled += 1
+        self.changed.set()
+
+    def flush(self):
+        """立即写入待写入的快照
+
+        Returns:
+            bool: 是否写入了文件
+        """
+        with self.lock:
+            state, self.pending = self.pending, None
+        if state is None:
+            return False
+        snapshot = dict(state)
+        snapshot["version"] = self.VERSION
+        # 先写临时文件再替换，进程在写入过程中退出也不会留下损坏的快照
+        temp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(snapshot, file, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            self.failed += 1
+            print(f"写入会话快照失败: {e}")
+            return False
+        self.written += 1
+        return True
+
+    def _worker(self):
+        """后台写入线程主循环"""
+        while not self.stop_event.is_set():
+            self.changed.wait()
+            self.changed.clear()
+            if self.stop_event.wait(self.delay):  # 等待期间的变化合并为一次写入
+                break
+            self.flush()
+
+    def get_stats(self):
+        """获取写入统计
+
+        Returns:
+            dict: 提交次数、实际写入次数、被合并的次数和失败次数
+        """
+        return {
+            "path": self.path,
+            "scheduled": self.scheduled,
+            "written": self.written,
+            "coalesced": max(0, self.scheduled - self.written - self.failed),
+            "failed": self.failed,
+        }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+状态存储模块
+负责保存覆盖层需要显示的状态，并在状态变化时通知订阅者
+"""
+
+import threading
+
+class StateStore:
+    """可观察的状态存储类，每次变化递增版本号"""
+
+    FIELDS = ('gun_lock', 'gun', 'posture', 'gun_config', 'algorithm', 'alert')
+
+    def __init__(self):
+        """初始化状态存储"""
+        self.lock = threading.Lock()
+        self.version = 0
+        self.state = {
+            'gun_lock': 0,  # 武器锁定 0 未锁定 1 锁定
+            'gun': "",  # 当前武器名称
+            'posture': 1,  # 姿势 1为站立 其他为蹲下
+            'gun_config': True,  # 武器配置 True为裸配 False为满配
+            'algorithm': "orb",  # 当前使用的匹配算法
+            'alert': "",  # 资源超出预算的提示，为空时不显示
+        }
+        self.listeners = []
+
+    def update(self, **changes):
+        """更新状态，只有值真正变化时才递增版本号并通知订阅者
+
+        Args:
+            **changes: 需要更新的状态字段
+
+        Returns:
+            bool: 状态是否发生变化
+        """
+        for key in changes:
+            if key not in self.state:
+                raise KeyError(f"未知的状态字段: {key}")
+
+        with self.lock:
+            changed = {key: value for key, value in changes.items() if self.state[key] != value}
+            if not changed:
+                return False
+            self.state.update(changed)
+            self.version += 1
+            version = self.version
+            snapshot = dict(self.state)
+            listeners = list(self.listeners)
+
+        # 在锁外通知，避免订阅者回调中再次修改状态导致死锁
+        for listener in listeners:
+            try:
+                listener(version, snapshot)
+            except Exception as e:
+                print(f"状态通知失败: {e}")
+        return True
+
+    def snapshot(self):
+        """获取状态快照
+
+        Returns:
+            tuple: (版本号, 状态字典副本)
+        """
+        with self.lock:
+            return self.version, dict(self.state)
+
+    def get_version(self):
+        """获取当前版本号
+
+        Returns:
+            int: 版本号
+        """
+        return self.version
+
+    def get(self, key):
+        """获取单个状态字段
+
+        Args:
+            key: 状态字段名
+
+        Returns:
+            any: 状态值
+        """
+        with self.lock:
+            return self.state[key]
+
+    def subscribe(self, listener):
+        """订阅状态变化
+
+        Args:
+            listener: 回调函数，参数为 (版本号, 状态快照)
+        """
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """取消订阅状态变化
+
+        Args:
+            listener: 之前订阅的回调函数
+        """
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
@@ -6,9 +6,12 @@ UI管理器模块
 负责管理程序的用户界面
 """
 
-import tkinter as tk
+import threading
 import time
 import os
+from queue import Queue, Empty
+
+from pubg_assistant.monitors.resource_monitor import report_thread_time
 
 class CharacterDisplayApp:
     """字符显示应用类"""
@@ -21,6 +24,8 @@ class CharacterDisplayApp:
             x: 窗口x坐标
             y: 窗口y坐标
         """
+        import tkinter as tk  # 延迟导入，无界面模式下不加载tkinter
+        
         self.root = tk.Tk()
         self.root.title("Character Display")
         
@@ -62,8 +67,7 @@ class CharacterDisplayApp:
         """
         try:
             self.label.config(text=new_character)
-            self.root.update_idletasks()
-            self.root.update()
+            self.root.update_idletasks()  # 在UI线程内完成本帧的重绘
         except:
             pass  # 忽略更新失败
     
@@ -75,15 +79,105 @@ class CharacterDisplayApp:
             pass  # 忽略销毁失败
 
 class UIManager:
-    """UI管理器类"""
+    """UI管理器类，在独立线程中运行Tk主循环"""
     
-    def __init__(self):
-        """初始化UI管理器"""
+    def __init__(self, fps=30):
+        """初始化UI管理器
+        
+        Args:
+            fps: 最大刷新帧率
+        """
         self.app = None
         self.running = False
+        self.state_store = None
+        self.rendered_version = -1  # 已提交渲染的状态版本号
+        
+        self.frame_interval = max(1, int(1000 / fps))  # 每帧间隔（毫秒）
+        self.pending = Queue()  # 待渲染的显示字符
+        self.ui_thread = None
+        self.ready = threading.Event()
+        self.stop_requested = False
+        self.drain_lock = threading.Lock()
+        self.drain_scheduled = False  # 是否已安排渲染，未安排时UI线程空闲，不定时唤醒
+        
+        # 渲染统计
+        self.render_count = 0
+        self.collapsed_count = 0  # 同一帧内被合并的更新次数
+        self.render_time_total = 0.0
+        self.render_time_max = 0.0
+        self.render_time_last = 0.0
+    
+    def bind_state(self, state_store):
+        """绑定状态存储，状态变化时自动提交渲染
+        
+        Args:
+            state_store: 状态存储
+        """
+        self.state_store = state_store
+        self.rendered_version = -1
+        state_store.subscribe(self._on_state_changed)
+    
+    def _on_state_changed(self, version, state):
+        """状态变化回调，可能在任意线程中被调用
+        
+        Args:
+            version: 状态版本号
+            state: 状态快照
+        """
+        self.rendered_version = version
+        self._post(self._format_status(state))
+    
+    def refresh(self):
+        """提交渲染，仅在状态版本变化时生效
+        
+        Returns:
+            bool: 是否提交了渲染
+        """
+        if not self.running or not self.state_store:
+            return False
+        if self.state_store.get_version() == self.rendered_version:
+            return False
+        
+        version, state = self.state_store.snapshot()
+        self._on_state_changed(version, state)
+        return True
+    
+    def _format_status(self, state):
+        """根据状态生成显示字符
+        
+        Args:
+            state: 状态字典
+            
+        Returns:
+            str: 显示字符
+        """
+        gun_status = "锁" if state['gun_lock'] == 1 else "解"
+        posture_status = "站" if state['posture'] == 1 else "蹲"
+        full_status = "满" if state['gun_config'] else "裸"
+        # 默认的ORB引擎不显示，其他引擎显示名称
+        method_status = "" if state['algorithm'] == "orb" else f"|{state['algorithm']}"
+        alert_status = f"|超:{state['alert']}" if state.get('alert') else ""
+        return f"{gun_status}|{full_status}|{posture_status}{method_status}|{state['gun']}{alert_status}"
     
     def start_display(self, initial_character="启动", x=1560, y=1370):
-        """启动显示
+        """启动显示线程
+        
+        Args:
+            initial_character: 初始显示字符
+            x: 窗口x坐标
+            y: 窗口y坐标
+        """
+        self.stop_requested = False
+        self.ready.clear()
+        self.ui_thread = threading.Thread(
+            target=self._ui_loop, args=(initial_character, x, y), name="UIManager"
+        )
+        self.ui_thread.daemon = True
+        self.ui_thread.start()
+        self.ready.wait(timeout=5)
+    
+    def _ui_loop(self, initial_character, x, y):
+        """UI线程主循环，绘制都在此线程中完成
         
         Args:
             initial_character: 初始显示字符
@@ -93,10 +187,101 @@ class UIManager:
         try:
             # 创建显示应用
             self.app = CharacterDisplayApp(initial_character, x, y)
+            # 先安排一次渲染，处理主循环启动前提交的更新，此前提交的线程不需要跨线程唤醒
+            self.drain_scheduled = True
+            self.app.root.after_idle(self._drain)
             self.running = True
         except Exception as e:
             print(f"启动UI显示失败: {e}")
             self.running = False
+            return
+        finally:
+            self.ready.set()
+        
+        try:
+            self.app.root.mainloop()
+        finally:
+            self.app.destroy()
+            self.app = None
+            self.running = False
+    
+    def _drain(self):
+        """取出队列中的全部更新，只渲染最后一条；队列为空时不再安排下一次，UI线程保持空闲"""
+        if self.stop_requested:
+            self.app.root.quit()
+            return
+        
+        latest = None
+        count = 0
+        while True:
+            try:
+                latest = self.pending.get_nowait()
+                count += 1
+            except Empty:
+                break
+        
+        if count:
+            self.collapsed_count += count - 1
+            start = time.perf_counter()
+            self.app.update_character(latest)
+            elapsed = time.perf_counter() - start
+            self.render_count += 1
+            self.render_time_total += elapsed
+            self.render_time_last = elapsed
+            self.render_time_max = max(self.render_time_max, elapsed)
+            report_thread_time()  # 供资源监控在没有 /proc 的平台上统计本线程CPU
+            # 隔一帧再检查一次，把这一帧内陆续到达的更新合并为一次渲染
+            self.app.root.after(self.frame_interval, self._drain)
+            return
+        
+        with self.drain_lock:
+            if self.pending.empty():
+                self.drain_scheduled = False
+                return
+        self.app.root.after_idle(self._drain)  # 检查队列后又有更新到达
+    
+    def _schedule_drain(self):
+        """UI线程空闲时安排一次渲染，已安排时不重复，可能在任意线程中被调用
+        
+        tkinter 会把其他线程中的调用转交给UI线程执行
+        """
+        app = self.app
+        if app is None:
+            return
+        with self.drain_lock:
+            if self.drain_scheduled:
+                return
+            self.drain_scheduled = True
+        try:
+            app.root.after_idle(self._drain)
+        except Exception:
+            with self.drain_lock:
+                self.drain_scheduled = False  # 窗口已销毁
+    
+    def _post(self, new_character):
+        """提交显示字符，由UI线程在下一帧渲染
+        
+        Args:
+            new_character: 新的显示字符
+        """
+        if self.running:
+            self.pending.put(new_character)
+            self._schedule_drain()
+    
+    def get_render_stats(self):
+        """获取渲染统计
+        
+        Returns:
+            dict: 渲染次数、合并次数及渲染耗时（毫秒）
+        """
+        avg = self.render_time_total / self.render_count if self.render_count else 0.0
+        return {
+            "renders": self.render_count,
+            "collapsed": self.collapsed_count,
+            "avg_ms": avg * 1000,
+            "max_ms": self.render_time_max * 1000,
+            "last_ms": self.render_time_last * 1000,
+        }
     
     def update_display(self, gun_lock, gun_name, posture, gun_config):
         """更新显示
@@ -107,18 +292,7 @@ class UIManager:
             posture: 姿势状态，1为站立，其他为蹲下
             gun_config: 武器配置状态，True为裸配，False为满配
         """
-        if not self.app or not self.running:
-            return
-            
-        gun_status = "锁" if gun_lock == 1 else "解"
-        posture_status = "站" if posture == 1 else "蹲"
-        full_status = "满" if  gun_config else "裸"
-        new_character = f"{gun_status}|{full_status}|{posture_status}|{gun_name}"
-        
-        try:
-            self.app.update_character(new_character)
-        except:
-            pass  # 忽略更新失败
+        self.update_display_with_algorithm(gun_lock, gun_name, posture, gun_config, False)
     
     def update_display_with_algorithm(self, gun_lock, gun_name, posture, gun_config, use_template):
         """更新显示（带算法指示）
@@ -130,26 +304,18 @@ class UIManager:
             gun_config: 武器配置状态，True为裸配，False为满配
             use_template: 是否使用模板匹配算法
         """
-        if not self.app or not self.running:
-            return
-            
-        gun_status = "锁" if gun_lock == 1 else "解"
-        posture_status = "站" if posture == 1 else "蹲"
-        full_status = "满" if gun_config else "裸"
-        method_status = "" if not use_template  else "|"
-        new_character = f"{gun_status}|{full_status}|{posture_status}{method_status}|{gun_name}"
-        
-        try:
-            self.app.update_character(new_character)
-        except:
-            pass  # 忽略更新失败
+        self._post(self._format_status({
+            'gun_lock': gun_lock,
+            'gun': gun_name,
+            'posture': posture,
+            'gun_config': gun_config,
+            'algorithm': "template" if use_template else "orb",
+        }))
     
     def stop_display(self):
         """停止显示界面"""
-        try:
-            if self.app:
-                self.app.destroy()
-                self.app = None
-            self.running = False
-        except:
-            pass  # 忽略停止失败 
\ No newline at end of file
+        self.stop_requested = True
+        self._schedule_drain()  # 空闲的UI线程没有定时任务，需要唤醒它检查退出
+        if self.ui_thread and self.ui_thread is not threading.current_thread():
+            self.ui_thread.join(timeout=2)
+        self.ui_thread = None
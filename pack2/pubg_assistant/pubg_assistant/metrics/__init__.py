@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Metrics modules for PUBG Assistant
+"""
+
+from pubg_assistant import _lazy
+
+_LAZY_ATTRS = {
+    'LatencyHistogram': 'pubg_assistant.metrics.latency_histogram',
+    'StageTimer': 'pubg_assistant.metrics.stage_timer',
+    'get_stage_timer': 'pubg_assistant.metrics.stage_timer',
+    'Trace': 'pubg_assistant.metrics.tracing',
+    'TraceCollector': 'pubg_assistant.metrics.tracing',
+    'get_trace_collector': 'pubg_assistant.metrics.tracing',
+}
+
+__all__ = ['LatencyHistogram', 'StageTimer', 'get_stage_timer',
+           'Trace', 'TraceCollector', 'get_trace_collector']
+
+_lazy.install(globals(), _LAZY_ATTRS)
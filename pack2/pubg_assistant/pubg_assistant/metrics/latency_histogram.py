@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+延迟直方图模块
+固定大小的HDR风格直方图：按2的幂次分段，每段再线性细分，相对误差约为 1/SUB_BUCKETS
+"""
+
+import threading
+
+class LatencyHistogram:
+    """延迟直方图类，以微秒为单位记录数值"""
+
+    SUB_BUCKET_BITS = 4  # 每个2的幂次细分为16个桶，相对误差约6%
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    MAGNITUDES = 28  # 覆盖 1us ~ 2^28us（约268秒）
+
+    def __init__(self, name=""):
+        """初始化延迟直方图
+
+        Args:
+            name: 直方图名称
+        """
+        self.name = name
+        self.lock = threading.Lock()
+        self.counts = [0] * (self.SUB_BUCKETS * (self.MAGNITUDES + 1))
+        self.total = 0
+        self.sum_us = 0.0
+        self.min_us = None
+        self.max_us = 0.0
+
+    def _bucket_index(self, value_us):
+        """计算数值所在的桶
+
+        Args:
+            value_us: 数值（微秒）
+
+        Returns:
+            int: 桶索引
+        """
+        value = int(value_us)
+        if value < self.SUB_BUCKETS:
+            return max(value, 0)
+        magnitude = value.bit_length() - self.SUB_BUCKET_BITS - 1
+        sub_bucket = value >> magnitude  # 范围 [SUB_BUCKETS, 2*SUB_BUCKETS)
+        index = magnitude * self.SUB_BUCKETS + sub_bucket
+        return min(index, len(self.counts) - 1)
+
+    def _bucket_value(self, index):
+        """计算桶的代表值（桶上界）
+
+        Args:
+            index: 桶索引
+
+        Returns:
+            int: 代表值（微秒）
+        """
+        if index < self.SUB_BUCKETS:
+            return index
+        magnitude, sub_bucket = divmod(index, self.SUB_BUCKETS)
+        return ((sub_bucket + self.SUB_BUCKETS + 1) << (magnitude - 1)) - 1
+
+    def record(self, value_us):
+        """记录一个数值
+
+        Args:
+            value_us: 数值（微秒）
+        """
+        index = self._bucket_index(value_us)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum_us += value_us
+            if self.min_us is None or value_us < self.min_us:
+                self.min_us = value_us
+            if value_us > self.max_us:
+                self.max_us = value_us
+
+    def record_seconds(self, seconds):
+        """以秒为单位记录一个数值
+
+        Args:
+            seconds: 数值（秒）
+        """
+        self.record(seconds * 1000000)
+
+    def percentile(self, percent):
+        """计算百分位数
+
+        Args:
+            percent: 百分位，0~100
+
+        Returns:
+            float: 百分位数（微秒），无数据时为0
+        """
+        with self.lock:
+            if self.total == 0:
+                return 0.0
+            target = max(1, int(round(self.total * percent / 100.0)))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return float(min(self._bucket_value(index), self.max_us))
+            return self.max_us
+
+    def merge(self, other):
+        """合并另一个直方图的数据
+
+        Args:
+            other: 另一个LatencyHistogram
+        """
+        with other.lock:
+            counts = list(other.counts)
+            total, sum_us, min_us, max_us = other.total, other.sum_us, other.min_us, other.max_us
+        with self.lock:
+            for index, count in enumerate(counts):
+                self.counts[index] += count
+            self.total += total
+            self.sum_us += sum_us
+            if min_us is not None and (self.min_us is None or min_us < self.min_us):
+                self.min_us = min_us
+            self.max_us = max(self.max_us, max_us)
+
+    def reset(self):
+        """清空数据"""
+        with self.lock:
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+            self.sum_us = 0.0
+            self.min_us = None
+            self.max_us = 0.0
+
+    def get_count(self):
+        """获取记录次数
+
+        Returns:
+            int: 记录次数
+        """
+        return self.total
+
+    def to_dict(self):
+        """导出统计摘要
+
+        Returns:
+            dict: 次数、平均值及常用百分位（毫秒）
+        """
+        mean_us = self.sum_us / self.total if self.total else 0.0
+        return {
+            "name": self.name,
+            "count": self.total,
+            "mean_ms": round(mean_us / 1000, 3),
+            "min_ms": round((self.min_us or 0.0) / 1000, 3),
+            "p50_ms": round(self.percentile(50) / 1000, 3),
+            "p90_ms": round(self.percentile(90) / 1000, 3),
+            "p99_ms": round(self.percentile(99) / 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3),
+        }
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+阶段计时模块
+为识别流程的各个阶段记录耗时直方图，可导出为JSON或CSV
+未启用时 stage() 返回共享的空上下文，开销只有一次方法调用
+"""
+
+import os
+import csv
+import json
+import time
+import threading
+
+from pubg_assistant.metrics.latency_histogram import LatencyHistogram
+
+class _NullStage:
+    """未启用计时时使用的空上下文"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    """单次阶段计时上下文"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.histogram.record_seconds(time.perf_counter() - self.start)
+        return False
+
+class StageTimer:
+    """阶段计时器类，按阶段名称维护延迟直方图"""
+
+    def __init__(self, enabled=False, dump_path=None):
+        """初始化阶段计时器
+
+        Args:
+            enabled: 是否启用计时
+            dump_path: 默认导出路径，为空时导出到 resources/stats/stage_stats.json
+        """
+        self.enabled = enabled
+        if dump_path is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            dump_path = os.path.join(base_dir, "resources", "stats", "stage_stats.json")
+        self.dump_path = dump_path
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.gauges = {}  # {名称: 返回统计字典的函数}，随JSON导出
+        self.dump_thread = None
+        self.dump_stop = threading.Event()
+
+    def enable(self, enabled=True):
+        """启用或禁用计时
+
+        Args:
+            enabled: 是否启用
+        """
+        self.enabled = enabled
+
+    def get_histogram(self, name):
+        """获取阶段对应的直方图，不存在时创建
+
+        Args:
+            name: 阶段名称
+
+        Returns:
+            LatencyHistogram: 延迟直方图
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram(name))
+        return histogram
+
+    def stage(self, name):
+        """获取阶段计时上下文
+
+        Args:
+            name: 阶段名称
+
+        Returns:
+            上下文管理器，with 块结束时记录耗时
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self.get_histogram(name))
+
+    def record(self, name, seconds):
+        """直接记录阶段耗时
+
+        Args:
+            name: 阶段名称
+            seconds: 耗时（秒）
+        """
+        if self.enabled:
+            self.get_histogram(name).record_seconds(seconds)
+
+    def register_gauge(self, name, getter):
+        """注册随统计一起导出的指标（如跳过比例），导出时调用 getter 取当前值
+
+        Args:
+            name: 指标名称
+            getter: 无参数函数，返回可序列化为JSON的统计
+        """
+        with self.lock:
+            self.gauges[name] = getter
+
+    def summary(self):
+        """获取全部阶段的统计摘要
+
+        Returns:
+            list: 各阶段统计字典，按名称排序
+        """
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+        return [histogram.to_dict() for _, histogram in histograms]
+
+    def reset(self):
+        """清空全部统计"""
+        with self.lock:
+            histograms = list(self.histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+    def dump(self, path=None):
+        """导出统计到文件，根据扩展名选择JSON或CSV格式
+
+        Args:
+            path: 文件路径，.csv 结尾时导出CSV，否则导出JSON；为空时使用默认导出路径
+
+        Returns:
+            str: 实际写入的文件路径
+        """
+        path = path if path else self.dump_path
+        rows = self.summary()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if path.endswith(".csv"):
+            fields = ["name", "count", "mean_ms", "min_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+            with open(path, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with self.lock:
+                gauges = dict(self.gauges)
+            data = {"timestamp": time.time(), "stages": rows}
+            if gauges:
+                data["gauges"] = {name: getter() for name, getter in gauges.items()}
+            with open(path, "w") as file:
+                json.dump(data, file, ensure_ascii=False, indent=2)
+        return path
+
+    def start_periodic_dump(self, interval=60, path=None):
+        """启动定时导出线程
+
+        Args:
+            interval: 导出间隔（秒）
+            path: 导出文件路径，为空时使用默认导出路径
+        """
+        if self.dump_thread:
+            return
+        self.dump_stop.clear()
+        self.dump_thread = threading.Thread(
+            target=self._periodic_dump, args=(path, interval), name="StageTimerDump"
+        )
+        self.dump_thread.daemon = True
+        self.dump_thread.start()
+
+    def _periodic_dump(self, path, interval):
+        """定时导出线程主循环
+
+        Args:
+            path: 导出文件路径
+            interval: 导出间隔（秒）
+        """
+        while not self.dump_stop.wait(interval):
+            try:
+                self.dump(path)
+            except Exception as e:
+                print(f"导出阶段统计失败: {e}")
+
+    def stop_periodic_dump(self):
+        """停止定时导出线程"""
+        self.dump_stop.set()
+        if self.dump_thread:
+            self.dump_thread.join(timeout=2)
+            self.dump_thread = None
+
+_default_timer = StageTimer()
+
+def get_stage_timer():
+    """获取全局默认阶段计时器
+
+    Returns:
+        StageTimer: 全局阶段计时器
+    """
+    return _default_timer
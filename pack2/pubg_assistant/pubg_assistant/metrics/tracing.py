@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+链路追踪模块
+为每个输入事件分配追踪ID，在各环节记录单调时间戳，汇总为分环节和总延迟分布
+完成的追踪以JSON行写入滚动日志文件
+"""
+
+import os
+import json
+import time
+import logging
+import itertools
+import threading
+from logging.handlers import RotatingFileHandler
+
+from pubg_assistant.metrics.latency_histogram import LatencyHistogram
+
+_trace_ids = itertools.count(1)
+
+class Trace:
+    """单个输入事件的追踪记录"""
+
+    __slots__ = ("trace_id", "name", "marks", "outcome")
+
+    def __init__(self, name):
+        """初始化追踪记录
+
+        Args:
+            name: 事件名称，如 key_1
+        """
+        self.trace_id = next(_trace_ids)
+        self.name = name
+        self.marks = []
+        self.outcome = ""
+
+    def mark(self, hop):
+        """记录经过某个环节的时间点
+
+        Args:
+            hop: 环节名称
+        """
+        self.marks.append((hop, time.monotonic_ns()))
+
+    def hops(self):
+        """计算相邻环节之间的耗时
+
+        Returns:
+            list: [(上一环节->本环节, 耗时us), ...]
+        """
+        result = []
+        for (prev_hop, prev_ns), (hop, ns) in zip(self.marks, self.marks[1:]):
+            result.append((f"{prev_hop}->{hop}", (ns - prev_ns) / 1000))
+        return result
+
+    def total_us(self):
+        """计算首尾环节之间的总耗时
+
+        Returns:
+            float: 总耗时（微秒）
+        """
+        if len(self.marks) < 2:
+            return 0.0
+        return (self.marks[-1][1] - self.marks[0][1]) / 1000
+
+    def to_dict(self):
+        """导出为字典
+
+        Returns:
+            dict: 追踪记录
+        """
+        return {
+            "id": self.trace_id,
+            "name": self.name,
+            "outcome": self.outcome,
+            "total_us": round(self.total_us(), 1),
+            "marks": [[hop, ns] for hop, ns in self.marks],
+        }
+
+class TraceCollector:
+    """追踪汇总类，负责聚合延迟分布并写入滚动追踪文件"""
+
+    def __init__(self, enabled=False, trace_path=None, max_bytes=1024 * 1024, backup_count=5):
+        """初始化追踪汇总器
+
+        Args:
+            enabled: 是否启用追踪
+            trace_path: 追踪文件路径，为空时写入 resources/stats/traces.jsonl
+            max_bytes: 单个追踪文件的最大字节数
+            backup_count: 保留的历史追踪文件个数
+        """
+        self.enabled = enabled
+        if trace_path is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            trace_path = os.path.join(base_dir, "resources", "stats", "traces.jsonl")
+        self.trace_path = trace_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.logger = None
+
+    def enable(self, enabled=True):
+        """启用或禁用追踪
+
+        Args:
+            enabled: 是否启用
+        """
+        self.enabled = enabled
+
+    def start(self, name, hop="start"):
+        """开始一次追踪
+
+        Args:
+            name: 事件名称
+            hop: 第一个环节名称
+
+        Returns:
+            Trace: 追踪记录，未启用时为None
+        """
+        if not self.enabled:
+            return None
+        trace = Trace(name)
+        trace.mark(hop)
+        return trace
+
+    def complete(self, trace, outcome=""):
+        """完成一次追踪，汇总延迟并写入追踪文件
+
+        Args:
+            trace: 追踪记录，为None时忽略
+            outcome: 追踪结果，如 written / unchanged / not_detected
+        """
+        if trace is None:
+            return
+        trace.outcome = outcome
+        for hop, elapsed_us in trace.hops():
+            self._histogram(hop).record(elapsed_us)
+        self._histogram(f"total.{outcome}" if outcome else "total").record(trace.total_us())
+
+        try:
+            self._get_logger().info(json.dumps(trace.to_dict(), ensure_ascii=False))
+        except Exception as e:
+            print(f"写入追踪文件失败: {e}")
+
+    def _histogram(self, name):
+        """获取环节对应的直方图，不存在时创建
+
+        Args:
+            name: 环节名称
+
+        Returns:
+            LatencyHistogram: 延迟直方图
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram(name))
+        return histogram
+
+    def _get_logger(self):
+        """获取写入追踪文件的日志器，首次使用时创建
+
+        Returns:
+            logging.Logger: 日志器
+        """
+        if self.logger is None:
+            with self.lock:
+                if self.logger is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.trace_path)), exist_ok=True)
+                    handler = RotatingFileHandler(
+                        self.trace_path, maxBytes=self.max_bytes,
+                        backupCount=self.backup_count, encoding="utf-8"
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger = logging.getLogger(f"pubg_assistant.trace.{id(self)}")
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    logger.addHandler(handler)
+                    self.logger = logger
+        return self.logger
+
+    def summary(self):
+        """获取各环节及总延迟的统计摘要
+
+        Returns:
+            list: 各环节统计字典，按名称排序
+        """
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+        return [histogram.to_dict() for _, histogram in histograms]
+
+    def close(self):
+        """关闭追踪文件"""
+        if self.logger:
+            for handler in list(self.logger.handlers):
+                handler.close()
+                self.logger.removeHandler(handler)
+            self.logger = None
+
+_default_collector = TraceCollector()
+
+def get_trace_collector():
+    """获取全局默认追踪汇总器
+
+    Returns:
+        TraceCollector: 全局追踪汇总器
+    """
+    return _default_collector
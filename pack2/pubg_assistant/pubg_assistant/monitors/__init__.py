@@ -5,6 +5,17 @@
 Monitoring modules for PUBG Assistant
 """
 
-# 监控器模块初始化文件 
+# 监控器模块初始化文件
 
-from pubg_assistant.monitors.posture_monitor import PostureMonitor 
\ No newline at end of file
+from pubg_assistant import _lazy
+
+_LAZY_ATTRS = {
+    'PostureMonitor': 'pubg_assistant.monitors.posture_monitor',
+    'TemplateWatcher': 'pubg_assistant.monitors.template_watcher',
+    'ResourceMonitor': 'pubg_assistant.monitors.resource_monitor',
+    'ChangeDetector': 'pubg_assistant.monitors.change_detector',
+}
+
+__all__ = ['PostureMonitor', 'TemplateWatcher', 'ResourceMonitor', 'ChangeDetector']
+
+_lazy.install(globals(), _LAZY_ATTRS)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+画面变化检测模块
+把截图区域缩小为缩略图，与该区域上次变化时的缩略图比较平均绝对差，
+未超过该区域的灵敏度时认为画面没有变化，武器识别可以直接沿用上次结果
+"""
+
+import threading
+
+import cv2 as cv
+
+from pubg_assistant.processors.buffer_pool import BufferPool
+
+class ChangeDetector:
+    """画面变化检测类，各区域按名称分别记录参考缩略图和跳过次数"""
+
+    def __init__(self, threshold=3.0, size=(32, 16)):
+        """初始化画面变化检测器
+
+        Args:
+            threshold: 默认灵敏度，缩略图平均绝对差（0~255）不超过此值时认为没有变化
+            size: 缩略图尺寸 (宽, 高)，区域比缩略图小时使用原尺寸
+        """
+        self.threshold = threshold
+        self.size = size
+        self.sensitivity = {}  # {区域名称: 灵敏度}
+        self.references = {}  # {区域名称: 上次变化时的缩略图}
+        self.checks = {}
+        self.skips = {}
+        self.lock = threading.Lock()
+        self.buffers = BufferPool()
+
+    def configure(self, name, threshold):
+        """设置单个区域的灵敏度
+
+        Args:
+            name: 区域名称
+            threshold: 平均绝对差阈值，0表示只有完全相同才认为没有变化
+        """
+        self.sensitivity[name] = threshold
+
+    def _thumbnail(self, name, roi):
+        """把截图区域缩小为缩略图，结果写入缓冲区
+
+        Args:
+            name: 区域名称
+            roi: 截图区域数组
+
+        Returns:
+            ndarray: 缩略图，下次检测同一区域时会被覆盖
+        """
+        height, width = roi.shape[:2]
+        thumb_width, thumb_height = min(width, self.size[0]), min(height, self.size[1])
+        if (thumb_width, thumb_height) == (width, height):
+            return roi
+        dst = self.buffers.get(f"change.{name}", (thumb_height, thumb_width) + roi.shape[2:])
+        return cv.resize(roi, (thumb_width, thumb_height), dst=dst, interpolation=cv.INTER_AREA)
+
+    def changed(self, name, roi):
+        """判断区域与上次变化时相比是否发生变化，发生变化时更新参考缩略图
+
+        只在变化时更新参考，缓慢的渐变累积到超过灵敏度后同样会被检测到
+
+        Args:
+            name: 区域名称
+            roi: 截图区域数组
+
+        Returns:
+            bool: 是否变化，首次检测的区域视为变化
+        """
+        thumb = self._thumbnail(name, roi)
+        with self.lock:
+            self.checks[name] = self.checks.get(name, 0) + 1
+            reference = self.references.get(name)
+            if reference is not None and reference.shape == thumb.shape:
+                difference = cv.norm(thumb, reference, cv.NORM_L1) / thumb.size
+                if difference <= self.sensitivity.get(name, self.threshold):
+                    self.skips[name] = self.skips.get(name, 0) + 1
+                    return False
+            if reference is not None and reference.shape == thumb.shape:
+                reference[...] = thumb
+            else:
+                self.references[name] = thumb.copy()
+            return True
+
+    def reset(self, name=None):
+        """清除参考缩略图，下次检测视为变化
+
+        Args:
+            name: 区域名称，为空时清除全部区域
+        """
+        with self.lock:
+            if name is None:
+                self.references = {}
+            else:
+                self.references.pop(name, None)
+
+    def get_stats(self):
+        """获取各区域的检测次数和跳过比例
+
+        Returns:
+            dict: {区域名称: {checks, skipped, skip_rate}}
+        """
+        with self.lock:
+            return {
+                name: {
+                    "checks": checks,
+                    "skipped": self.skips.get(name, 0),
+                    "skip_rate": round(self.skips.get(name, 0) / checks, 4) if checks else 0.0,
+                }
+                for name, checks in sorted(self.checks.items())
+            }
@@ -9,6 +9,8 @@
 import threading
 import time
 
+from pubg_assistant.monitors.resource_monitor import report_thread_time
+
 class PostureMonitor(threading.Thread):
     """姿势监控线程，负责监控玩家姿势状态"""
     
@@ -20,7 +22,7 @@ class PostureMonitor(threading.Thread):
             config_manager: 配置管理器
             action_processor: 动作处理器
         """
-        super(PostureMonitor, self).__init__()
+        super(PostureMonitor, self).__init__(name="PostureMonitor")
         self.__flag = threading.Event()  # 用于暂停线程的标识
         self.__running = threading.Event()  # 用于停止线程的标识
         self.__running.set()  # 将running设置为True
@@ -34,6 +36,7 @@ class PostureMonitor(threading.Thread):
         while self.__running.is_set():
             self.__flag.wait()  # 为True时立即返回, 为False时阻塞直到内部的标识位为True后返回
             self._check_posture()  # 姿势判断
+            report_thread_time()  # 供资源监控在没有 /proc 的平台上统计本线程CPU
             time.sleep(1)  # 休眠1秒
     
     def _check_posture(self):
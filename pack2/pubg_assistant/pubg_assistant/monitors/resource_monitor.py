@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+资源监控模块
+定时采样各模块线程的CPU时间、进程常驻内存以及（可选的）tracemalloc分配热点，
+超出预算时在覆盖层和日志中提示
+"""
+
+import os
+import sys
+import time
+import ctypes
+import threading
+
+# 线程名称到模块的映射，未列出的线程计入 other
+THREAD_COMPONENTS = {
+    "MainThread": "main",
+    "InputManager": "InputManager",
+    "InputKeyboard": "InputManager",
+    "InputMouse": "InputManager",
+    "PostureMonitor": "PostureMonitor",
+    "UIManager": "UIManager",
+    "ShadowComparator": "ImageProcessor",
+    "DatasetWriter": "ImageProcessor",
+    "TemplateWatcher": "ImageProcessor",
+    "AsyncWorker": "runtime",
+    "ResourceMonitor": "ResourceMonitor",
+}
+
+# 默认的各模块CPU占用预算（单核百分比），合计不超过进程默认预算
+DEFAULT_COMPONENT_BUDGETS = {
+    "PostureMonitor": 1.5,
+    "InputManager": 1.0,
+    "UIManager": 1.0,
+    "ImageProcessor.detect": 3.0,
+}
+
+# {线程名称: 该线程上报的累计CPU时间}，/proc/self/task 不可用的平台（Windows）上按它统计各模块
+_reported_thread_times = {}
+
+def report_thread_time():
+    """上报当前线程累计消耗的CPU时间，由各模块线程在每轮循环结束时调用"""
+    _reported_thread_times[threading.current_thread().name] = time.thread_time()
+
+class ResourceMonitor(threading.Thread):
+    """资源监控线程"""
+    
+    def __init__(self, image_processor=None, state_store=None, interval=5.0,
+                 cpu_budget=5.0, rss_budget_mb=300.0, component_budgets=None, trace_allocations=False):
+        """初始化资源监控器
+        
+        Args:
+            image_processor: 图像处理器，用于读取识别本身消耗的CPU时间
+            state_store: 状态存储，超出预算时写入 alert 字段显示在覆盖层
+            interval: 采样间隔（秒）
+            cpu_budget: 进程CPU占用预算（单核百分比）
+            rss_budget_mb: 常驻内存预算（MB）
+            component_budgets: 各模块CPU占用预算 {模块名: 百分比}，为None时使用 DEFAULT_COMPONENT_BUDGETS
+            trace_allocations: 是否启用tracemalloc统计分配热点（有额外开销）
+        """
+        super(ResourceMonitor, self).__init__(name="ResourceMonitor")
+        self.image_processor = image_processor
+        self.state_store = state_store
+        self.interval = interval
+        self.cpu_budget = cpu_budget
+        self.rss_budget_mb = rss_budget_mb
+        self.component_budgets = dict(DEFAULT_COMPONENT_BUDGETS if component_budgets is None else component_budgets)
+        self.trace_allocations = trace_allocations
+        self.stop_event = threading.Event()
+        
+        self.clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self.last_sample = None
+        self.latest = {}
+        self.peak_rss_mb = 0.0
+        self.violations = {}
+        
+        if trace_allocations:
+            import tracemalloc
+            tracemalloc.start(1)
+    
+    @staticmethod
+    def _reported_cpu():
+        """汇总各线程通过 report_thread_time 上报的CPU时间
+        
+        Returns:
+            dict: {模块名: CPU秒数}
+        """
+        components = {}
+        for name, seconds in dict(_reported_thread_times).items():
+            component = THREAD_COMPONENTS.get(name.split("_")[0], "other")
+            components[component] = components.get(component, 0.0) + seconds
+        return components
+    
+    def _thread_cpu(self):
+        """读取各线程的CPU时间，Linux上通过 /proc/self/task，其他平台使用线程上报的探针
+        
+        Returns:
+            dict: {模块名: CPU秒数}
+        """
+        task_dir = "/proc/self/task"
+        if not os.path.isdir(task_dir):
+            return self._reported_cpu()
+        names = {thread.native_id: thread.name for thread in threading.enumerate()}
+        components = {}
+        for tid in os.listdir(task_dir):
+            try:
+                with open(os.path.join(task_dir, tid, "stat"), "r") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue  # 线程已退出
+            # 去掉 "pid (comm)" 后，utime 和 stime 是第12、13个字段
+            seconds = (int(fields[11]) + int(fields[12])) / self.clock_ticks
+            name = names.get(int(tid), "")
+            component = THREAD_COMPONENTS.get(name.split("_")[0], "other")
+            components[component] = components.get(component, 0.0) + seconds
+        return components
+    
+    @staticmethod
+    def read_rss_mb():
+        """读取进程常驻内存
+        
+        Returns:
+            float: 常驻内存（MB），无法读取时为None
+        """
+        try:
+            if os.path.exists("/proc/self/statm"):
+                with open("/proc/self/statm", "r") as f:
+                    pages = int(f.read().split()[1])
+                return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+            if hasattr(ctypes, "WinDLL"):
+                from ctypes import wintypes
+                
+                class ProcessMemoryCounters(ctypes.Structure):
+                    _fields_ = [
+                        ("cb", wintypes.DWORD),
+                        ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t),
+                        ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t),
+                        ("PeakPagefileUsage", ctypes.c_size_t),
+                    ]
+                
+                counters = ProcessMemoryCounters()
+                counters.cb = ctypes.sizeof(counters)
+                kernel32 = ctypes.WinDLL("kernel32")
+                psapi = ctypes.WinDLL("psapi")
+                psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+                return counters.WorkingSetSize / (1024 * 1024)
+        except Exception:
+            pass
+        try:
+            import resource
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # 峰值，macOS单位为字节
+            return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+        except Exception:
+            return None
+    
+    def top_allocators(self, limit=5):
+        """获取分配内存最多的源文件（仅统计本项目的代码）
+        
+        Args:
+            limit: 返回条数
+            
+        Returns:
+            list: [(文件:行号, KB), ...]，未启用tracemalloc时为空
+        """
+        import tracemalloc
+        
+        if not tracemalloc.is_tracing():
+            return []
+        package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, package_dir + os.sep + "*")])
+        top = []
+        for stat in snapshot.statistics("lineno")[:limit]:
+            frame = stat.traceback[0]
+            top.append((f"{os.path.relpath(frame.filename, package_dir)}:{frame.lineno}", round(stat.size / 1024, 1)))
+        return top
+    
+    def sample(self):
+        """采样一次，返回与上次采样之间的资源占用
+        
+        Returns:
+            dict: 进程和各模块的CPU占用（百分比）、常驻内存（MB）及分配热点
+        """
+        now = time.perf_counter()
+        current = {
+            "time": now,
+            "process": time.process_time(),
+            "threads": self._thread_cpu(),
+            "detect": self.image_processor.get_cpu_time() if self.image_processor else 0.0,
+        }
+        previous = self.last_sample
+        self.last_sample = current
+        rss = self.read_rss_mb()
+        if rss is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        
+        result = {"rss_mb": round(rss, 1) if rss is not None else None}
+        if previous:
+            elapsed = now - previous["time"]
+            result["cpu_percent"] = round((current["process"] - previous["process"]) / elapsed * 100, 2)
+            components = {}
+            for name, seconds in current["threads"].items():
+                delta = max(0.0, seconds - previous["threads"].get(name, 0.0))  # 线程退出后累计值会变小
+                components[name] = round(delta / elapsed * 100, 2)
+            # 识别运行在输入线程和姿势线程中，单独用 thread_time 探针统计
+            components["ImageProcessor.detect"] = round((current["detect"] - previous["detect"]) / elapsed * 100, 2)
+            result["components"] = components
+        if self.trace_allocations:
+            result["top_allocators"] = self.top_allocators()
+        self.latest = result
+        return result
+    
+    def check_budget(self, result):
+        """检查采样结果是否超出预算
+        
+        Args:
+            result: sample 的返回值
+            
+        Returns:
+            dict: {超出预算的项目: 描述}，未超出时为空
+        """
+        violations = {}
+        cpu = result.get("cpu_percent")
+        if cpu is not None and cpu > self.cpu_budget:
+            violations["cpu"] = f"CPU{cpu:.1f}%"
+        rss = result.get("rss_mb")
+        if rss is not None and rss > self.rss_budget_mb:
+            violations["rss"] = f"内存{rss:.0f}M"
+        for name, budget in self.component_budgets.items():
+            value = result.get("components", {}).get(name)
+            if value is not None and value > budget:
+                violations[name] = f"{name}{value:.1f}%"
+        return violations
+    
+    def run(self):
+        """线程运行方法"""
+        self.sample()
+        while not self.stop_event.wait(self.interval):
+            report_thread_time()
+            try:
+                result = self.sample()
+                violations = self.check_budget(result)
+            except Exception as e:
+                print(f"资源采样失败: {e}")
+                continue
+            # 超出预算的项目变化时才写日志，覆盖层显示最新数值
+            if set(violations) != set(self.violations):
+                if violations:
+                    print(f"资源占用超出预算: {', '.join(violations.values())} {result}")
+                else:
+                    print("资源占用已恢复到预算以内")
+            self.violations = violations
+            if self.state_store:
+                self.state_store.update(alert=",".join(violations.values()))
+    
+    def stop(self):
+        """停止线程"""
+        self.stop_event.set()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模板监控模块
+定时扫描资源目录中的武器模板和枪械名称文件，发生变化时热加载，无需重启程序
+"""
+
+import os
+import threading
+
+class TemplateWatcher(threading.Thread):
+    """模板监控线程，按修改时间和大小判断文件是否变化"""
+    
+    def __init__(self, image_processor, action_processor=None, interval=2.0):
+        """初始化模板监控器
+        
+        Args:
+            image_processor: 图像处理器
+            action_processor: 动作处理器，枪械名称文件变化时重新加载名称
+            interval: 扫描间隔（秒）
+        """
+        super(TemplateWatcher, self).__init__(name="TemplateWatcher")
+        self.image_processor = image_processor
+        self.action_processor = action_processor
+        self.interval = interval
+        self.stop_event = threading.Event()
+        
+        self.resources_dir = image_processor.resolution_config.get_resources_dir()
+        self.names_path = None
+        if action_processor:
+            self.names_path = os.path.join(action_processor.config_manager.dict_dir, "gun_arr.json")
+        
+        # 以启动时的状态为基准，只处理之后的变化
+        self.templates = self._scan_templates()
+        self.names_stamp = self._stamp(self.names_path)
+        self.reload_count = 0
+    
+    def _scan_templates(self):
+        """扫描资源目录中的PNG模板
+        
+        Returns:
+            dict: {武器ID: (修改时间纳秒, 文件大小)}
+        """
+        templates = {}
+        try:
+            with os.scandir(self.resources_dir) as entries:
+                for entry in entries:
+                    name, ext = os.path.splitext(entry.name)
+                    if ext == '.png' and entry.is_file():
+                        stat = entry.stat()
+                        templates[name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            print(f"扫描模板目录失败: {e}")
+        return templates
+    
+    @staticmethod
+    def _stamp(path):
+        """获取文件的修改时间和大小
+        
+        Args:
+            path: 文件路径
+            
+        Returns:
+            tuple: (修改时间纳秒, 文件大小)，文件不存在时为None
+        """
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def check(self):
+        """扫描一次，有变化时热加载
+        
+        Returns:
+            bool: 是否加载了新的模板或名称
+        """
+        reloaded = False
+        
+        templates = self._scan_templates()
+        changed = [gun_id for gun_id, stamp in templates.items() if self.templates.get(gun_id) != stamp]
+        removed = [gun_id for gun_id in self.templates if gun_id not in templates]
+        if changed or removed:
+            updated = self.image_processor.reload_templates(changed, removed)
+            # 读取失败的文件（如仍在写入）保留旧的时间戳，下次扫描时重试
+            failed = set(changed) - set(updated)
+            for gun_id in failed:
+                if gun_id in self.templates:
+                    templates[gun_id] = self.templates[gun_id]
+                else:
+                    templates.pop(gun_id)
+            self.templates = templates
+            if updated:
+                reloaded = True
+                print(f"模板已热加载: {sorted(updated)}")
+        
+        names_stamp = self._stamp(self.names_path)
+        if names_stamp != self.names_stamp:
+            self.names_stamp = names_stamp
+            if names_stamp is not None:
+                self.action_processor.reload_gun_names()
+                reloaded = True
+        
+        if reloaded:
+            self.reload_count += 1
+        return reloaded
+    
+    def run(self):
+        """线程运行方法"""
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"模板热加载失败: {e}")
+    
+    def stop(self):
+        """停止线程"""
+        self.stop_event.set()
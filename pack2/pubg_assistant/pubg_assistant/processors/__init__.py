@@ -6,7 +6,23 @@ Processing modules for PUBG Assistant
 """
 
 # 处理器模块初始化文件
-from pubg_assistant.processors.image_processor import ImageProcessor
-from pubg_assistant.processors.action_processor import ActionProcessor
 
-__all__ = ['ImageProcessor', 'ActionProcessor'] 
\ No newline at end of file
+from pubg_assistant import _lazy
+
+_LAZY_ATTRS = {
+    'ImageProcessor': 'pubg_assistant.processors.image_processor',
+    'ActionProcessor': 'pubg_assistant.processors.action_processor',
+    'ScreenFrameSource': 'pubg_assistant.processors.frame_source',
+    'ReplayFrameSource': 'pubg_assistant.processors.frame_source',
+    'Recognizer': 'pubg_assistant.processors.recognizers',
+    'RecognizerRegistry': 'pubg_assistant.processors.recognizers',
+    'BankOptimizer': 'pubg_assistant.processors.bank_optimizer',
+    'BufferPool': 'pubg_assistant.processors.buffer_pool',
+    'DatasetWriter': 'pubg_assistant.processors.dataset_writer',
+}
+
+__all__ = ['ImageProcessor', 'ActionProcessor', 'ScreenFrameSource', 'ReplayFrameSource',
+           'Recognizer', 'RecognizerRegistry', 'BankOptimizer', 'BufferPool',
+           'DatasetWriter']
+
+_lazy.install(globals(), _LAZY_ATTRS)
@@ -9,22 +9,27 @@
 import time
 import ctypes
 import sys
-from pynput import keyboard
+
+from pubg_assistant.managers.state_store import StateStore
+from pubg_assistant.metrics.tracing import get_trace_collector
 
 class ActionProcessor:
     """动作处理器类"""
     
-    def __init__(self, image_processor, config_manager, ui_manager):
+    def __init__(self, image_processor, config_manager, ui_manager, state_store=None):
         """初始化动作处理器
         
         Args:
             image_processor: 图像处理器
             config_manager: 配置管理器
             ui_manager: UI管理器
+            state_store: 状态存储，为空时自动创建
         """
         self.image_processor = image_processor
         self.config_manager = config_manager
         self.ui_manager = ui_manager
+        self.state_store = state_store if state_store else StateStore()
+        self.trace_collector = get_trace_collector()
         
         # 状态变量
         self.current_gun = {1: "", 2: ""}  # 当前的武器名
@@ -32,6 +37,10 @@ class ActionProcessor:
         self.player_gun = 0  # 当前持有的武器ID
         self.gun_lock = 0  # 武器锁定 0 初始化 1锁定
         self.player_gun_config = True  # 枪械是否满配 false 满配  true 裸配
+        self.written_loadout = None  # 本次运行中最后写入 attachment 配置的满配状态，None表示尚未写入
+        self.recent_guns = []  # 最近识别出的武器ID，最近的在前
+        self.slot_affinity = {1: {}, 2: {}}  # {武器栏: {武器ID: 识别次数}}
+        self.session_store = None  # 会话快照存储，启用后状态变化时保存快照
         
         # 枪械名称列表
         self.gun_list_name = self.config_manager.load_gun_names()
@@ -48,6 +57,8 @@ class ActionProcessor:
         Returns:
             bool: NumLock是否开启
         """
+        if not hasattr(ctypes, "WinDLL"):
+            return False  # 非Windows环境（如回放测试）没有NumLock状态
         hll_dll = ctypes.WinDLL("User32.dll")
         vk_numlock = 0x90
         return bool(hll_dll.GetKeyState(vk_numlock) & 1)
@@ -78,35 +89,105 @@ class ActionProcessor:
             pass
     
     def _update_display(self):
-        """更新显示"""
-        use_template = self.image_processor.is_using_template_matching()
-        self.ui_manager.update_display_with_algorithm(
-            self.gun_lock,
-            self.get_gun_name(int(self.player_gun)),
-            self.player_posture,
-            self.player_gun_config,
-            use_template
+        """将当前状态写入状态存储，由UI管理器在状态变化时渲染"""
+        self.state_store.update(
+            gun_lock=self.gun_lock,
+            gun=self.get_gun_name(int(self.player_gun)),
+            posture=self.player_posture,
+            gun_config=self.player_gun_config,
+            algorithm=self.image_processor.get_recognizer_name()
         )
+        self._save_session()
+    
+    def attach_session(self, session_store):
+        """恢复上次会话的状态，之后状态变化时保存快照
+        
+        Args:
+            session_store: 会话快照存储
+            
+        Returns:
+            bool: 是否恢复了上次会话的状态
+        """
+        self.session_store = session_store
+        snapshot = session_store.load()
+        if not snapshot:
+            return False
+        try:
+            self.current_gun = {int(slot): gun_id for slot, gun_id in snapshot["current_gun"].items()}
+            self.player_gun = snapshot["player_gun"]
+            self.gun_lock = snapshot["gun_lock"]
+            self.player_posture = snapshot["posture"]
+            self.recent_guns = list(snapshot.get("recent_guns", []))
+            self.slot_affinity = {int(slot): dict(counts) for slot, counts in snapshot.get("slot_affinity", {}).items()}
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            print(f"会话快照内容无效，忽略: {e}")
+            return False
+        for slot in (1, 2):
+            self.current_gun.setdefault(slot, "")
+            self.slot_affinity.setdefault(slot, {})
+        restored = self.image_processor.restore_fingerprints(snapshot.get("fingerprints"))
+        print(f"已恢复上次会话: 武器 {self.get_gun_name(int(self.player_gun))}, 锁定 {self.gun_lock}, "
+              f"姿势 {self.player_posture}, 截图指纹 {restored} 个")
+        return True
     
-    def _save_player_gun_and_sound(self, gun_id, gun_pos):
+    def get_session_state(self):
+        """获取需要保存到会话快照的状态
+        
+        Returns:
+            dict: 武器栏、锁定、姿势、最近使用统计和截图指纹
+        """
+        return {
+            "current_gun": {str(slot): gun_id for slot, gun_id in self.current_gun.items()},
+            "player_gun": self.player_gun,
+            "gun_lock": self.gun_lock,
+            "posture": self.player_posture,
+            "recent_guns": list(self.recent_guns),
+            "slot_affinity": {str(slot): dict(counts) for slot, counts in self.slot_affinity.items()},
+            "fingerprints": self.image_processor.get_fingerprints(),
+        }
+    
+    def _save_session(self):
+        """把当前状态交给会话快照存储，由其后台线程合并写入"""
+        if self.session_store:
+            self.session_store.schedule(self.get_session_state())
+    
+    def _record_recognition(self, gun_id, gun_pos):
+        """更新最近使用和武器栏偏好统计
+        
+        Args:
+            gun_id: 识别出的武器ID
+            gun_pos: 武器位置
+        """
+        self.recent_guns = [gun_id] + [recent for recent in self.recent_guns if recent != gun_id][:7]
+        counts = self.slot_affinity.setdefault(gun_pos, {})
+        counts[gun_id] = counts.get(gun_id, 0) + 1
+    
+    def _save_player_gun_and_sound(self, gun_id, gun_pos, trace=None):
         """保存武器到配置文件并播报
         
         Args:
             gun_id: 武器ID
             gun_pos: 武器位置
+            trace: 链路追踪记录
+            
+        Returns:
+            bool: 是否写入了配置文件
         """
         if self.player_gun != gun_id and gun_id != '':
             self.player_gun = gun_id
             self.current_gun[gun_pos] = gun_id  # 避免重复操作
-            self.config_manager.save_config("gun", str(gun_id))
+            self.config_manager.save_config("gun", str(gun_id), trace)
             self._update_display()
             # self._play_sound(self.get_gun_name(int(gun_id)))
+            return True
+        return False
     
-    def handle_keyboard_action(self, key):
+    def handle_keyboard_action(self, key, trace=None):
         """处理键盘动作
         
         Args:
             key: 按键
+            trace: 链路追踪记录，仅1、2键携带
         """
         # 锁定武器栏
         if key == 4:
@@ -118,11 +199,16 @@ class ActionProcessor:
             self._close_weapon(key)
             return True
         
-        # 切换匹配算法
+        # 循环切换识别引擎
         elif key == 8:
             self._toggle_algorithm()
             return True
         
+        # 导出阶段耗时统计
+        elif key == 10:
+            self._dump_stats()
+            return True
+        
         # 退出程序
         elif key == 9:
             self._exit_program()
@@ -135,10 +221,20 @@ class ActionProcessor:
         
         # 对应1,2切换武器或者识别
         elif key == 1 or key == 2:
-            if self.gun_lock == 0:
-                self._detect_weapon(key)
-            else:
-                self._save_player_gun_and_sound(self.current_gun[key], key)
+            outcome = "error"  # 识别或写配置抛出异常时，追踪仍然完成并记为 error
+            try:
+                if self.gun_lock == 0:
+                    outcome = self._detect_weapon(key, trace)
+                else:
+                    self._apply_loadout(key)
+                    written = self._save_player_gun_and_sound(self.current_gun[key], key, trace)
+                    outcome = "written" if written else "unchanged"
+            except Exception:
+                if trace:
+                    trace.mark("error")
+                raise
+            finally:
+                self.trace_collector.complete(trace, outcome)
     
     def _lock_weapon_bar(self):
         """锁定/解锁武器栏"""
@@ -146,35 +242,89 @@ class ActionProcessor:
         self._update_display()
     
     def _change_weapon_config_state(self):
-        """变更武器满配/裸配状态"""
+        """变更武器满配/裸配状态，自动识别满配/裸配时以截图识别结果为准"""
+        if self.image_processor.attachment_detection:
+            return
         self.player_gun_config = not self.player_gun_config
         self._update_display()
     
+    def _apply_loadout(self, gun_pos):
+        """使用武器栏最近一次识别的满配/裸配结果，与上次写入的值不同时写入配置文件
+        
+        只和本次运行实际写入的值比较：player_gun_config 的初始值来自NumLock，
+        配置文件里可能还是上次运行留下的值，因此第一次识别出结果时总是写入
+        
+        Args:
+            gun_pos: 武器位置
+        """
+        full = self.image_processor.get_loadout(gun_pos)
+        if full is None or full == self.written_loadout:
+            return
+        self.config_manager.save_config("attachment", "1" if full else "0")
+        self.written_loadout = full
+        if self.player_gun_config != (not full):
+            self.player_gun_config = not full
+            self._update_display()
+    
     def _close_weapon(self, key):
         """关闭宏 只能在手持某武器之后按"""
         self.config_manager.save_config("gun", "0")
         self._play_sound("close")
     
-    def _detect_weapon(self, gun_pos):
+    def _detect_weapon(self, gun_pos, trace=None):
         """检测武器
         
         Args:
             gun_pos: 武器位置
+            trace: 链路追踪记录
+            
+        Returns:
+            str: 处理结果 written / unchanged / not_detected
         """
         success, gun_id = self.image_processor.detect_weapon(gun_pos)
-        if success:
-            self._save_player_gun_and_sound(gun_id, gun_pos)
-            print(f"检测到武器: {self.get_gun_name(int(gun_id))}, 位置: {gun_pos}")
+        if trace:
+            trace.mark("detected")
+        if not success:
+            return "not_detected"
+        self._record_recognition(gun_id, gun_pos)
+        self._apply_loadout(gun_pos)
+        written = self._save_player_gun_and_sound(gun_id, gun_pos, trace)
+        if not written:
+            self._save_session()  # 结果未变化时截图指纹和统计仍可能更新
+        print(f"检测到武器: {self.get_gun_name(int(gun_id))}, 位置: {gun_pos}")
+        return "written" if written else "unchanged"
     
     def _toggle_algorithm(self):
-        """切换匹配算法"""
-        use_template = self.image_processor.toggle_matching_algorithm()
-        if use_template:
-            print("已切换到模板匹配算法")
-        else:
-            print("已切换到特征点匹配算法")
+        """按注册顺序切换到下一个识别引擎"""
+        name = self.image_processor.cycle_recognizer()
+        print(f"已切换到识别引擎: {name}")
         self._update_display()
     
+    def _dump_stats(self):
+        """导出阶段耗时统计"""
+        stage_timer = self.image_processor.stage_timer
+        if not stage_timer.enabled:
+            print("阶段计时未启用，请使用 --stats 启动")
+        else:
+            try:
+                path = stage_timer.dump()
+                print(f"阶段耗时统计已导出: {path}")
+            except Exception as e:
+                print(f"导出阶段耗时统计失败: {e}")
+        for row in self.image_processor.get_engine_stats():
+            print(f"识别引擎 {row['name']}: {row}")
+        if self.image_processor.shadow:
+            print(f"影子对比: {self.image_processor.shadow.get_stats()}")
+        if self.image_processor.dataset_writer:
+            print(f"截图数据集: {self.image_processor.dataset_writer.get_stats()}")
+        if self.image_processor.change_detector:
+            print(f"画面变化检测: {self.image_processor.change_detector.get_stats()}")
+        if self.session_store:
+            print(f"会话快照: {self.session_store.get_stats()}, 指纹命中 {self.image_processor.fingerprint_hits} 次")
+        if self.trace_collector.enabled:
+            for row in self.trace_collector.summary():
+                print(f"链路延迟 {row['name']}: {row}")
+    
     def _exit_program(self):
         """退出程序"""
         print("收到F9退出指令，正在退出程序...")
@@ -199,6 +349,11 @@ class ActionProcessor:
         """
         return self.config_manager.get_gun_name(gun_index, self.gun_list_name)
     
+    def reload_gun_names(self):
+        """重新加载枪械名称列表，新列表读取完成后整体替换"""
+        self.gun_list_name = self.config_manager.load_gun_names()
+        print(f"枪械名称列表已重新加载，共 {len(self.gun_list_name)} 项")
+    
     def check_posture(self):
         """检测姿势并更新状态"""
         new_posture = self.image_processor.detect_posture()
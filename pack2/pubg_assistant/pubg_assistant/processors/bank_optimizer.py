@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模板库优化模块
+把模板裁剪到有效像素的外接框，并把同一武器ID下几乎相同的模板（如 12.png 与 12_skin.png）合并为一个代表模板
+"""
+
+import numpy as np
+import cv2 as cv
+
+class BankOptimizer:
+    """模板库优化类"""
+    
+    THRESHOLD = 200  # 与 extract_gun 相同的亮度阈值
+    PADDING = 2  # 外接框四周保留的像素
+    
+    @staticmethod
+    def informative_box(bank, threshold=THRESHOLD, padding=PADDING):
+        """计算全部模板有效像素的并集外接框
+        
+        所有模板裁剪到同一个框，保证模板之间以及与识别区域的尺寸一致
+        
+        Args:
+            bank: 模板库 {武器ID: 灰度模板图像}
+            threshold: 亮度阈值，大于此值的像素为有效像素
+            padding: 外接框四周保留的像素
+            
+        Returns:
+            dict: 裁剪区域 {left, top, width, height}，相对模板左上角
+        """
+        x0 = y0 = None
+        x1 = y1 = 0
+        height = width = 0
+        for template in bank.values():
+            height, width = template.shape[:2]
+            ys, xs = np.nonzero(template > threshold)
+            if len(xs) == 0:
+                continue
+            x0 = int(xs.min()) if x0 is None else min(x0, int(xs.min()))
+            y0 = int(ys.min()) if y0 is None else min(y0, int(ys.min()))
+            x1 = max(x1, int(xs.max()) + 1)
+            y1 = max(y1, int(ys.max()) + 1)
+        if x0 is None:
+            return {"left": 0, "top": 0, "width": width, "height": height}
+        x0 = max(0, x0 - padding)
+        y0 = max(0, y0 - padding)
+        x1 = min(width, x1 + padding)
+        y1 = min(height, y1 + padding)
+        return {"left": x0, "top": y0, "width": x1 - x0, "height": y1 - y0}
+    
+    @staticmethod
+    def crop(bank, crop):
+        """按裁剪区域裁剪全部模板
+        
+        Args:
+            bank: 模板库
+            crop: 裁剪区域 {left, top, width, height}
+            
+        Returns:
+            dict: 裁剪后的模板库
+        """
+        left, top = crop["left"], crop["top"]
+        right, bottom = left + crop["width"], top + crop["height"]
+        return {
+            gun_id: np.ascontiguousarray(template[top:bottom, left:right])
+            for gun_id, template in bank.items()
+        }
+    
+    @staticmethod
+    def gun_id_of(name):
+        """由模板名称得到武器ID，模板文件名为 武器ID 或 武器ID_后缀
+        
+        Args:
+            name: 模板名称（不含扩展名）
+            
+        Returns:
+            str: 武器ID
+        """
+        return name.split("_", 1)[0]
+    
+    @staticmethod
+    def deduplicate(bank, threshold=0.97):
+        """合并同一武器ID下相关系数不低于阈值的模板
+        
+        不同武器ID的模板即使几乎相同也不合并，否则被合并的武器再也无法识别，
+        会被识别成代表武器并写入错误的配置；这类模板作为冲突返回，由调用方提示
+        
+        Args:
+            bank: 模板库
+            threshold: 相关系数阈值
+            
+        Returns:
+            tuple: (去重后的模板库, {代表模板: [被合并的模板, ...]}, [(模板, 模板, 相关系数), ...] 不同武器间的冲突)
+        """
+        gun_ids = sorted(bank)
+        if len(gun_ids) < 2:
+            return dict(bank), {}, []
+        
+        # 统一尺寸后去均值归一化，相关系数即为向量内积
+        height, width = bank[gun_ids[0]].shape[:2]
+        vectors = np.zeros((len(gun_ids), height * width), dtype=np.float32)
+        for row, gun_id in enumerate(gun_ids):
+            template = bank[gun_id]
+            if template.shape[:2] != (height, width):
+                template = cv.resize(template, (width, height))
+            vector = vectors[row]
+            vector[:] = template.reshape(-1)
+            vector -= vector.mean()
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector /= norm
+        similarity = vectors @ vectors.T
+        
+        representatives = {}
+        aliases = {}
+        conflicts = []
+        assigned = set()
+        for row, gun_id in enumerate(gun_ids):
+            if gun_id in assigned:
+                continue
+            representatives[gun_id] = bank[gun_id]
+            assigned.add(gun_id)
+            for other in range(row + 1, len(gun_ids)):
+                other_id = gun_ids[other]
+                if other_id in assigned or similarity[row, other] < threshold:
+                    continue
+                if BankOptimizer.gun_id_of(other_id) != BankOptimizer.gun_id_of(gun_id):
+                    conflicts.append((gun_id, other_id, round(float(similarity[row, other]), 4)))
+                    continue
+                aliases.setdefault(gun_id, []).append(other_id)
+                assigned.add(other_id)
+        return representatives, aliases, conflicts
+    
+    @staticmethod
+    def measure(bank):
+        """统计模板库规模和每次识别的计算量
+        
+        Args:
+            bank: 模板库
+            
+        Returns:
+            dict: 模板数、单个模板像素数、每次识别需比较的像素总数及内存字节数
+        """
+        pixels = [template.shape[0] * template.shape[1] for template in bank.values()]
+        return {
+            "templates": len(pixels),
+            "pixels_per_template": int(sum(pixels) / len(pixels)) if pixels else 0,
+            "pixels_per_detection": int(sum(pixels)),
+            "bytes": int(sum(template.nbytes for template in bank.values())),
+        }
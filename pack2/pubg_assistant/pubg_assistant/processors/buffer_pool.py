@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+缓冲区池模块
+识别热路径上的中间结果写入预先分配的数组，稳定运行后每次识别不再分配新的大块内存
+"""
+
+import threading
+
+import numpy as np
+
+class BufferPool:
+    """按 (名称, 形状, 类型) 复用数组的缓冲区池
+
+    每个线程拥有独立的缓冲区，影子对比等后台线程不会覆盖输入线程正在使用的数据
+    """
+
+    def __init__(self):
+        """初始化缓冲区池"""
+        self.local = threading.local()
+
+    def _buffers(self):
+        """获取当前线程的缓冲区字典
+
+        Returns:
+            dict: {(名称, 形状, 类型): 数组}
+        """
+        buffers = getattr(self.local, "buffers", None)
+        if buffers is None:
+            buffers = {}
+            self.local.buffers = buffers
+        return buffers
+
+    def get(self, name, shape, dtype=np.uint8):
+        """获取缓冲区，首次使用某个形状时分配
+
+        返回的数组内容未初始化，下次以相同参数获取时会被覆盖
+
+        Args:
+            name: 缓冲区用途名称
+            shape: 数组形状
+            dtype: 数组类型
+
+        Returns:
+            ndarray: 缓冲区数组
+        """
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        buffers = self._buffers()
+        buffer = buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers[key] = buffer
+        return buffer
+
+    def clear(self):
+        """释放当前线程的全部缓冲区"""
+        self.local.buffers = {}
+
+    def get_stats(self):
+        """获取当前线程的缓冲区统计
+
+        Returns:
+            dict: 缓冲区个数和占用字节数
+        """
+        buffers = self._buffers()
+        return {
+            "buffers": len(buffers),
+            "bytes": int(sum(buffer.nbytes for buffer in buffers.values())),
+        }
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+截图数据集写入模块
+识别线程只把截图的原始BGRA缓冲区交给有界队列，由后台线程追加写入分块的原始文件，
+并在 JSON lines 索引中记录时间、武器栏、识别结果和得分，用于构建压测和调参语料
+"""
+
+import os
+import json
+import time
+import threading
+from queue import Queue, Full
+
+class DatasetWriter:
+    """截图数据集写入类，后台线程落后时直接丢弃新截图，不阻塞识别线程"""
+
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self, directory, max_pending=64, chunk_bytes=64 * 1024 * 1024):
+        """初始化数据集写入器
+
+        Args:
+            directory: 数据集目录
+            max_pending: 队列中最多等待写入的截图数
+            chunk_bytes: 单个分块文件的最大字节数，超过后写入新的分块
+        """
+        self.directory = directory
+        self.chunk_bytes = chunk_bytes
+        self.tasks = Queue(maxsize=max_pending)
+        self.thread = None
+        self.running = False
+
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.bytes_written = 0
+
+    def start(self):
+        """启动后台写入线程"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, name="DatasetWriter")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self, timeout=5):
+        """写完队列中剩余的截图后停止后台线程
+
+        Args:
+            timeout: 等待后台线程腾出队列和退出的最长时间（秒）
+        """
+        if not self.running:
+            return
+        self.running = False
+        # 后台线程已经退出时队列不会再被取出，不能阻塞等待放入结束标记
+        if self.thread and self.thread.is_alive():
+            try:
+                self.tasks.put(None, timeout=timeout)
+            except Full:
+                print("截图数据集写入线程未响应，放弃队列中剩余的截图")
+            self.thread.join(timeout=timeout)
+        self.thread = None
+
+    def submit(self, img, slot, predicted_id, scores):
+        """提交一张截图，队列已满时丢弃
+
+        mss每次截图都会创建新的缓冲区，这里直接引用而不复制
+
+        Args:
+            img: 截图对象（mss截图或回放帧）
+            slot: 武器栏位置
+            predicted_id: 识别出的武器ID，未识别时为空字符串
+            scores: 识别得分 {武器ID: 得分}
+        """
+        if not self.running:
+            return
+        self.submitted += 1
+        raw = getattr(img, "raw", None)
+        width, height = img.size
+        task = (time.time(), raw if raw is not None else img.bgra, width, height, slot, predicted_id, scores)
+        try:
+            self.tasks.put_nowait(task)
+        except Full:
+            self.dropped += 1
+
+    def _next_chunk(self):
+        """找到下一个未使用的分块编号，追加写入已有数据集时不覆盖旧分块
+
+        Returns:
+            int: 分块编号
+        """
+        chunk = 0
+        while os.path.exists(os.path.join(self.directory, f"frames_{chunk:04d}.raw")):
+            chunk += 1
+        return chunk
+
+    def _worker(self):
+        """后台写入线程主循环"""
+        chunk = self._next_chunk()
+        chunk_file = None
+        try:
+            index_file = open(os.path.join(self.directory, self.INDEX_FILE), "a", encoding="utf-8")
+        except Exception as e:
+            print(f"打开截图数据集索引失败，停止记录: {e}")
+            self.running = False
+            return
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    break
+                timestamp, data, width, height, slot, predicted_id, scores = task
+                try:
+                    if chunk_file is None or (chunk_file.tell() > 0 and chunk_file.tell() + len(data) > self.chunk_bytes):
+                        if chunk_file:
+                            chunk_file.close()
+                            chunk_file = None
+                            chunk += 1
+                        chunk_file = open(os.path.join(self.directory, f"frames_{chunk:04d}.raw"), "ab")
+                    offset = chunk_file.tell()
+                    chunk_file.write(data)
+                    index_file.write(json.dumps({
+                        "t": round(timestamp, 3),
+                        "slot": slot,
+                        "id": predicted_id,
+                        "scores": scores,
+                        "chunk": chunk,
+                        "offset": offset,
+                        "width": width,
+                        "height": height,
+                    }, ensure_ascii=False) + "\n")
+                except Exception as e:
+                    self.failed += 1
+                    print(f"写入截图数据集失败: {e}")
+                    continue
+                self.written += 1
+                self.bytes_written += len(data)
+        finally:
+            if chunk_file:
+                chunk_file.close()
+            index_file.close()
+
+    def get_stats(self):
+        """获取写入统计
+
+        Returns:
+            dict: 提交、丢弃、已写入、写入失败的截图数及写入字节数
+        """
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "bytes": self.bytes_written,
+            "pending": self.tasks.qsize(),
+        }
+
+    @staticmethod
+    def read(directory):
+        """按索引顺序读取数据集中的截图
+
+        Args:
+            directory: 数据集目录
+
+        Yields:
+            tuple: (索引记录, 形状为 (高, 宽, 4) 的BGRA数组)
+        """
+        import numpy as np
+
+        handles = {}
+        try:
+            with open(os.path.join(directory, DatasetWriter.INDEX_FILE), "r", encoding="utf-8") as index_file:
+                for line in index_file:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    chunk = entry["chunk"]
+                    if chunk not in handles:
+                        handles[chunk] = open(os.path.join(directory, f"frames_{chunk:04d}.raw"), "rb")
+                    handle = handles[chunk]
+                    size = entry["width"] * entry["height"] * 4
+                    handle.seek(entry["offset"])
+                    data = handle.read(size)
+                    if len(data) != size:
+                        break  # 进程退出时最后一条可能未写完
+                    frame = np.frombuffer(data, dtype=np.uint8).reshape(entry["height"], entry["width"], 4)
+                    yield entry, frame
+        finally:
+            for handle in handles.values():
+                handle.close()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+帧来源模块
+负责为图像处理器提供截图，支持实时屏幕截图和回放已录制的帧
+"""
+
+import os
+import threading
+
+class Frame:
+    """截图帧类，接口与mss的ScreenShot保持一致（size、bgra、pixels、pixel）"""
+    
+    def __init__(self, width, height, bgra):
+        """初始化截图帧
+        
+        Args:
+            width: 宽度
+            height: 高度
+            bgra: BGRA格式的原始字节
+        """
+        self.size = (width, height)
+        self.width = width
+        self.height = height
+        self.bgra = bgra
+        self._pixels = None
+    
+    @property
+    def pixels(self):
+        """按行排列的RGB元组，与mss一致"""
+        if self._pixels is None:
+            data = self.bgra
+            width = self.width
+            rows = []
+            for y in range(self.height):
+                offset = y * width * 4
+                rows.append([
+                    (data[i + 2], data[i + 1], data[i])
+                    for i in range(offset, offset + width * 4, 4)
+                ])
+            self._pixels = rows
+        return self._pixels
+    
+    def pixel(self, x, y):
+        """获取单个像素的RGB值
+        
+        Args:
+            x: 横坐标
+            y: 纵坐标
+            
+        Returns:
+            tuple: (r, g, b)
+        """
+        i = (y * self.width + x) * 4
+        return self.bgra[i + 2], self.bgra[i + 1], self.bgra[i]
+
+class ScreenFrameSource:
+    """屏幕帧来源类，使用mss实时截图"""
+    
+    def grab(self, box):
+        """截图
+        
+        Args:
+            box: 截图区域 (left, top, right, bottom)
+            
+        Returns:
+            shot: 截图对象
+        """
+        from mss import mss  # 延迟导入截图库
+        
+        with mss() as sct:
+            return sct.grab(box)
+
+class ReplayFrameSource:
+    """回放帧来源类，按截图区域循环返回预先录制的帧"""
+    
+    def __init__(self, frames=None):
+        """初始化回放帧来源
+        
+        Args:
+            frames: 字典 {截图区域: [Frame, ...]}，键为None时作为所有区域的默认帧
+        """
+        self.frames = {}
+        self.cursors = {}
+        self.lock = threading.Lock()
+        for box, frame_list in (frames or {}).items():
+            self.add_frames(box, frame_list)
+    
+    def add_frames(self, box, frame_list):
+        """添加回放帧
+        
+        Args:
+            box: 截图区域，None表示默认
+            frame_list: 帧列表
+        """
+        with self.lock:
+            self.frames.setdefault(box, []).extend(frame_list)
+            self.cursors.setdefault(box, 0)
+    
+    @classmethod
+    def from_directory(cls, directory, box=None):
+        """从目录中的PNG图片创建回放帧来源
+        
+        Args:
+            directory: 图片目录
+            box: 这些帧对应的截图区域，None表示默认
+            
+        Returns:
+            ReplayFrameSource: 回放帧来源
+        """
+        import cv2 as cv
+        
+        frame_list = []
+        for file_name in sorted(os.listdir(directory)):
+            if os.path.splitext(file_name)[1] == '.png':
+                image = cv.imread(os.path.join(directory, file_name), cv.IMREAD_COLOR)
+                frame_list.append(cls.frame_from_array(cv.cvtColor(image, cv.COLOR_BGR2BGRA)))
+        return cls({box: frame_list})
+    
+    @staticmethod
+    def frame_from_array(bgra_array):
+        """从BGRA数组创建帧
+        
+        Args:
+            bgra_array: 形状为 (高, 宽, 4) 的uint8数组
+            
+        Returns:
+            Frame: 截图帧
+        """
+        height, width = bgra_array.shape[:2]
+        return Frame(width, height, bgra_array.tobytes())
+    
+    def grab(self, box):
+        """返回该区域的下一帧，区域没有录制帧时使用默认帧
+        
+        Args:
+            box: 截图区域 (left, top, right, bottom)
+            
+        Returns:
+            Frame: 截图帧
+        """
+        key = box if box in self.frames else None
+        with self.lock:
+            frame_list = self.frames.get(key)
+            if not frame_list:
+                raise LookupError(f"没有可回放的帧: {box}")
+            cursor = self.cursors[key]
+            self.cursors[key] = (cursor + 1) % len(frame_list)
+        return frame_list[cursor]
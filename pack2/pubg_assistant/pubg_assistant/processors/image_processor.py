@@ -10,23 +10,72 @@ import cv2 as cv
 import numpy as np
 import os
 import json
-from PIL import Image
+import threading
 from datetime import datetime
-from mss import mss
+
+from pubg_assistant.metrics.stage_timer import get_stage_timer
+from pubg_assistant.processors.frame_source import ScreenFrameSource
+from pubg_assistant.processors.shadow_comparator import ShadowComparator
+from pubg_assistant.processors.dataset_writer import DatasetWriter
+from pubg_assistant.processors.template_pyramid import TemplatePyramid
+from pubg_assistant.processors.bank_optimizer import BankOptimizer
+from pubg_assistant.processors.buffer_pool import BufferPool
+from pubg_assistant.processors.recognizers import (
+    RecognizerRegistry, OrbRecognizer, TemplateRecognizer, CascadeRecognizer
+)
 
 class ImageProcessor:
     """图像处理器类"""
     
-    def __init__(self, resolution_config):
+    def __init__(self, resolution_config, stage_timer=None, frame_source=None):
         """初始化图像处理器
         
         Args:
             resolution_config: 分辨率配置
+            stage_timer: 阶段计时器，为空时使用全局计时器
+            frame_source: 帧来源，为空时实时截取屏幕
         """
         self.resolution_config = resolution_config
+        self.stage_timer = stage_timer if stage_timer else get_stage_timer()
+        self.frame_source = frame_source if frame_source else ScreenFrameSource()
+        self.swap_delay = 0.35  # 切枪后等待动画结束的时间（秒）
+        self.retry_delay = 1  # 识别失败后重试前的等待时间（秒）
+        self.burst_size = 1  # 连拍帧数，大于1时用连拍投票代替失败重试
+        self.burst_interval = 0.015  # 连拍帧之间的间隔（秒）
+        self.burst_agreement = 0.6  # 连拍投票中获胜武器至少需要的票数占比
         self.global_seq = 1
-        self.gun_img_dict = {}
-        self.use_template_matching = False  # 是否使用模板匹配算法
+        self.buffers = BufferPool()  # 截图转换使用的缓冲区
+        self.gun_img_dict = {}  # 识别引擎使用的模板（校准后为裁剪过的模板）
+        self.base_bank = {}  # 从资源目录读取的原始模板
+        self.template_bank = {}  # 未裁剪的完整模板
+        self.template_scale = 1.0  # 当前使用的模板金字塔级别
+        self.reload_lock = threading.Lock()  # 热加载时串行化模板库的重建
+        self.cpu_time = 0.0  # 识别累计消耗的线程CPU时间（秒）
+        self.cpu_lock = threading.Lock()
+        self.template_crop = None  # 校准得到的模板裁剪区域
+        self.dedup_threshold = None  # 模板去重阈值，为None时不去重
+        self.bank_aliases = {}  # {代表模板: [被合并的同一武器的模板, ...]}
+        self.bank_conflicts = []  # 几乎相同但属于不同武器、因此未合并的模板对
+        self.template_pyramid = None  # 资源目录与分辨率不匹配时使用的模板金字塔
+        self.fingerprint_distance = None  # 截图指纹允许的最大差异位数，为None时不使用指纹
+        self.fingerprint_size = (32, 16)  # 指纹缩略图尺寸 (宽, 高)
+        self.slot_fingerprints = {}  # {武器栏: (截图区域, 指纹, 武器ID)}，整体替换
+        self.fingerprint_hits = 0
+        self.change_detector = None  # 画面变化检测器，启用后区域没有变化时沿用上次结果
+        self.slot_results = {}  # {武器栏: 上次识别出的武器ID}，配合画面变化检测使用
+        self.attachment_detection = False  # 是否从武器区域截图中识别满配/裸配
+        self.attachment_occupancy = 0.05  # 配件格中亮像素占比达到此值时认为装有配件
+        self.attachment_min_filled = 2  # 装有配件的格数达到此值时认为满配
+        self.slot_loadouts = {}  # {武器栏: 是否满配}，整体替换
+        
+        # 识别引擎注册表，F8按注册顺序循环切换
+        self.recognizers = RecognizerRegistry()
+        self.recognizers.register(OrbRecognizer())
+        self.recognizers.register(TemplateRecognizer())
+        self.recognizers.register(CascadeRecognizer(OrbRecognizer()))
+        self.recognizers.set_stage_timer(self.stage_timer)  # ORB特征提取和描述子匹配分别计时
+        self.shadow = None  # 影子对比器，启用后用另一引擎在后台复核
+        self.dataset_writer = None  # 截图数据集写入器，启用后在后台保存每次识别的截图
         
         # 计算资源目录的基础路径
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -38,15 +87,188 @@ class ImageProcessor:
         
         # 初始化武器图像字典
         self._initialize_gun_images()
+        
+        # 调参得到的识别阈值
+        self.thresholds_path = os.path.join(self.resources_base, "thresholds.json")
+        self.thresholds = self.load_thresholds()
     
     def _initialize_gun_images(self):
-        """初始化武器图像字典"""
+        """初始化武器图像字典，模板缩放比例不为1时生成模板金字塔"""
         resources_dir = self.resolution_config.get_resources_dir()
+        base_bank = {}
         for file_name in os.listdir(resources_dir):
             if os.path.splitext(file_name)[1] == '.png':
                 gun_id = os.path.splitext(file_name)[0]
                 gun_file = os.path.join(resources_dir, file_name)
-                self.gun_img_dict[gun_id] = cv.imread(gun_file, cv.IMREAD_GRAYSCALE)
+                base_bank[gun_id] = cv.imread(gun_file, cv.IMREAD_GRAYSCALE)
+        self.base_bank = base_bank
+        
+        scale = self.resolution_config.get_template_scale()
+        self.template_scale = scale
+        if scale == 1.0:
+            self.template_pyramid = None
+            self.template_bank = base_bank
+        else:
+            self.template_pyramid = TemplatePyramid(base_bank, scale)
+            self.template_bank = self.template_pyramid.level(scale)
+        self.apply_template_crop(None)
+    
+    def load_thresholds(self, path=None):
+        """读取阈值配置文件，把当前分辨率下调参得到的阈值应用到各识别引擎
+        
+        配置文件由 benchmarks.tune_thresholds 生成，格式为 {"宽x高": {引擎名称: {属性: 值}}}，
+        只应用引擎 tunables 中列出的属性
+        
+        Args:
+            path: 配置文件路径，为空时使用资源目录下的 thresholds.json
+            
+        Returns:
+            dict: 实际应用的阈值 {引擎名称: {属性: 值}}
+        """
+        path = path or self.thresholds_path
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                settings = json.load(file)
+        except Exception as e:
+            print(f"读取识别阈值失败: {e}")
+            return {}
+        key = f"{self.resolution_config.width}x{self.resolution_config.height}"
+        applied = {}
+        for name, values in settings.get(key, {}).items():
+            if name not in self.recognizers.names():
+                continue
+            recognizer = self.recognizers.get(name)
+            accepted = {attr: value for attr, value in values.items() if attr in recognizer.tunables}
+            for attr, value in accepted.items():
+                setattr(recognizer, attr, value)
+            applied[name] = accepted
+        if applied:
+            print(f"已应用识别阈值 {key}: {applied}")
+        return applied
+    
+    def reload_templates(self, changed_ids=(), removed_ids=()):
+        """热加载资源目录中变化的模板
+        
+        只重新读取、缩放和计算变化的模板，新的模板库构建完成后整体替换，
+        正在进行的识别继续使用旧模板库，不会看到更新了一半的数据
+        
+        Args:
+            changed_ids: 新增或被替换的武器ID（对应资源目录中的PNG文件名）
+            removed_ids: 被删除的武器ID
+            
+        Returns:
+            list: 成功读取或删除的武器ID，读取失败的文件（如尚未写完）不计入
+        """
+        resources_dir = self.resolution_config.get_resources_dir()
+        with self.reload_lock:
+            base_bank = dict(self.base_bank)
+            loaded = []
+            for gun_id in removed_ids:
+                if base_bank.pop(gun_id, None) is not None:
+                    loaded.append(gun_id)
+            for gun_id in changed_ids:
+                template = cv.imread(os.path.join(resources_dir, gun_id + '.png'), cv.IMREAD_GRAYSCALE)
+                if template is None:
+                    continue
+                base_bank[gun_id] = template
+                loaded.append(gun_id)
+            if not loaded:
+                return []
+            
+            if self.template_pyramid:
+                self.template_pyramid.update(base_bank, loaded)
+                template_bank = self.template_pyramid.level(self.template_scale)
+            else:
+                template_bank = base_bank
+            self.base_bank = base_bank
+            self.template_bank = template_bank
+            self._rebuild_engine_bank(incremental=True)
+            return loaded
+    
+    def select_template_scale(self, scale):
+        """切换到模板金字塔中最接近指定比例的级别
+        
+        Args:
+            scale: 缩放比例
+            
+        Returns:
+            bool: 是否切换成功（没有模板金字塔时为False）
+        """
+        if not self.template_pyramid:
+            return False
+        self.template_scale = scale
+        self.template_bank = self.template_pyramid.level(scale)
+        self.apply_template_crop(None)  # 原有的裁剪区域只对原级别有效
+        return True
+    
+    def apply_template_crop(self, crop):
+        """按校准结果裁剪模板，使模板与紧凑识别区域尺寸一致
+        
+        Args:
+            crop: 裁剪区域 {left, top, width, height}，为None时使用完整模板
+        """
+        self.template_crop = crop
+        self._rebuild_engine_bank()
+    
+    def optimize_bank(self, dedup_threshold=0.97):
+        """优化模板库：裁剪到有效像素范围并合并几乎相同的模板
+        
+        没有校准结果时按模板有效像素的外接框同时缩小武器识别区域
+        
+        Args:
+            dedup_threshold: 去重的相关系数阈值
+            
+        Returns:
+            dict: 优化前后的模板库规模 {before, after, aliases, conflicts}
+        """
+        before = BankOptimizer.measure(self.gun_img_dict)
+        if self.template_crop is None:
+            crop = BankOptimizer.informative_box(self.template_bank)
+            self.resolution_config.crop_weapon_areas(crop)
+            self.template_crop = crop
+        self.dedup_threshold = dedup_threshold
+        self._rebuild_engine_bank()
+        return {
+            "before": before,
+            "after": BankOptimizer.measure(self.gun_img_dict),
+            "aliases": self.bank_aliases,
+            "conflicts": self.bank_conflicts,
+        }
+    
+    def _rebuild_engine_bank(self, incremental=False):
+        """由完整模板依次裁剪、去重，生成识别引擎使用的模板并重新准备引擎
+        
+        Args:
+            incremental: 是否只为内容变化的模板更新引擎数据
+        """
+        bank = self.template_bank
+        if self.template_crop is not None:
+            bank = BankOptimizer.crop(bank, self.template_crop)
+        aliases, conflicts = {}, []
+        if self.dedup_threshold is not None:
+            bank, aliases, conflicts = BankOptimizer.deduplicate(bank, self.dedup_threshold)
+            for first, second, similarity in conflicts:
+                print(f"警告: 武器模板 {first} 与 {second} 几乎相同（相关系数 {similarity}），可能互相误识别")
+        
+        self.bank_aliases = aliases
+        self.bank_conflicts = conflicts
+        self.slot_fingerprints = {}  # 模板库变化后旧的识别结果不再可靠
+        self.slot_results = {}
+        if incremental:
+            # 裁剪和去重会生成新数组，按内容找出真正变化的模板
+            old = self.gun_img_dict
+            changed = [
+                gun_id for gun_id, template in bank.items()
+                if gun_id not in old or old[gun_id].shape != template.shape
+                or not np.array_equal(old[gun_id], template)
+            ]
+            self.gun_img_dict = bank
+            self.recognizers.update(bank, changed)
+        else:
+            self.gun_img_dict = bank
+            self.recognizers.prepare(bank)
     
     def screenshot(self, box):
         """截图
@@ -57,9 +279,26 @@ class ImageProcessor:
         Returns:
             shot: 截图对象
         """
-        with mss() as sct:
-            shot = sct.grab(box)
-            return shot
+        return self.frame_source.grab(box)
+    
+    def frame_to_rgb(self, img, out=None):
+        """把截图转换为RGB数组，结果写入缓冲区
+        
+        与 np.array(img.pixels) 的结果相同，但不逐像素构造元组，也不分配新数组
+        
+        Args:
+            img: 截图对象
+            out: 写入结果的数组，为空时使用缓冲区
+            
+        Returns:
+            ndarray: 形状为 (高, 宽, 3) 的RGB数组，下次转换同尺寸截图时会被覆盖
+        """
+        width, height = img.size
+        raw = getattr(img, "raw", None)  # mss的bgra属性每次都会复制一份bytes，优先使用原始缓冲区
+        bgra = np.frombuffer(raw if raw is not None else img.bgra, dtype=np.uint8).reshape(height, width, 4)
+        if out is None:
+            out = self.buffers.get("capture.rgb", (height, width, 3))
+        return cv.cvtColor(bgra, cv.COLOR_BGRA2RGB, dst=out)
     
     def save_temp_pic(self, img, path, is_save):
         """保存临时图片
@@ -74,7 +313,9 @@ class ImageProcessor:
         """
         if not is_save:
             return True
-            
+        
+        from PIL import Image  # 只有保存图片时才需要PIL
+        
         img = Image.frombytes("RGB", img.size, img.bgra, "raw", "BGRX")
         save_path = os.path.abspath(path + self._get_sequence())
         img.save(save_path + '.png', format='PNG')
@@ -105,14 +346,30 @@ class ImageProcessor:
         image[image <= 200] = 0
         return image
     
+    def cycle_recognizer(self):
+        """按注册顺序切换到下一个识别引擎
+        
+        Returns:
+            str: 切换后的引擎名称
+        """
+        return self.recognizers.cycle()
+    
+    def get_recognizer_name(self):
+        """获取当前使用的识别引擎名称
+        
+        Returns:
+            str: 引擎名称
+        """
+        return self.recognizers.active_name
+    
     def toggle_matching_algorithm(self):
         """切换匹配算法
         
         Returns:
             bool: 当前是否使用模板匹配算法
         """
-        self.use_template_matching = not self.use_template_matching
-        return self.use_template_matching
+        self.cycle_recognizer()
+        return self.is_using_template_matching()
     
     def is_using_template_matching(self):
         """获取当前使用的匹配算法
@@ -120,7 +377,39 @@ class ImageProcessor:
         Returns:
             bool: 当前是否使用模板匹配算法
         """
-        return self.use_template_matching
+        return self.get_recognizer_name() == TemplateRecognizer.name
+    
+    def enable_shadow(self, secondary_name):
+        """启用影子对比模式
+        
+        Args:
+            secondary_name: 影子引擎名称
+        """
+        self.disable_shadow()
+        self.shadow = ShadowComparator(self.recognizers, secondary_name)
+        self.shadow.start()
+    
+    def disable_shadow(self):
+        """关闭影子对比模式"""
+        if self.shadow:
+            self.shadow.stop()
+            self.shadow = None
+    
+    def enable_dataset(self, directory):
+        """启用截图数据集记录
+        
+        Args:
+            directory: 数据集目录
+        """
+        self.disable_dataset()
+        self.dataset_writer = DatasetWriter(directory)
+        self.dataset_writer.start()
+    
+    def disable_dataset(self):
+        """关闭截图数据集记录，等待剩余截图写完"""
+        if self.dataset_writer:
+            self.dataset_writer.stop()
+            self.dataset_writer = None
     
     def template_similarity(self, template, target):
         """使用模板匹配计算图像相似度
@@ -130,71 +419,293 @@ class ImageProcessor:
             target: 目标图像
             
         Returns:
-            float: 相似度得分（百分比）
+            int: 映射后的相似度得分
         """
-        # 确保两个图像是灰度图
-        if len(template.shape) > 2:
-            template = cv.cvtColor(template, cv.COLOR_BGR2GRAY)
-        if len(target.shape) > 2:
-            target = cv.cvtColor(target, cv.COLOR_BGR2GRAY)
+        return TemplateRecognizer.score_pair(template, target)
+    
+    def classify_roi(self, roi):
+        """用当前引擎识别武器区域截图
+        
+        Args:
+            roi: RGB截图数组
             
-        # 调整模板大小以匹配目标图像
-        if template.shape != target.shape:
-            template = cv.resize(template, (target.shape[1], target.shape[0]))
+        Returns:
+            tuple: (得分是否达到引擎的最低阈值, 最佳武器ID, {武器ID: 得分})
+        """
+        import time
+        
+        recognizer = self.recognizers.active
+        start = time.perf_counter()
+        gun_id, score, scores = recognizer.classify(roi)
+        
+        # 影子模式：交给后台线程用另一引擎复核，不等待结果
+        if self.shadow:
+            self.shadow.submit(roi, recognizer.name, gun_id, time.perf_counter() - start)
+        return score >= recognizer.min_score, BankOptimizer.gun_id_of(gun_id), scores
+    
+    def enable_burst(self, size=4, interval=0.015, agreement=0.6):
+        """启用连拍投票：每次识别连续截取多帧，一次打分后按帧投票，不再等待重试
+        
+        Args:
+            size: 连拍帧数
+            interval: 连拍帧之间的间隔（秒）
+            agreement: 获胜武器在有效帧中至少需要的票数占比
+        """
+        self.burst_size = max(1, int(size))
+        self.burst_interval = interval
+        self.burst_agreement = agreement
+    
+    def classify_rois(self, rois):
+        """用当前引擎一次识别多张截图，支持批量打分的引擎只做一次矩阵运算
+        
+        Args:
+            rois: RGB截图数组列表，或形状为 (帧数, 高, 宽, 3) 的数组
             
-        # 使用OpenCV的模板匹配
-        try:
-            result = cv.matchTemplate(target, template, cv.TM_CCOEFF_NORMED)
-            _, max_val, _, _ = cv.minMaxLoc(result)
-            # 转换为0-100的相似度
-            similarity = max_val * 100
-            # 根据相似度计算接近于ORB特征点匹配的点数
-            # 40分以上才被认为有效，相当于特征点匹配的40个点
-            if similarity >= 60:
-                points = int(similarity / 2)
-            elif similarity >= 40:
-                points = int(similarity / 3)
-            else:
-                points = 0
-                
-            return points
-        except Exception:
-            return 0
+        Returns:
+            list: 每张截图的 (得分是否达到引擎的最低阈值, 最佳武器ID, {武器ID: 得分})
+        """
+        import time
+        
+        recognizer = self.recognizers.active
+        start = time.perf_counter()
+        results = recognizer.classify_batch(rois)
+        
+        if self.shadow and len(results):
+            self.shadow.submit(rois[0], recognizer.name, results[0][0], (time.perf_counter() - start) / len(results))
+        return [(score >= recognizer.min_score, BankOptimizer.gun_id_of(gun_id), scores)
+                for gun_id, score, scores in results]
     
-    def image_similarity_opencv(self, img1, img2):
-        """图片相似度比较
+    @staticmethod
+    def vote(results):
+        """对多帧识别结果计票，每个达到最低阈值的帧投一票
+        
+        不按得分加权：级联引擎的快速阶段得分是相似度百分比，ORB得分是匹配点数，
+        同一次连拍中的帧可能落在不同阶段，得分之间没有可比性
         
         Args:
-            img1: 图片1
-            img2: 图片2
+            results: 每帧的 (是否达到最低阈值, 武器ID, {武器ID: 得分})
             
         Returns:
-            int: 相似度
+            tuple: (获胜的武器ID, 获胜武器在有效帧中的票数占比, {武器ID: 票数})，没有有效帧时武器ID为空字符串
         """
-        # 如果启用了模板匹配，则使用模板匹配算法
-        if self.use_template_matching:
-            return self.template_similarity(img1, img2)
+        votes = {}
+        for matched, gun_id, _ in results:
+            if matched:
+                votes[gun_id] = votes.get(gun_id, 0) + 1
+        if not votes:
+            return "", 0.0, votes
+        winner = max(votes, key=votes.get)
+        return winner, votes[winner] / sum(votes.values()), votes
+    
+    def enable_change_detection(self, weapon_threshold=3.0):
+        """启用画面变化检测：武器区域与上次相比没有变化时跳过识别
+        
+        姿势检测只读取两个像素，比较缩略图的开销比检测本身更大，因此不参与变化检测
+        
+        跳过比例作为指标注册到阶段计时器，随统计一起导出
+        
+        Args:
+            weapon_threshold: 武器区域缩略图的平均绝对差阈值
+        """
+        from pubg_assistant.monitors.change_detector import ChangeDetector
+        
+        detector = ChangeDetector(weapon_threshold)
+        for slot in (1, 2):
+            detector.configure(f"weapon_{slot}", weapon_threshold)
+        self.change_detector = detector
+        self.stage_timer.register_gauge("change_detector", detector.get_stats)
+    
+    def enable_attachment_detection(self, occupancy=0.05, min_filled=2):
+        """启用满配/裸配识别：从武器识别的同一张截图中裁剪配件栏，不额外截图
+        
+        Args:
+            occupancy: 配件格中亮像素占比达到此值时认为装有配件
+            min_filled: 装有配件的格数达到此值时认为满配
+        """
+        self.attachment_detection = True
+        self.attachment_occupancy = occupancy
+        self.attachment_min_filled = min_filled
+        for slot in (1, 2):
+            area = self.resolution_config.get_attachment_area(slot)
+            if self._attachment_offset(self.get_weapon_box(slot), area) is None:
+                print(f"武器栏{slot}的配件栏不在武器识别区域内，无法识别满配/裸配: {area}")
+    
+    @staticmethod
+    def _attachment_offset(box, area):
+        """计算配件栏在武器区域截图中的位置
+        
+        Args:
+            box: 武器区域截图范围 (左, 上, 右, 下)
+            area: 配件栏区域
             
-        image1 = img1
-        image2 = cv.cvtColor(img2, cv.IMREAD_GRAYSCALE)
+        Returns:
+            tuple: (左, 上)，配件栏超出截图范围时为None
+        """
+        left, top = area['left'] - box[0], area['top'] - box[1]
+        if left < 0 or top < 0 or area['left'] + area['width'] > box[2] or area['top'] + area['height'] > box[3]:
+            return None
+        return left, top
+    
+    def classify_attachments(self, gun_pos, box, arr):
+        """按配件栏各格的亮像素占比判断满配/裸配
         
-        orb = cv.ORB_create()
-        kp1, des1 = orb.detectAndCompute(image1, None)
-        kp2, des2 = orb.detectAndCompute(image2, None)
+        配件栏按宽度等分为若干格，一次阈值和一次归约得到全部格的占比
         
-        if des1 is None or des2 is None:
-            return 0
+        Args:
+            gun_pos: 武器位置
+            box: 武器区域截图范围
+            arr: 武器区域RGB截图数组
             
-        bf = cv.BFMatcher(cv.NORM_HAMMING, crossCheck=True)
-        matches = bf.match(des1, des2)
-        matches = sorted(matches, key=lambda x: x.distance)
-        
-        good_matches = 0
-        for m in matches:
-            if m.distance <= 60:
-                good_matches = good_matches + 1
-                
-        return good_matches
+        Returns:
+            bool: 是否满配，配件栏不在截图范围内时为None
+        """
+        area = self.resolution_config.get_attachment_area(gun_pos)
+        offset = self._attachment_offset(box, area)
+        if offset is None:
+            return None
+        left, top = offset
+        slots = self.resolution_config.ATTACHMENT_SLOTS
+        cell_width = area['width'] // slots
+        strip = arr[top:top + area['height'], left:left + cell_width * slots]
+        gray = cv.cvtColor(strip, cv.COLOR_RGB2GRAY, dst=self.buffers.get("attachment.gray", strip.shape[:2]))
+        bright = np.greater(gray, 200, out=self.buffers.get("attachment.bright", gray.shape, np.bool_))
+        occupancy = bright.reshape(gray.shape[0], slots, cell_width).mean(axis=(0, 2))
+        full = int((occupancy >= self.attachment_occupancy).sum()) >= self.attachment_min_filled
+        loadouts = dict(self.slot_loadouts)
+        loadouts[gun_pos] = full
+        self.slot_loadouts = loadouts
+        return full
+    
+    def get_loadout(self, gun_pos):
+        """获取武器栏最近一次识别的满配/裸配结果
+        
+        Args:
+            gun_pos: 武器位置
+            
+        Returns:
+            bool: 是否满配，未识别过时为None
+        """
+        return self.slot_loadouts.get(gun_pos)
+    
+    def enable_fingerprints(self, distance=8):
+        """启用武器区域截图指纹：截图与该武器栏上次识别时的截图指纹一致时直接沿用上次结果
+        
+        Args:
+            distance: 允许的最大差异位数
+        """
+        self.fingerprint_distance = distance
+    
+    def roi_fingerprint(self, roi):
+        """计算武器区域截图的指纹
+        
+        与 extract_gun 相同先把不超过200的像素置0，只保留武器图标，
+        再缩小后比较相邻像素的明暗（差值哈希）
+        
+        Args:
+            roi: RGB截图数组
+            
+        Returns:
+            int: 指纹，位数为 宽*高
+        """
+        gray = roi
+        if len(roi.shape) == 3:
+            gray = cv.cvtColor(roi, cv.COLOR_RGB2GRAY, dst=self.buffers.get("fingerprint.gray", roi.shape[:2]))
+        _, thresholded = cv.threshold(gray, 200, 255, cv.THRESH_TOZERO,
+                                      dst=self.buffers.get("fingerprint.threshold", gray.shape))
+        width, height = self.fingerprint_size
+        thumb = cv.resize(thresholded, (width + 1, height), dst=self.buffers.get("fingerprint.thumb", (height, width + 1)),
+                          interpolation=cv.INTER_AREA)
+        bits = np.greater(thumb[:, 1:], thumb[:, :-1], out=self.buffers.get("fingerprint.bits", (height, width), np.bool_))
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+    
+    def match_fingerprint(self, gun_pos, box, fingerprint):
+        """查找与截图指纹一致的上次识别结果
+        
+        Args:
+            gun_pos: 武器位置
+            box: 截图区域，与记录时不同（如重新校准）时不匹配
+            fingerprint: 截图指纹
+            
+        Returns:
+            str: 上次识别出的武器ID，没有一致的记录时为空字符串
+        """
+        known = self.slot_fingerprints.get(gun_pos)
+        if not known or known[0] != box:
+            return ""
+        if bin(known[1] ^ fingerprint).count("1") > self.fingerprint_distance:
+            return ""
+        return known[2]
+    
+    def remember_fingerprint(self, gun_pos, box, fingerprint, gun_id):
+        """记录武器栏识别成功时的截图指纹
+        
+        Args:
+            gun_pos: 武器位置
+            box: 截图区域
+            fingerprint: 截图指纹
+            gun_id: 识别出的武器ID
+        """
+        fingerprints = dict(self.slot_fingerprints)
+        fingerprints[gun_pos] = (box, fingerprint, gun_id)
+        self.slot_fingerprints = fingerprints
+    
+    def get_fingerprints(self):
+        """导出各武器栏的截图指纹，用于保存会话快照
+        
+        Returns:
+            dict: {武器栏: {box, hash, id}}，指纹为十六进制字符串
+        """
+        return {
+            str(gun_pos): {"box": list(box), "hash": format(fingerprint, "x"), "id": gun_id}
+            for gun_pos, (box, fingerprint, gun_id) in self.slot_fingerprints.items()
+        }
+    
+    def restore_fingerprints(self, data):
+        """从会话快照恢复截图指纹，截图区域与当前布局不一致的记录被丢弃
+        
+        Args:
+            data: get_fingerprints 的返回值
+            
+        Returns:
+            int: 恢复的记录数
+        """
+        fingerprints = {}
+        known_ids = {BankOptimizer.gun_id_of(name) for name in self.gun_img_dict}
+        for key, entry in (data or {}).items():
+            try:
+                gun_pos = int(key)
+                box = tuple(entry["box"])
+                if box != self.get_weapon_box(gun_pos):
+                    continue
+                if known_ids and entry["id"] not in known_ids:
+                    continue  # 模板已被删除或合并（远程识别时本地没有模板库，不检查）
+                fingerprints[gun_pos] = (box, int(entry["hash"], 16), entry["id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        self.slot_fingerprints = fingerprints
+        return len(fingerprints)
+    
+    def get_weapon_box(self, gun_pos):
+        """获取武器区域的截图范围
+        
+        Args:
+            gun_pos: 武器位置，1或2
+            
+        Returns:
+            tuple: (左, 上, 右, 下)
+        """
+        weapon_area = self.resolution_config.get_weapon_area(gun_pos)
+        return (weapon_area['left'], weapon_area['top'],
+                weapon_area['left'] + weapon_area['width'],
+                weapon_area['top'] + weapon_area['height'])
+    
+    def get_engine_stats(self):
+        """获取全部识别引擎的耗时统计
+        
+        Returns:
+            list: 各引擎耗时统计摘要
+        """
+        return self.recognizers.get_stats()
     
     def detect_weapon(self, gun_pos):
         """检测武器
@@ -206,55 +717,176 @@ class ImageProcessor:
             tuple: (是否检测到武器, 武器ID)
         """
         # 获取武器区域
-        weapon_area = self.resolution_config.get_weapon_area(gun_pos)
-        box = (weapon_area['left'], weapon_area['top'], 
-               weapon_area['left'] + weapon_area['width'], 
-               weapon_area['top'] + weapon_area['height'])
+        box = self.get_weapon_box(gun_pos)
         
         n = 0
-        time_to_sleep = 0.35
+        time_to_sleep = self.swap_delay
         import time
-        time.sleep(time_to_sleep)
+        timer = self.stage_timer
+        detect_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        with timer.stage("weapon.sleep"):
+            time.sleep(time_to_sleep)
+        
+        # 连拍模式：几十毫秒内的多帧投票代替等待1秒后的重试
+        if self.burst_size > 1:
+            matched, gun_id = self._detect_weapon_burst(gun_pos, box)
+            timer.record("weapon.total", time.perf_counter() - detect_start)
+            self._add_cpu_time(time.thread_time() - cpu_start)
+            return matched, gun_id
         
         while True:
             # 截图
-            img = self.screenshot(box)
-            arr = np.array(img.pixels, dtype=np.uint8)
+            with timer.stage("weapon.screenshot"):
+                img = self.screenshot(box)
+            with timer.stage("weapon.convert"):
+                arr = self.frame_to_rgb(img)
             
-            # 保存临时图片
-            # 使用绝对路径
-            save_dir = os.path.join(self.temp_dir, '')
-            self.save_temp_pic(img, save_dir, False)
+            # 配件栏在同一张截图中，满配/裸配随武器一起识别
+            if self.attachment_detection:
+                with timer.stage("weapon.attachments"):
+                    self.classify_attachments(gun_pos, box, arr)
+            
+            # 画面没有变化或截图指纹与该武器栏上次识别时一致，直接沿用上次结果，不再匹配
+            fingerprint, known_id = self._lookup_previous(gun_pos, box, arr)
+            if known_id:
+                timer.record("weapon.total", time.perf_counter() - detect_start)
+                self._add_cpu_time(time.thread_time() - cpu_start)
+                return True, known_id
             
             # 武器相似度比较
-            similarity_dict = {}
-            max_similarity = 0
-            max_gun_id = ""
+            with timer.stage("weapon.match"):
+                matched, max_gun_id, similarity_dict = self.classify_roi(arr)
             
-            for gun_id in self.gun_img_dict:
-                result = self.image_similarity_opencv(self.gun_img_dict[gun_id], arr)
-                similarity_dict[gun_id] = result
-                
-                if result >= 40:
-                    # 如果相似度大于阈值，返回检测到的武器
-                    return True, gun_id
-                
-                if result > max_similarity:
-                    max_similarity = result
-                    max_gun_id = gun_id
+            # 数据集记录：原始截图交给后台线程写入，代替同步保存PNG
+            if self.dataset_writer:
+                self.dataset_writer.submit(img, gun_pos, max_gun_id, similarity_dict)
             
-            # 如果最大相似度大于10，也认为检测到武器
-            if max_similarity >= 10:
+            # 如果最大相似度达到引擎的最低阈值，认为检测到武器
+            if matched:
+                self._remember_result(gun_pos, box, fingerprint, max_gun_id)
+                timer.record("weapon.total", time.perf_counter() - detect_start)
+                self._add_cpu_time(time.thread_time() - cpu_start)
                 return True, max_gun_id
                 
             n = n + 1
             if n >= 2:  # 如果2次还没有识别出来，退出循环
                 break
                 
-            time.sleep(1)
-            
+            with timer.stage("weapon.retry_sleep"):
+                time.sleep(self.retry_delay)
+        
+        timer.record("weapon.total", time.perf_counter() - detect_start)
+        self._add_cpu_time(time.thread_time() - cpu_start)
         return False, ""
     
+    def _lookup_previous(self, gun_pos, box, arr):
+        """查找可以直接沿用的上次识别结果：先看区域画面是否变化，再比较截图指纹
+        
+        Args:
+            gun_pos: 武器位置
+            box: 截图区域
+            arr: RGB截图数组
+            
+        Returns:
+            tuple: (截图指纹, 可沿用的武器ID)，未启用指纹时指纹为None，没有可沿用的结果时武器ID为空字符串
+        """
+        if self.change_detector:
+            with self.stage_timer.stage("weapon.change"):
+                changed = self.change_detector.changed(f"weapon_{gun_pos}", arr)
+            if changed:
+                self.slot_results.pop(gun_pos, None)
+            elif self.slot_results.get(gun_pos):
+                return None, self.slot_results[gun_pos]
+        if self.fingerprint_distance is None:
+            return None, ""
+        with self.stage_timer.stage("weapon.fingerprint"):
+            fingerprint = self.roi_fingerprint(arr)
+            known_id = self.match_fingerprint(gun_pos, box, fingerprint)
+        if known_id:
+            self.fingerprint_hits += 1
+        return fingerprint, known_id
+    
+    def _remember_result(self, gun_pos, box, fingerprint, gun_id):
+        """记录武器栏的识别结果，供画面未变化或指纹一致时沿用
+        
+        Args:
+            gun_pos: 武器位置
+            box: 截图区域
+            fingerprint: 截图指纹，未启用指纹时为None
+            gun_id: 识别出的武器ID
+        """
+        if self.change_detector:
+            self.slot_results[gun_pos] = gun_id
+        if fingerprint is not None:
+            self.remember_fingerprint(gun_pos, box, fingerprint, gun_id)
+    
+    def _detect_weapon_burst(self, gun_pos, box):
+        """连续截取多帧写入预先分配的帧栈，一次打分后按帧投票
+        
+        Args:
+            gun_pos: 武器位置
+            box: 截图区域
+            
+        Returns:
+            tuple: (是否检测到武器, 武器ID)
+        """
+        import time
+        
+        timer = self.stage_timer
+        count = self.burst_size
+        shots = []
+        fingerprint = None
+        for index in range(count):
+            if index:
+                with timer.stage("weapon.burst_interval"):
+                    time.sleep(self.burst_interval)
+            with timer.stage("weapon.screenshot"):
+                img = self.screenshot(box)
+            with timer.stage("weapon.convert"):
+                width, height = img.size
+                stack = self.buffers.get("burst.stack", (count, height, width, 3))
+                self.frame_to_rgb(img, out=stack[index])
+            shots.append(img)
+            if index == 0:
+                if self.attachment_detection:
+                    with timer.stage("weapon.attachments"):
+                        self.classify_attachments(gun_pos, box, stack[0])
+                # 第一帧与上次识别时一致就不再连拍
+                fingerprint, known_id = self._lookup_previous(gun_pos, box, stack[0])
+                if known_id:
+                    return True, known_id
+        
+        with timer.stage("weapon.match"):
+            results = self.classify_rois(stack)
+            gun_id, agreement, _ = self.vote(results)
+        
+        if self.dataset_writer:
+            for img, (_, predicted_id, scores) in zip(shots, results):
+                self.dataset_writer.submit(img, gun_pos, predicted_id, scores)
+        
+        if not gun_id or agreement < self.burst_agreement:
+            return False, ""
+        self._remember_result(gun_pos, box, fingerprint, gun_id)
+        return True, gun_id
+    
+    def _add_cpu_time(self, seconds):
+        """累加识别消耗的CPU时间
+        
+        Args:
+            seconds: 线程CPU时间（秒）
+        """
+        with self.cpu_lock:
+            self.cpu_time += seconds
+    
+    def get_cpu_time(self):
+        """获取武器和姿势识别累计消耗的CPU时间
+        
+        Returns:
+            float: CPU时间（秒）
+        """
+        return self.cpu_time
+    
     def get_rgb(self, box):
         """获取RGB值
         
@@ -268,11 +900,20 @@ class ImageProcessor:
         # 使用绝对路径
         save_dir = os.path.join(self.posture_temp_dir, '')
         self.save_temp_pic(img, save_dir, False)
-        r, g, b = img.pixel(3, 3)
+        return self.is_white(img.pixel(3, 3))
+    
+    @staticmethod
+    def is_white(rgb):
+        """判断像素是否为白色
         
-        if r > 190 and g > 190 and b > 190:
-            return True
-        return False
+        Args:
+            rgb: (r, g, b)
+            
+        Returns:
+            bool: 是否为白色
+        """
+        r, g, b = rgb[:3]
+        return r > 190 and g > 190 and b > 190
     
     def detect_posture(self):
         """检测姿势
@@ -294,12 +935,19 @@ class ImageProcessor:
                 area2['left'] + area2['width'], 
                 area2['top'] + area2['height'])
         
-        # 检测点1
-        time.sleep(0.05)
-        result1 = self.get_rgb(box1)
+        timer = self.stage_timer
+        cpu_start = time.thread_time()
+        
+        with timer.stage("posture.sleep"):
+            time.sleep(0.05)
         
-        # 检测点2
-        result2 = self.get_rgb(box2)
+        with timer.stage("posture.screenshot"):
+            # 检测点1
+            result1 = self.get_rgb(box1)
+            
+            # 检测点2
+            result2 = self.get_rgb(box2)
+        self._add_cpu_time(time.thread_time() - cpu_start)
         
         if result1 and result2:
             return 1  # 站立
@@ -0,0 +1,767 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+识别引擎模块
+所有武器识别引擎实现统一的 prepare(bank) / classify(roi) 接口，由注册表管理并支持运行时切换
+"""
+
+import time
+import threading
+
+import cv2 as cv
+
+from pubg_assistant.metrics.latency_histogram import LatencyHistogram
+from pubg_assistant.metrics.stage_timer import get_stage_timer
+from pubg_assistant.processors.buffer_pool import BufferPool
+
+class Recognizer:
+    """识别引擎基类
+
+    子类实现 _prepare_roi 和 _score，基类负责遍历模板、提前确认和耗时统计；
+    截图预处理和模板比较分别计入阶段计时器的 <引擎名>.extract 和 <引擎名>.match
+    """
+
+    name = ""
+    accept_score = 40  # 得分达到此值时立即确认，不再比较剩余模板
+    min_score = 10  # 最高得分达到此值时认为识别成功
+    tunables = ("accept_score", "min_score")  # 可由阈值配置文件覆盖的属性
+
+    def __init__(self):
+        """初始化识别引擎"""
+        self.bank = {}
+        self.histogram = LatencyHistogram(self.name)
+        self.buffers = BufferPool()  # 识别过程中间结果的缓冲区
+        self.stage_timer = get_stage_timer()
+
+    def set_stage_timer(self, stage_timer):
+        """设置记录分阶段耗时的计时器
+
+        Args:
+            stage_timer: 阶段计时器
+        """
+        self.stage_timer = stage_timer
+
+    def prepare(self, bank):
+        """根据模板库预先计算引擎需要的数据
+
+        Args:
+            bank: 模板库 {武器ID: 灰度模板图像}
+        """
+        self.bank = bank
+
+    def update(self, bank, changed_ids):
+        """模板库部分变化时更新引擎数据，默认全部重新计算
+
+        Args:
+            bank: 新的模板库
+            changed_ids: 新增或内容变化的武器ID
+        """
+        self.prepare(bank)
+
+    def _gray(self, roi):
+        """把截图区域转为灰度图，结果写入缓冲区
+
+        Args:
+            roi: 截图区域数组
+
+        Returns:
+            ndarray: 灰度图，下次调用时会被覆盖
+        """
+        if len(roi.shape) == 2:
+            return roi
+        return cv.cvtColor(roi, cv.COLOR_BGR2GRAY, dst=self.buffers.get("gray", roi.shape[:2]))
+
+    def _prepare_roi(self, roi):
+        """预处理截图区域，每次识别只执行一次
+
+        Args:
+            roi: 截图区域数组
+
+        Returns:
+            any: 引擎内部使用的截图数据
+        """
+        return roi
+
+    def _score(self, gun_id, roi_data):
+        """计算截图与单个模板的得分
+
+        Args:
+            gun_id: 武器ID
+            roi_data: _prepare_roi 的返回值
+
+        Returns:
+            int: 得分
+        """
+        raise NotImplementedError
+
+    def classify(self, roi, candidates=None):
+        """识别截图区域中的武器
+
+        Args:
+            roi: 截图区域数组
+            candidates: 只比较这些武器ID，为空时比较全部模板
+
+        Returns:
+            tuple: (最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        start = time.perf_counter()
+        with self.stage_timer.stage(f"{self.name}.extract"):
+            roi_data = self._prepare_roi(roi)
+        scores = {}
+        best_id, best_score = "", 0
+        bank = self.bank  # 模板库整体替换，遍历期间使用同一份
+        with self.stage_timer.stage(f"{self.name}.match"):
+            for gun_id in (candidates if candidates is not None else bank):
+                score = self._score(gun_id, roi_data)
+                scores[gun_id] = score
+                if score > best_score:
+                    best_id, best_score = gun_id, score
+                if score >= self.accept_score:
+                    break
+        self.histogram.record_seconds(time.perf_counter() - start)
+        return best_id, best_score, scores
+
+    def classify_batch(self, rois):
+        """识别一批截图区域，默认逐个识别
+
+        Args:
+            rois: 截图区域数组列表
+
+        Returns:
+            list: 每个截图的 (最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        return [self.classify(roi) for roi in rois]
+
+    def get_stats(self):
+        """获取引擎耗时统计
+
+        Returns:
+            dict: 耗时统计摘要
+        """
+        return self.histogram.to_dict()
+
+class OrbRecognizer(Recognizer):
+    """ORB特征点匹配引擎，模板的特征点在 prepare 时一次性计算"""
+
+    name = "orb"
+
+    def __init__(self):
+        """初始化ORB引擎"""
+        super().__init__()
+        self.descriptors = {}
+        self.local = threading.local()  # ORB和匹配器对象不共享给多个线程
+
+    def _tools(self):
+        """获取当前线程的ORB检测器和匹配器
+
+        Returns:
+            tuple: (ORB检测器, BF匹配器)
+        """
+        tools = getattr(self.local, "tools", None)
+        if tools is None:
+            tools = (cv.ORB_create(), cv.BFMatcher(cv.NORM_HAMMING, crossCheck=True))
+            self.local.tools = tools
+        return tools
+
+    def prepare(self, bank):
+        """预先计算全部模板的ORB描述子
+
+        Args:
+            bank: 模板库 {武器ID: 灰度模板图像}
+        """
+        orb, _ = self._tools()
+        descriptors = {}
+        for gun_id, template in bank.items():
+            _, des = orb.detectAndCompute(template, None)
+            descriptors[gun_id] = des
+        self.descriptors = descriptors
+        self.bank = bank
+
+    def update(self, bank, changed_ids):
+        """只为变化的模板重新计算ORB描述子，新字典计算完成后整体替换
+
+        Args:
+            bank: 新的模板库
+            changed_ids: 新增或内容变化的武器ID
+        """
+        orb, _ = self._tools()
+        changed = set(changed_ids)
+        old = self.descriptors
+        descriptors = {}
+        for gun_id, template in bank.items():
+            if gun_id in changed or gun_id not in old:
+                _, descriptors[gun_id] = orb.detectAndCompute(template, None)
+            else:
+                descriptors[gun_id] = old[gun_id]
+        self.descriptors = descriptors
+        self.bank = bank
+
+    def _prepare_roi(self, roi):
+        # 与原实现保持一致的颜色转换，ORB内部再转为灰度
+        dst = self.buffers.get("orb.image", roi.shape[:2] + (4,)) if len(roi.shape) == 3 else None
+        image = cv.cvtColor(roi, cv.IMREAD_GRAYSCALE, dst=dst)
+        orb, _ = self._tools()
+        _, des = orb.detectAndCompute(image, None)
+        return des
+
+    def _score(self, gun_id, roi_data):
+        des1 = self.descriptors.get(gun_id)
+        if des1 is None or roi_data is None:
+            return 0
+        _, matcher = self._tools()
+        matches = matcher.match(des1, roi_data)
+        return sum(1 for m in matches if m.distance <= 60)
+
+class TemplateRecognizer(Recognizer):
+    """归一化模板匹配引擎，得分映射到与ORB匹配点数相近的范围
+
+    每种截图尺寸只缩放一次模板：缩放后的模板去均值、除以范数，按行存为连续的float32矩阵，
+    识别时只需处理截图一侧，再做一次矩阵乘法即可得到全部模板的相关系数
+    """
+
+    name = "template"
+    tunables = ("min_score",)  # 一次矩阵乘法比较全部模板，不存在提前确认
+
+    def __init__(self):
+        """初始化模板匹配引擎"""
+        super().__init__()
+        self.shape_cache = {}  # {截图尺寸: (武器ID列表, 归一化模板矩阵, 均值, 范数)}
+        self.cache_lock = threading.Lock()
+
+    def prepare(self, bank):
+        """更换模板库，清空按尺寸缓存的模板
+
+        Args:
+            bank: 模板库 {武器ID: 灰度模板图像}
+        """
+        with self.cache_lock:
+            self.bank = bank
+            self.shape_cache = {}
+
+    def get_templates(self, shape):
+        """获取按截图尺寸缩放并归一化的模板，首次使用某个尺寸时构建
+
+        Args:
+            shape: 截图尺寸 (高, 宽)
+
+        Returns:
+            tuple: (武器ID列表, 归一化模板矩阵 N x (高*宽), 均值数组, 范数数组)
+        """
+        entry = self.shape_cache.get(shape)
+        if entry is not None:
+            return entry
+
+        with self.cache_lock:
+            entry = self.shape_cache.get(shape)
+            if entry is not None:
+                return entry
+            entry = self._build_entry(self.bank, shape)
+            self.shape_cache[shape] = entry
+            return entry
+
+    def _build_entry(self, bank, shape, previous=None, changed=()):
+        """构建某个截图尺寸的归一化模板矩阵
+
+        Args:
+            bank: 模板库
+            shape: 截图尺寸 (高, 宽)
+            previous: 同尺寸的旧缓存，未变化的模板直接复用其中的行
+            changed: 内容变化的武器ID
+
+        Returns:
+            tuple: (武器ID列表, 归一化模板矩阵, 均值数组, 范数数组)
+        """
+        import numpy as np
+
+        height, width = shape
+        gun_ids = list(bank)
+        old_rows = {}
+        if previous is not None:
+            old_rows = {gun_id: row for row, gun_id in enumerate(previous[0]) if gun_id not in changed}
+        matrix = np.zeros((len(gun_ids), height * width), dtype=np.float32)
+        means = np.zeros(len(gun_ids), dtype=np.float32)
+        norms = np.zeros(len(gun_ids), dtype=np.float32)
+        for row, gun_id in enumerate(gun_ids):
+            old_row = old_rows.get(gun_id)
+            if old_row is not None:
+                matrix[row] = previous[1][old_row]
+                means[row] = previous[2][old_row]
+                norms[row] = previous[3][old_row]
+                continue
+            template = bank[gun_id]
+            if template.shape != shape:
+                template = cv.resize(template, (width, height))
+            vector = matrix[row]
+            vector[:] = template.reshape(-1)
+            means[row] = vector.mean()
+            vector -= means[row]
+            norms[row] = np.linalg.norm(vector)
+            if norms[row] > 0:
+                vector /= norms[row]
+        return gun_ids, np.ascontiguousarray(matrix), means, norms
+
+    def update(self, bank, changed_ids):
+        """只为变化的模板重新缩放和归一化，已缓存的其他尺寸同样增量更新
+
+        Args:
+            bank: 新的模板库
+            changed_ids: 新增或内容变化的武器ID
+        """
+        changed = set(changed_ids)
+        with self.cache_lock:
+            shape_cache = {
+                shape: self._build_entry(bank, shape, entry, changed)
+                for shape, entry in self.shape_cache.items()
+            }
+            self.bank = bank
+            self.shape_cache = shape_cache
+
+    def correlations(self, gray):
+        """计算灰度截图与全部模板的相关系数（等价于同尺寸的 TM_CCOEFF_NORMED）
+
+        Args:
+            gray: 灰度截图
+
+        Returns:
+            tuple: (武器ID列表, 相关系数数组)，数组为缓冲区，下次调用时会被覆盖
+        """
+        import numpy as np
+
+        gun_ids, matrix, _, _ = self.get_templates(gray.shape)
+        frame = self.buffers.get("template.frame", (matrix.shape[1],), np.float32)
+        frame[:] = gray.reshape(-1)
+        frame -= frame.mean()
+        norm = float(np.linalg.norm(frame))
+        values = self.buffers.get("template.values", (len(gun_ids),), np.float32)
+        if norm == 0 or not gun_ids:
+            values.fill(0)
+            return gun_ids, values
+        np.matmul(matrix, frame, out=values)
+        values /= norm
+        return gun_ids, values
+
+    def classify(self, roi, candidates=None):
+        """一次矩阵乘法计算全部模板的得分
+
+        Args:
+            roi: 截图区域数组
+            candidates: 只比较这些武器ID，为空时比较全部模板
+
+        Returns:
+            tuple: (最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        start = time.perf_counter()
+        with self.stage_timer.stage("template.extract"):
+            gray = self._gray(roi)
+        with self.stage_timer.stage("template.match"):
+            gun_ids, values = self.correlations(gray)
+            result = self._to_scores(gun_ids, values.tolist(), candidates)
+        self.histogram.record_seconds(time.perf_counter() - start)
+        return result
+
+    def _to_scores(self, gun_ids, values, candidates=None):
+        """把相关系数映射为得分并找出最佳模板
+
+        Args:
+            gun_ids: 武器ID列表
+            values: 与武器ID对应的相关系数
+            candidates: 只保留这些武器ID，为空时保留全部
+
+        Returns:
+            tuple: (最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        allowed = set(candidates) if candidates is not None else None
+        scores = {}
+        best_id, best_score = "", 0
+        for gun_id, value in zip(gun_ids, values):
+            if allowed is not None and gun_id not in allowed:
+                continue
+            score = self.similarity_to_points(value * 100)
+            scores[gun_id] = score
+            if score > best_score:
+                best_id, best_score = gun_id, score
+        return best_id, best_score, scores
+
+    def classify_batch(self, rois):
+        """同尺寸的截图拼成一个矩阵，一次矩阵乘法得到整批截图与全部模板的相关系数
+
+        Args:
+            rois: 截图区域数组列表
+
+        Returns:
+            list: 每个截图的 (最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        import numpy as np
+
+        start = time.perf_counter()
+        results = [None] * len(rois)
+        groups = {}  # {截图尺寸: [序号, ...]}
+        for index, roi in enumerate(rois):
+            groups.setdefault(roi.shape[:2], []).append(index)
+
+        for shape, indices in groups.items():
+            gun_ids, matrix, _, _ = self.get_templates(shape)
+            with self.stage_timer.stage("template.extract"):
+                frames = self.buffers.get("template.batch", (len(indices), matrix.shape[1]), np.float32)
+                for row, index in enumerate(indices):
+                    frames[row] = self._gray(rois[index]).reshape(-1)
+                frames -= frames.mean(axis=1, keepdims=True)
+                norms = np.linalg.norm(frames, axis=1)
+                norms[norms == 0] = np.inf  # 纯色截图的相关系数按0处理
+            with self.stage_timer.stage("template.match"):
+                values = self.buffers.get("template.batch_values", (len(gun_ids), len(indices)), np.float32)
+                np.matmul(matrix, frames.T, out=values)  # 模板数 x 截图数
+                values /= norms
+                for column, index in enumerate(indices):
+                    results[index] = self._to_scores(gun_ids, values[:, column].tolist())
+
+        # 按整批耗时平均到每个截图
+        if len(rois):
+            per_roi = (time.perf_counter() - start) / len(rois)
+            for _ in rois:
+                self.histogram.record_seconds(per_roi)
+        return results
+
+    @staticmethod
+    def score_pair(template, target):
+        """使用模板匹配计算图像相似度
+
+        Args:
+            template: 模板图像
+            target: 目标图像
+
+        Returns:
+            int: 映射后的得分
+        """
+        # 确保两个图像是灰度图
+        if len(template.shape) > 2:
+            template = cv.cvtColor(template, cv.COLOR_BGR2GRAY)
+        if len(target.shape) > 2:
+            target = cv.cvtColor(target, cv.COLOR_BGR2GRAY)
+
+        # 调整模板大小以匹配目标图像
+        if template.shape != target.shape:
+            template = cv.resize(template, (target.shape[1], target.shape[0]))
+
+        try:
+            result = cv.matchTemplate(target, template, cv.TM_CCOEFF_NORMED)
+            _, max_val, _, _ = cv.minMaxLoc(result)
+        except Exception:
+            return 0
+        return TemplateRecognizer.similarity_to_points(max_val * 100)
+
+    @staticmethod
+    def similarity_to_points(similarity):
+        """把0-100的相似度映射为接近ORB特征点匹配的点数
+
+        40分以上才被认为有效，相当于特征点匹配的40个点
+
+        Args:
+            similarity: 相似度（百分比）
+
+        Returns:
+            int: 点数
+        """
+        if similarity >= 60:
+            return int(similarity / 2)
+        if similarity >= 40:
+            return int(similarity / 3)
+        return 0
+
+class CascadeRecognizer(Recognizer):
+    """级联识别引擎
+
+    先用缩略图哈希对全部模板打分，最高分与次高分的差距足够大时直接确认；
+    否则只把得分最高的几个候选交给昂贵引擎（ORB或模板匹配）复核
+    """
+
+    name = "cascade"
+    tunables = ("min_score", "min_similarity", "margin")
+
+    def __init__(self, expensive, margin=0.08, min_similarity=0.85, top_k=3, hash_size=(32, 16)):
+        """初始化级联识别引擎
+
+        Args:
+            expensive: 复核使用的昂贵引擎
+            margin: 最高分与次高分的最小差距，低于此值时交给昂贵引擎
+            min_similarity: 廉价阶段直接确认所需的最低相似度（0~1）
+            top_k: 交给昂贵引擎复核的候选个数
+            hash_size: 缩略图尺寸 (宽, 高)
+        """
+        super().__init__()
+        self.expensive = expensive
+        self.margin = margin
+        self.min_similarity = min_similarity
+        self.top_k = top_k
+        self.hash_size = hash_size
+        self.min_score = expensive.min_score
+        self.accept_score = expensive.accept_score
+        self.hash_index = ([], None)  # (武器ID列表, 模板哈希矩阵)，每行为 ±1 的float32向量，整体替换
+        self.cheap_decisions = 0
+        self.expensive_decisions = 0
+
+    def _hash(self, gray, out=None):
+        """计算灰度图的缩略图哈希
+
+        Args:
+            gray: 灰度图
+            out: 写入结果的布尔向量，为空时使用缓冲区
+
+        Returns:
+            ndarray: 布尔向量，长度为 宽*高
+        """
+        import numpy as np
+
+        width, height = self.hash_size
+        # 与 extract_gun 相同的阈值：不超过200的像素置0
+        _, thresholded = cv.threshold(gray, 200, 255, cv.THRESH_TOZERO,
+                                      dst=self.buffers.get("cascade.threshold", gray.shape))
+        thumb = cv.resize(thresholded, self.hash_size, dst=self.buffers.get("cascade.thumb", (height, width)),
+                          interpolation=cv.INTER_AREA)
+        if out is None:
+            out = self.buffers.get("cascade.hash", (width * height,), np.bool_)
+        np.greater(thumb.reshape(-1), cv.mean(thumb)[0], out=out)
+        return out
+
+    def prepare(self, bank):
+        """预先计算全部模板的缩略图哈希，并准备昂贵引擎
+
+        Args:
+            bank: 模板库 {武器ID: 灰度模板图像}
+        """
+        self.expensive.prepare(bank)
+        self.hash_index = self._build_index(bank)
+        self.bank = bank
+
+    def update(self, bank, changed_ids):
+        """只为变化的模板重新计算哈希，并增量更新昂贵引擎
+
+        Args:
+            bank: 新的模板库
+            changed_ids: 新增或内容变化的武器ID
+        """
+        self.expensive.update(bank, changed_ids)
+        self.hash_index = self._build_index(bank, self.hash_index, set(changed_ids))
+        self.bank = bank
+
+    def _build_index(self, bank, previous=None, changed=()):
+        """构建模板哈希矩阵
+
+        Args:
+            bank: 模板库
+            previous: 旧的 (武器ID列表, 哈希矩阵)，未变化的模板直接复用其中的行
+            changed: 内容变化的武器ID
+
+        Returns:
+            tuple: (武器ID列表, 哈希矩阵)，模板库为空时矩阵为None
+        """
+        import numpy as np
+
+        gun_ids = list(bank)
+        if not gun_ids:
+            return gun_ids, None
+        old_rows = {}
+        if previous is not None and previous[1] is not None:
+            old_rows = {gun_id: row for row, gun_id in enumerate(previous[0]) if gun_id not in changed}
+        width, height = self.hash_size
+        hash_matrix = np.zeros((len(gun_ids), width * height), dtype=np.float32)
+        for row, gun_id in enumerate(gun_ids):
+            old_row = old_rows.get(gun_id)
+            if old_row is not None:
+                hash_matrix[row] = previous[1][old_row]
+            else:
+                hash_matrix[row] = self._hash(bank[gun_id])
+                hash_matrix[row] *= 2
+                hash_matrix[row] -= 1
+        return gun_ids, hash_matrix
+
+    def classify(self, roi, candidates=None):
+        """先廉价打分，差距不足时交给昂贵引擎复核前几名
+
+        Args:
+            roi: 截图区域数组
+            candidates: 只比较这些武器ID，为空时比较全部模板
+
+        Returns:
+            tuple: (最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        import numpy as np
+
+        hash_ids, hash_matrix = self.hash_index
+        if hash_matrix is None:
+            return "", 0, {}
+
+        start = time.perf_counter()
+        with self.stage_timer.stage("cascade.hash"):
+            hash_ids, similarity = self.hash_similarity(self._gray(roi))
+        if candidates is not None:
+            allowed = set(candidates)
+            similarity = np.where([gun_id in allowed for gun_id in hash_ids], similarity, -1.0)
+
+        order = np.argsort(similarity)[::-1]
+        best = similarity[order[0]]
+        second = similarity[order[1]] if len(order) > 1 else 0.0
+
+        if best >= self.min_similarity and best - second >= self.margin:
+            self.cheap_decisions += 1
+            best_id = hash_ids[order[0]]
+            result = (best_id, int(best * 100), {best_id: int(best * 100)})
+        else:
+            self.expensive_decisions += 1
+            shortlist = [hash_ids[i] for i in order[:self.top_k] if similarity[i] >= 0]
+            result = self.expensive.classify(roi, shortlist)
+
+        self.histogram.record_seconds(time.perf_counter() - start)
+        return result
+
+    def set_stage_timer(self, stage_timer):
+        """设置阶段计时器，复核使用的昂贵引擎使用同一个计时器
+
+        Args:
+            stage_timer: 阶段计时器
+        """
+        super().set_stage_timer(stage_timer)
+        self.expensive.set_stage_timer(stage_timer)
+
+    def hash_similarity(self, gray):
+        """计算灰度截图与全部模板的缩略图哈希相似度
+
+        Args:
+            gray: 灰度截图
+
+        Returns:
+            tuple: (武器ID列表, 0~1的相似度数组)，数组为缓冲区，下次调用时会被覆盖
+        """
+        import numpy as np
+
+        hash_ids, hash_matrix = self.hash_index
+        # 哈希位转为 ±1 后，与模板哈希的内积 d 对应相同位数 (L + d) / 2，一次矩阵乘法得到全部相似度
+        length = hash_matrix.shape[1]
+        signs = self.buffers.get("cascade.signs", (length,), np.float32)
+        np.multiply(self._hash(gray), 2, out=signs)
+        signs -= 1
+        similarity = self.buffers.get("cascade.similarity", (len(hash_ids),), np.float32)
+        np.matmul(hash_matrix, signs, out=similarity)
+        similarity += length
+        similarity /= 2 * length
+        return hash_ids, similarity
+
+    def get_stats(self):
+        """获取耗时统计及各阶段确认次数
+
+        Returns:
+            dict: 耗时统计摘要，附带 cheap / expensive 确认次数
+        """
+        stats = super().get_stats()
+        total = self.cheap_decisions + self.expensive_decisions
+        stats["cheap_decisions"] = self.cheap_decisions
+        stats["expensive_decisions"] = self.expensive_decisions
+        stats["cheap_ratio"] = round(self.cheap_decisions / total, 3) if total else 0.0
+        return stats
+
+class RecognizerRegistry:
+    """识别引擎注册表类，维护已注册引擎和当前使用的引擎"""
+
+    def __init__(self):
+        """初始化注册表"""
+        self.recognizers = {}
+        self.order = []
+        self.active_name = None
+        self.bank = {}
+
+    def register(self, recognizer):
+        """注册识别引擎，第一个注册的引擎作为默认引擎
+
+        Args:
+            recognizer: 识别引擎
+        """
+        if recognizer.name not in self.recognizers:
+            self.order.append(recognizer.name)
+        self.recognizers[recognizer.name] = recognizer
+        if self.bank:
+            recognizer.prepare(self.bank)
+        if self.active_name is None:
+            self.active_name = recognizer.name
+
+    def prepare(self, bank):
+        """用新的模板库准备全部引擎
+
+        Args:
+            bank: 模板库 {武器ID: 灰度模板图像}
+        """
+        self.bank = bank
+        for name in self.order:
+            self.recognizers[name].prepare(bank)
+
+    def update(self, bank, changed_ids):
+        """模板库部分变化时增量更新全部引擎
+
+        Args:
+            bank: 新的模板库
+            changed_ids: 新增或内容变化的武器ID
+        """
+        self.bank = bank
+        for name in self.order:
+            self.recognizers[name].update(bank, changed_ids)
+
+    def set_stage_timer(self, stage_timer):
+        """为全部已注册引擎设置阶段计时器
+
+        Args:
+            stage_timer: 阶段计时器
+        """
+        for name in self.order:
+            self.recognizers[name].set_stage_timer(stage_timer)
+
+    def get(self, name):
+        """按名称获取引擎
+
+        Args:
+            name: 引擎名称
+
+        Returns:
+            Recognizer: 识别引擎
+        """
+        return self.recognizers[name]
+
+    def names(self):
+        """获取已注册引擎名称
+
+        Returns:
+            list: 引擎名称，按注册顺序
+        """
+        return list(self.order)
+
+    @property
+    def active(self):
+        """当前使用的引擎"""
+        return self.recognizers[self.active_name]
+
+    def set_active(self, name):
+        """切换到指定引擎
+
+        Args:
+            name: 引擎名称
+        """
+        if name not in self.recognizers:
+            raise KeyError(f"未注册的识别引擎: {name}")
+        self.active_name = name
+
+    def cycle(self):
+        """按注册顺序切换到下一个引擎
+
+        Returns:
+            str: 切换后的引擎名称
+        """
+        index = self.order.index(self.active_name)
+        self.active_name = self.order[(index + 1) % len(self.order)]
+        return self.active_name
+
+    def get_stats(self):
+        """获取全部引擎的耗时统计
+
+        Returns:
+            list: 各引擎耗时统计摘要
+        """
+        return [self.recognizers[name].get_stats() for name in self.order]
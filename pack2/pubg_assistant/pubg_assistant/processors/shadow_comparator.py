@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+影子对比模块
+当前引擎给出结果后，由后台低优先级线程用另一引擎对同一截图打分，
+记录两者是否一致及各自耗时，不影响 detect_weapon 的响应时间
+"""
+
+import os
+import time
+import ctypes
+import threading
+from queue import Queue, Full
+
+from pubg_assistant.metrics.latency_histogram import LatencyHistogram
+
+class ShadowComparator:
+    """影子对比类，后台线程落后时直接丢弃新任务，不会积压"""
+
+    def __init__(self, registry, secondary_name):
+        """初始化影子对比器
+
+        Args:
+            registry: 识别引擎注册表
+            secondary_name: 影子引擎名称
+        """
+        self.registry = registry
+        self.secondary = registry.get(secondary_name)
+        self.tasks = Queue(maxsize=1)  # 只保留一个待处理任务，处理不过来就丢弃
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+        self.submitted = 0
+        self.dropped = 0
+        self.compared = 0
+        self.agreed = 0
+        self.disagreements = {}  # {(当前引擎结果, 影子引擎结果): 次数}
+        self.primary_latency = {}  # {引擎名称: LatencyHistogram}
+        self.secondary_latency = LatencyHistogram(secondary_name)
+
+    def start(self):
+        """启动后台对比线程"""
+        self.running = True
+        self.thread = threading.Thread(target=self._worker, name="ShadowComparator")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """停止后台对比线程"""
+        self.running = False
+        try:
+            self.tasks.put_nowait(None)
+        except Full:
+            pass
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def submit(self, roi, primary_name, primary_id, primary_seconds):
+        """提交一次对比任务，队列已满时丢弃
+
+        Args:
+            roi: 截图区域数组，入队时复制，调用方可以继续复用该缓冲区
+            primary_name: 当前引擎名称
+            primary_id: 当前引擎识别出的武器ID
+            primary_seconds: 当前引擎耗时（秒）
+        """
+        if not self.running or primary_name == self.secondary.name:
+            return
+        self.submitted += 1
+        if self.tasks.full():  # 先判断再复制，丢弃的任务不产生复制开销
+            self.dropped += 1
+            return
+        try:
+            self.tasks.put_nowait((roi.copy(), primary_name, primary_id, primary_seconds))
+        except Full:
+            self.dropped += 1
+
+    def _lower_priority(self):
+        """尽量降低当前线程的调度优先级"""
+        try:
+            if hasattr(ctypes, "WinDLL"):
+                kernel32 = ctypes.WinDLL("kernel32")
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), -2)  # THREAD_PRIORITY_LOWEST
+            elif hasattr(os, "setpriority"):
+                # Linux下可以对单个线程设置nice值
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except Exception:
+            pass
+
+    def _worker(self):
+        """后台对比线程主循环"""
+        self._lower_priority()
+        while self.running:
+            task = self.tasks.get()
+            if task is None:
+                break
+            roi, primary_name, primary_id, primary_seconds = task
+            start = time.perf_counter()
+            try:
+                secondary_id, _, _ = self.secondary.classify(roi)
+            except Exception as e:
+                print(f"影子引擎识别失败: {e}")
+                continue
+            self._record(primary_name, primary_id, primary_seconds,
+                         secondary_id, time.perf_counter() - start)
+
+    def _record(self, primary_name, primary_id, primary_seconds, secondary_id, secondary_seconds):
+        """记录一次对比结果
+
+        Args:
+            primary_name: 当前引擎名称
+            primary_id: 当前引擎结果
+            primary_seconds: 当前引擎耗时（秒）
+            secondary_id: 影子引擎结果
+            secondary_seconds: 影子引擎耗时（秒）
+        """
+        with self.lock:
+            self.compared += 1
+            if primary_id == secondary_id:
+                self.agreed += 1
+            else:
+                key = (primary_id, secondary_id)
+                self.disagreements[key] = self.disagreements.get(key, 0) + 1
+            histogram = self.primary_latency.get(primary_name)
+            if histogram is None:
+                histogram = self.primary_latency[primary_name] = LatencyHistogram(primary_name)
+        histogram.record_seconds(primary_seconds)
+        self.secondary_latency.record_seconds(secondary_seconds)
+
+    def get_stats(self):
+        """获取对比统计
+
+        Returns:
+            dict: 提交、丢弃、对比次数，一致率，不一致明细及两侧耗时
+        """
+        with self.lock:
+            disagreements = sorted(self.disagreements.items(), key=lambda item: item[1], reverse=True)
+            primary = [histogram.to_dict() for histogram in self.primary_latency.values()]
+            compared, agreed = self.compared, self.agreed
+        return {
+            "secondary": self.secondary.name,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "compared": compared,
+            "agreement": round(agreed / compared, 4) if compared else 0.0,
+            "disagreements": [f"{a}->{b}: {count}" for (a, b), count in disagreements[:10]],
+            "primary_latency": primary,
+            "secondary_latency": self.secondary_latency.to_dict(),
+        }
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模板金字塔模块
+从基准分辨率的模板库预先生成多个缩放级别，使同一套模板可用于任意分辨率
+"""
+
+import cv2 as cv
+
+class TemplatePyramid:
+    """模板金字塔类，启动时一次性生成各缩放级别的模板库"""
+    
+    DEFAULT_STEPS = (0.9, 0.95, 1.0, 1.05, 1.1)  # 相对中心比例的缩放步长，用于容忍界面缩放误差
+    
+    def __init__(self, base_bank, center_scale=1.0, steps=DEFAULT_STEPS):
+        """初始化模板金字塔
+        
+        Args:
+            base_bank: 基准模板库 {武器ID: 灰度模板图像}
+            center_scale: 中心缩放比例，通常为分辨率配置给出的模板缩放比例
+            steps: 相对中心比例的缩放步长
+        """
+        self.base_bank = base_bank
+        self.center_scale = center_scale
+        self.levels = {}
+        for step in steps:
+            scale = round(center_scale * step, 4)
+            self.levels[scale] = self._build_level(scale)
+    
+    def _build_level(self, scale):
+        """生成单个缩放级别的模板库
+        
+        Args:
+            scale: 缩放比例
+            
+        Returns:
+            dict: {武器ID: 缩放后的模板}
+        """
+        return {gun_id: self._scale_template(template, scale) for gun_id, template in self.base_bank.items()}
+    
+    @staticmethod
+    def _scale_template(template, scale):
+        """缩放单个模板
+        
+        Args:
+            template: 模板图像
+            scale: 缩放比例
+            
+        Returns:
+            ndarray: 缩放后的模板
+        """
+        if scale == 1.0:
+            return template
+        interpolation = cv.INTER_AREA if scale < 1.0 else cv.INTER_LINEAR
+        height, width = template.shape[:2]
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        return cv.resize(template, size, interpolation=interpolation)
+    
+    def update(self, base_bank, changed_ids):
+        """基准模板部分变化时只重新缩放变化的模板，各级别整体替换
+        
+        Args:
+            base_bank: 新的基准模板库
+            changed_ids: 新增或内容变化的武器ID
+        """
+        changed = set(changed_ids)
+        levels = {}
+        for scale, level in self.levels.items():
+            levels[scale] = {
+                gun_id: level[gun_id] if gun_id in level and gun_id not in changed
+                else self._scale_template(template, scale)
+                for gun_id, template in base_bank.items()
+            }
+        self.base_bank = base_bank
+        self.levels = levels
+    
+    def scales(self):
+        """获取全部缩放级别
+        
+        Returns:
+            list: 缩放比例，从小到大
+        """
+        return sorted(self.levels)
+    
+    def level(self, scale):
+        """获取最接近指定比例的模板库
+        
+        Args:
+            scale: 缩放比例
+            
+        Returns:
+            dict: {武器ID: 模板}
+        """
+        nearest = min(self.levels, key=lambda level_scale: abs(level_scale - scale))
+        return self.levels[nearest]
+    
+    def best_scale(self, gray):
+        """在截图中搜索各级别模板，返回匹配度最高的缩放比例
+        
+        Args:
+            gray: 灰度截图，需不小于模板尺寸
+            
+        Returns:
+            tuple: (缩放比例, 最高相关系数, 武器ID)
+        """
+        best = (self.center_scale, -1.0, "")
+        for scale, bank in self.levels.items():
+            for gun_id, template in bank.items():
+                if template.shape[0] > gray.shape[0] or template.shape[1] > gray.shape[1]:
+                    continue
+                result = cv.matchTemplate(gray, template, cv.TM_CCOEFF_NORMED)
+                _, max_val, _, _ = cv.minMaxLoc(result)
+                if max_val > best[1]:
+                    best = (scale, max_val, gun_id)
+        return best
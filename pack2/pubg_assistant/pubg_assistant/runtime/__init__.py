@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Runtime modules for PUBG Assistant
+"""
+
+# 运行时模块初始化文件
+
+from pubg_assistant import _lazy
+
+_LAZY_ATTRS = {
+    'AsyncRuntime': 'pubg_assistant.runtime.async_runtime',
+}
+
+__all__ = ['AsyncRuntime']
+
+_lazy.install(globals(), _LAZY_ATTRS)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步运行时模块
+用一个asyncio事件循环代替主循环轮询、姿势监控线程和输入消费者线程：
+监听线程通过 call_soon_threadsafe 把动作投递到事件循环，姿势检测改为周期任务，
+截图和识别等阻塞操作交给线程池执行，退出时统一取消全部任务
+"""
+
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from pubg_assistant.metrics.latency_histogram import LatencyHistogram
+
+class AsyncRuntime:
+    """异步运行时类，同时实现姿势监控器的 resume / pause 接口"""
+
+    def __init__(self, action_processor, input_manager, posture_interval=1.0, workers=2):
+        """初始化异步运行时
+
+        Args:
+            action_processor: 动作处理器
+            input_manager: 输入管理器，其监听线程产生的动作投递到事件循环
+            posture_interval: 姿势检测间隔（秒）
+            workers: 执行阻塞操作的线程数，动作和姿势检测各占一个
+        """
+        self.action_processor = action_processor
+        self.input_manager = input_manager
+        self.posture_interval = posture_interval
+        self.workers = workers
+
+        self.loop = None
+        self.actions = None  # asyncio.Queue，只在事件循环线程中访问
+        self.posture_active = None  # asyncio.Event，按下侧键期间置位
+        self.posture_paused = None  # asyncio.Event，与 posture_active 相反，用于提前结束等待
+        self.stopping = None  # asyncio.Event
+        self.executor = None
+
+        self.wakeup_latency = LatencyHistogram("async.wakeup")  # 监听线程投递到事件循环执行回调的延迟
+        self.posture_lateness = LatencyHistogram("async.posture_lateness")  # 周期任务实际唤醒比预期晚的时间
+        self.action_latency = LatencyHistogram("async.action")  # 单个动作在线程池中的处理耗时
+        self.dropped = 0
+
+    def run(self):
+        """运行事件循环，直到按F9退出或 stop 被调用"""
+        asyncio.run(self._main())
+
+    async def _main(self):
+        """事件循环主任务：启动子任务，等待退出信号后统一取消"""
+        self.loop = asyncio.get_running_loop()
+        self.actions = asyncio.Queue()
+        self.posture_active = asyncio.Event()
+        self.posture_paused = asyncio.Event()
+        self.posture_paused.set()
+        self.stopping = asyncio.Event()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="AsyncWorker")
+        self.input_manager.set_dispatcher(self.dispatch)
+        self.input_manager.set_posture_monitor(self)
+
+        tasks = [
+            asyncio.create_task(self._consume_actions(), name="actions"),
+            asyncio.create_task(self._posture_task(), name="posture"),
+        ]
+        try:
+            await self.stopping.wait()
+        finally:
+            self.input_manager.set_dispatcher(None)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._drop_pending()
+            self.executor.shutdown(wait=True)
+            self.loop = None
+
+    def dispatch(self, action, clear):
+        """动作调度函数，在监听线程中调用
+
+        Args:
+            action: 动作对象
+            clear: 是否丢弃尚未处理的动作
+        """
+        loop = self.loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, action, clear, time.perf_counter())
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    def _enqueue(self, action, clear, posted):
+        """在事件循环中放入动作
+
+        Args:
+            action: 动作对象
+            clear: 是否丢弃尚未处理的动作
+            posted: 投递时间
+        """
+        self.wakeup_latency.record_seconds(time.perf_counter() - posted)
+        if clear:
+            self._drop_pending()
+        if action.trace:
+            action.trace.mark("enqueued")
+        self.actions.put_nowait(action)
+
+    def _drop_pending(self):
+        """丢弃尚未处理的动作，被丢弃的追踪记为 dropped"""
+        while not self.actions.empty():
+            dropped = self.actions.get_nowait()
+            self.dropped += 1
+            self.input_manager.trace_collector.complete(dropped.trace, "dropped")
+
+    async def _consume_actions(self):
+        """依次处理动作，阻塞的识别和写配置在线程池中执行"""
+        while True:
+            action = await self.actions.get()
+            if action.trace:
+                action.trace.mark("dequeued")
+            start = time.perf_counter()
+            try:
+                # 鼠标侧键直接控制姿势检测，不经过动作队列，这里只有键盘动作
+                await self.loop.run_in_executor(
+                    self.executor, self.action_processor.handle_keyboard_action,
+                    action.get_param(), action.get_trace())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"处理动作失败: {e}")
+            self.action_latency.record_seconds(time.perf_counter() - start)
+            if self.action_processor.is_exit_requested():
+                self.stopping.set()
+
+    async def _posture_task(self):
+        """按下侧键期间周期检测姿势，代替姿势监控线程的 sleep 循环"""
+        while True:
+            await self.posture_active.wait()
+            expected = time.perf_counter()
+            while self.posture_active.is_set():
+                self.posture_lateness.record_seconds(max(0.0, time.perf_counter() - expected))
+                try:
+                    await self.loop.run_in_executor(self.executor, self.action_processor.check_posture)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"姿势检测失败: {e}")
+                expected = time.perf_counter() + self.posture_interval
+                try:
+                    # 侧键松开时提前结束等待
+                    await asyncio.wait_for(self.posture_paused.wait(), self.posture_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _call_in_loop(self, callback):
+        """从任意线程在事件循环中执行回调
+
+        Args:
+            callback: 无参数回调
+        """
+        loop = self.loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            pass
+
+    def _set_posture(self, active):
+        """在事件循环中切换姿势检测状态
+
+        Args:
+            active: 是否检测
+        """
+        if active:
+            self.posture_paused.clear()
+            self.posture_active.set()
+        else:
+            self.posture_active.clear()
+            self.posture_paused.set()
+
+    def resume(self):
+        """开始姿势检测（按下鼠标侧键X2）"""
+        self._call_in_loop(lambda: self._set_posture(True))
+
+    def pause(self):
+        """停止姿势检测（释放鼠标侧键X2）"""
+        self._call_in_loop(lambda: self._set_posture(False))
+
+    def stop(self):
+        """请求退出，可在任意线程调用"""
+        self._call_in_loop(lambda: self.stopping.set())
+
+    def get_stats(self):
+        """获取运行时统计
+
+        Returns:
+            dict: 唤醒延迟、姿势任务延迟、动作处理耗时及丢弃的动作数
+        """
+        return {
+            "wakeup": self.wakeup_latency.to_dict(),
+            "posture_lateness": self.posture_lateness.to_dict(),
+            "action": self.action_latency.to_dict(),
+            "dropped": self.dropped,
+        }
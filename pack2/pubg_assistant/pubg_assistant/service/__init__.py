@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Recognition service modules for PUBG Assistant
+"""
+
+# 识别服务模块初始化文件
+
+from pubg_assistant import _lazy
+
+_LAZY_ATTRS = {
+    'RecognitionServer': 'pubg_assistant.service.recognition_server',
+    'RecognitionClient': 'pubg_assistant.service.recognition_client',
+    'RemoteImageProcessor': 'pubg_assistant.service.recognition_client',
+}
+
+__all__ = ['RecognitionServer', 'RecognitionClient', 'RemoteImageProcessor']
+
+_lazy.install(globals(), _LAZY_ATTRS)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+识别服务协议模块
+请求和响应都是定长头部加变长正文的二进制帧：
+    请求头 <IBBHHI: 请求ID, 操作码, 通道数, 高, 宽, 正文长度；正文为uint8像素或JSON控制命令
+    响应头 <IBI:    请求ID, 状态码, 正文长度
+武器识别的响应正文: <Bh 是否识别成功, 最佳得分；<B 最佳ID长度 + ID；<H 得分个数 + 每项 (<B ID长度 + ID + <h 得分)
+"""
+
+import os
+import json
+import socket
+import struct
+import tempfile
+
+REQUEST_HEADER = struct.Struct("<IBBHHI")
+RESPONSE_HEADER = struct.Struct("<IBI")
+
+OP_WEAPON = 1  # 识别武器区域截图
+OP_POSTURE = 2  # 识别姿势：正文为上下拼接的两个姿势检测区域截图
+OP_CONTROL = 3  # 控制命令，正文为JSON
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "pubg_assistant.sock")
+DEFAULT_TCP_ADDRESS = ("127.0.0.1", 47615)
+
+def default_address():
+    """获取默认服务地址，支持Unix域套接字时使用套接字文件，否则（Windows）使用本机TCP端口
+
+    Returns:
+        str | tuple: 套接字文件路径或 (主机, 端口)
+    """
+    return DEFAULT_SOCKET_PATH if hasattr(socket, "AF_UNIX") else DEFAULT_TCP_ADDRESS
+
+def parse_address(text):
+    """解析命令行中的服务地址
+
+    Args:
+        text: "主机:端口" 或套接字文件路径，为空时使用默认地址
+
+    Returns:
+        str | tuple: 套接字文件路径或 (主机, 端口)
+    """
+    if not text:
+        return default_address()
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return text
+
+def address_family(address):
+    """根据地址选择套接字类型
+
+    Args:
+        address: 套接字文件路径或 (主机, 端口)
+
+    Returns:
+        int: 地址族
+    """
+    return socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+
+def recv_exact(sock, size):
+    """读取指定长度的数据
+
+    Args:
+        sock: 套接字
+        size: 字节数
+
+    Returns:
+        bytes: 数据，连接关闭时为None
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            return None
+        received += count
+    return buffer
+
+def pack_request(request_id, op, payload, shape=(0, 0, 0)):
+    """打包请求帧
+
+    Args:
+        request_id: 请求ID
+        op: 操作码
+        payload: 正文字节
+        shape: 像素正文的 (高, 宽, 通道数)
+
+    Returns:
+        bytes: 请求头，正文单独发送以避免复制像素
+    """
+    height, width, channels = shape
+    return REQUEST_HEADER.pack(request_id, op, channels, height, width, len(payload))
+
+def pack_weapon_result(matched, gun_id, score, scores):
+    """打包武器识别结果
+
+    Args:
+        matched: 是否识别成功
+        gun_id: 最佳武器ID
+        score: 最佳得分
+        scores: {武器ID: 得分}
+
+    Returns:
+        bytes: 响应正文
+    """
+    parts = [struct.pack("<Bh", 1 if matched else 0, score)]
+    encoded = gun_id.encode("utf-8")
+    parts.append(struct.pack("<B", len(encoded)) + encoded)
+    parts.append(struct.pack("<H", len(scores)))
+    for key, value in scores.items():
+        encoded = key.encode("utf-8")
+        parts.append(struct.pack("<B", len(encoded)) + encoded + struct.pack("<h", value))
+    return b"".join(parts)
+
+def unpack_weapon_result(body):
+    """解析武器识别结果
+
+    Args:
+        body: 响应正文
+
+    Returns:
+        tuple: (是否识别成功, 最佳武器ID, 最佳得分, {武器ID: 得分})
+    """
+    matched, score = struct.unpack_from("<Bh", body, 0)
+    offset = 3
+    length = body[offset]
+    gun_id = bytes(body[offset + 1:offset + 1 + length]).decode("utf-8")
+    offset += 1 + length
+    (count,) = struct.unpack_from("<H", body, offset)
+    offset += 2
+    scores = {}
+    for _ in range(count):
+        length = body[offset]
+        key = bytes(body[offset + 1:offset + 1 + length]).decode("utf-8")
+        offset += 1 + length
+        (scores[key],) = struct.unpack_from("<h", body, offset)
+        offset += 2
+    return bool(matched), gun_id, score, scores
+
+def pack_json(value):
+    """打包JSON正文
+
+    Args:
+        value: 可序列化的对象
+
+    Returns:
+        bytes: 正文
+    """
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+def unpack_json(body):
+    """解析JSON正文
+
+    Args:
+        body: 正文
+
+    Returns:
+        any: 解析结果
+    """
+    return json.loads(bytes(body).decode("utf-8"))
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+识别服务客户端模块
+RecognitionClient 负责与识别服务通信，RemoteImageProcessor 可以直接替换本地的 ImageProcessor，
+截图仍在本进程完成，模板库和打分都在服务进程中
+"""
+
+import socket
+import threading
+
+import numpy as np
+
+from pubg_assistant.processors.image_processor import ImageProcessor
+from pubg_assistant.processors.bank_optimizer import BankOptimizer
+from pubg_assistant.service import protocol
+
+class RecognitionClient:
+    """识别服务客户端类，线程安全，同一时间只有一组请求在途"""
+
+    def __init__(self, address=None, timeout=5.0):
+        """初始化客户端
+
+        Args:
+            address: 服务地址，为空时使用默认地址
+            timeout: 单次请求超时时间（秒）
+        """
+        self.address = address if address is not None else protocol.default_address()
+        self.timeout = timeout
+        self.sock = None
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    def _connect(self):
+        """建立连接（已连接时直接返回）
+
+        Returns:
+            socket.socket: 连接
+        """
+        if self.sock is None:
+            sock = socket.socket(protocol.address_family(self.address), socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+            self.sock = sock
+        return self.sock
+
+    def _call(self, op, payload, shape=(0, 0, 0)):
+        """发送一个请求并等待响应
+
+        Args:
+            op: 操作码
+            payload: 正文
+            shape: 像素正文的 (高, 宽, 通道数)
+
+        Returns:
+            bytearray: 响应正文
+        """
+        return self._call_many([(op, payload, shape)])[0]
+
+    def _call_many(self, requests):
+        """先连续发送全部请求再读取响应，服务端会把同时到达的请求合并为一批
+
+        服务端不保证同一连接上的响应顺序，按请求ID对应
+
+        Args:
+            requests: [(操作码, 正文, 像素正文的 (高, 宽, 通道数)), ...]
+
+        Returns:
+            list: 与请求顺序一致的响应正文
+        """
+        with self.lock:
+            request_ids = []
+            responses = {}
+            sock = self._connect()
+            try:
+                for op, payload, shape in requests:
+                    request_id = self.next_id
+                    self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+                    request_ids.append(request_id)
+                    sock.sendall(protocol.pack_request(request_id, op, payload, shape))
+                    sock.sendall(payload)
+                while len(responses) < len(request_ids):
+                    header = protocol.recv_exact(sock, protocol.RESPONSE_HEADER.size)
+                    if header is None:
+                        raise ConnectionError("识别服务已断开连接")
+                    response_id, status, length = protocol.RESPONSE_HEADER.unpack(header)
+                    body = protocol.recv_exact(sock, length) if length else bytearray()
+                    if body is None:
+                        raise ConnectionError("识别服务已断开连接")
+                    if response_id not in request_ids:
+                        raise ConnectionError(f"响应与请求不匹配: {response_id} 不在 {request_ids} 中")
+                    responses[response_id] = (status, body)
+            except (OSError, ConnectionError):
+                self.close_socket()
+                raise
+        bodies = []
+        for request_id in request_ids:
+            status, body = responses[request_id]
+            if status != protocol.STATUS_OK:
+                raise RuntimeError(bytes(body).decode("utf-8"))
+            bodies.append(body)
+        return bodies
+
+    def classify(self, roi):
+        """识别武器区域截图
+
+        Args:
+            roi: uint8截图数组，形状为 (高, 宽) 或 (高, 宽, 通道数)
+
+        Returns:
+            tuple: (是否识别成功, 最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        return self.classify_many([roi])[0]
+
+    def classify_many(self, rois):
+        """一次发送多张武器区域截图，服务端合并为一批打分
+
+        Args:
+            rois: uint8截图数组列表
+
+        Returns:
+            list: 每张截图的 (是否识别成功, 最佳武器ID, 最佳得分, {武器ID: 得分})
+        """
+        requests = []
+        for roi in rois:
+            roi = np.ascontiguousarray(roi, dtype=np.uint8)
+            height, width = roi.shape[:2]
+            channels = roi.shape[2] if len(roi.shape) > 2 else 1
+            requests.append((protocol.OP_WEAPON, memoryview(roi).cast("B"), (height, width, channels)))
+        return [protocol.unpack_weapon_result(body) for body in self._call_many(requests)]
+
+    def posture(self, area_1, area_2):
+        """根据两个姿势检测区域的截图识别姿势
+
+        Args:
+            area_1: 姿势检测区域1的RGB数组
+            area_2: 姿势检测区域2的RGB数组，尺寸与区域1相同
+
+        Returns:
+            int: 姿势 1为站立 99为蹲下
+        """
+        stacked = np.ascontiguousarray(np.concatenate([area_1, area_2]), dtype=np.uint8)
+        height, width, channels = stacked.shape
+        body = self._call(protocol.OP_POSTURE, memoryview(stacked).cast("B"), (height, width, channels))
+        return protocol.unpack_json(body)
+
+    def control(self, command):
+        """发送控制命令
+
+        Args:
+            command: 命令名称 name / cycle / stats / layout
+
+        Returns:
+            dict: 命令结果
+        """
+        return protocol.unpack_json(self._call(protocol.OP_CONTROL, protocol.pack_json({"cmd": command})))
+
+    def close_socket(self):
+        """关闭当前连接，下次请求时重新连接"""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def close(self):
+        """关闭客户端"""
+        with self.lock:
+            self.close_socket()
+
+class RemoteImageProcessor(ImageProcessor):
+    """使用识别服务的图像处理器，接口与 ImageProcessor 相同
+
+    截图、切枪等待和重试仍在本地执行，只有打分交给服务；识别区域使用服务端的校准结果
+    """
+
+    def __init__(self, resolution_config, client=None, stage_timer=None, frame_source=None):
+        """初始化远程图像处理器
+
+        Args:
+            resolution_config: 分辨率配置
+            client: 识别服务客户端，为空时连接默认地址
+            stage_timer: 阶段计时器，为空时使用全局计时器
+            frame_source: 帧来源，为空时实时截取屏幕
+        """
+        self.client = client if client else RecognitionClient()
+        super().__init__(resolution_config, stage_timer, frame_source)
+        layout = self.client.control("layout")
+        if (layout["width"], layout["height"]) != (resolution_config.width, resolution_config.height):
+            print(f"识别服务的分辨率 {layout['width']}x{layout['height']} 与本地不一致")
+        resolution_config.apply_calibration(layout)
+        self.recognizer_name = self.client.control("name")["name"]
+
+    def _initialize_gun_images(self):
+        """模板库由服务进程加载，本地不读取"""
+        pass
+
+    def classify_roi(self, roi):
+        """交给识别服务打分
+
+        Args:
+            roi: RGB截图数组
+
+        Returns:
+            tuple: (得分是否达到引擎的最低阈值, 最佳武器ID, {武器ID: 得分})
+        """
+        matched, gun_id, _, scores = self.client.classify(roi)
+        return matched, BankOptimizer.gun_id_of(gun_id), scores
+
+    def classify_rois(self, rois):
+        """连续发送全部截图后再读取结果，服务端把同时到达的请求合并为一批打分
+
+        Args:
+            rois: RGB截图数组列表，或形状为 (帧数, 高, 宽, 3) 的数组
+
+        Returns:
+            list: 每张截图的 (得分是否达到引擎的最低阈值, 最佳武器ID, {武器ID: 得分})
+        """
+        return [(matched, BankOptimizer.gun_id_of(gun_id), scores)
+                for matched, gun_id, _, scores in self.client.classify_many(rois)]
+
+    def cycle_recognizer(self):
+        """切换服务端的识别引擎
+
+        Returns:
+            str: 切换后的引擎名称
+        """
+        self.recognizer_name = self.client.control("cycle")["name"]
+        return self.recognizer_name
+
+    def get_recognizer_name(self):
+        """获取服务端当前使用的识别引擎名称
+
+        Returns:
+            str: 引擎名称
+        """
+        return self.recognizer_name
+
+    def get_engine_stats(self):
+        """获取服务端全部识别引擎的耗时统计
+
+        Returns:
+            list: 各引擎耗时统计摘要
+        """
+        return self.client.control("stats")["engines"]
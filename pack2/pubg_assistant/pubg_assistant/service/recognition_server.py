@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+识别服务模块
+只加载一次模板库，通过Unix域套接字（Windows下为本机TCP）接收截图，
+把短时间内并发到达的请求合并为一次批量打分，返回武器ID和得分
+
+用法:
+    python -m pubg_assistant.service.recognition_server [--address PATH|HOST:PORT] [--resolution 2560x1440]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+from queue import Queue, Empty
+
+import numpy as np
+
+from pubg_assistant.metrics.latency_histogram import LatencyHistogram
+from pubg_assistant.service import protocol
+
+class RecognitionServer:
+    """识别服务类，每个连接一个读取线程，由单个批处理线程统一打分"""
+
+    def __init__(self, image_processor, address=None, batch_window=0.002, max_batch=32):
+        """初始化识别服务
+
+        Args:
+            image_processor: 已加载模板库的图像处理器
+            address: 监听地址，为空时使用默认地址
+            batch_window: 收到第一个请求后等待更多请求合并的时间（秒）
+            max_batch: 单批最多请求数
+        """
+        self.image_processor = image_processor
+        self.address = address if address is not None else protocol.default_address()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.requests = Queue()
+        self.listener = None
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+        self.request_count = 0
+        self.batch_count = 0
+        self.max_batch_seen = 0
+        self.batch_latency = LatencyHistogram("service.batch")
+
+    def start(self):
+        """开始监听并启动批处理线程"""
+        family = protocol.address_family(self.address)
+        if family != socket.AF_INET and os.path.exists(self.address):
+            os.remove(self.address)  # 上次异常退出残留的套接字文件
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(self.address)
+        self.listener.listen(16)
+        for target, name in ((self._accept_loop, "ServiceAccept"), (self._batch_loop, "ServiceBatch")):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        print(f"识别服务已启动: {self.address}")
+
+    def stop(self):
+        """停止服务并关闭全部连接"""
+        self.stop_event.set()
+        self.requests.put(None)
+        if self.listener:
+            try:
+                self.listener.close()
+            except OSError:
+                pass
+        with self.lock:
+            connections = list(self.connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+                conn.close()
+            except OSError:
+                pass
+        for thread in self.threads:
+            thread.join(timeout=2)
+        self.threads = []
+        if protocol.address_family(self.address) != socket.AF_INET and os.path.exists(self.address):
+            os.remove(self.address)
+
+    def serve_forever(self):
+        """启动服务并阻塞到 stop 被调用或收到Ctrl+C"""
+        self.start()
+        try:
+            while not self.stop_event.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            print("正在停止识别服务...")
+        finally:
+            self.stop()
+
+    def _accept_loop(self):
+        """接受连接的线程主循环"""
+        while not self.stop_event.is_set():
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                break
+            with self.lock:
+                self.connections.add(conn)
+            thread = threading.Thread(target=self._handle_connection, args=(conn,), name="ServiceConnection")
+            thread.daemon = True
+            thread.start()
+
+    def _handle_connection(self, conn):
+        """读取单个连接的请求，识别请求交给批处理线程，控制命令直接处理
+
+        Args:
+            conn: 客户端连接
+        """
+        send_lock = threading.Lock()  # 批处理线程和本线程都会向该连接写响应
+        try:
+            while not self.stop_event.is_set():
+                header = protocol.recv_exact(conn, protocol.REQUEST_HEADER.size)
+                if header is None:
+                    break
+                request_id, op, channels, height, width, length = protocol.REQUEST_HEADER.unpack(header)
+                body = protocol.recv_exact(conn, length) if length else b""
+                if body is None:
+                    break
+                if op == protocol.OP_CONTROL:
+                    self._respond_control(conn, send_lock, request_id, body)
+                    continue
+                reason = self._check_request(op, channels, height, width, length)
+                if reason:
+                    self._send(conn, send_lock, request_id, protocol.STATUS_ERROR, reason.encode("utf-8"))
+                    continue
+                shape = (height, width, channels) if channels > 1 else (height, width)
+                roi = np.frombuffer(body, dtype=np.uint8).reshape(shape)
+                self.requests.put((conn, send_lock, request_id, op, roi))
+        except (OSError, ValueError) as e:
+            print(f"识别服务连接异常: {e}")
+        finally:
+            with self.lock:
+                self.connections.discard(conn)
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _check_request(op, channels, height, width, length):
+        """在交给批处理线程之前检查截图请求，格式错误的请求不能进入批次
+
+        Args:
+            op: 操作码
+            channels: 通道数
+            height: 截图高度
+            width: 截图宽度
+            length: 正文长度
+
+        Returns:
+            str: 错误原因，请求有效时为空字符串
+        """
+        if op not in (protocol.OP_WEAPON, protocol.OP_POSTURE):
+            return f"未知的操作码: {op}"
+        if channels not in (1, 3, 4):
+            return f"不支持的通道数: {channels}"
+        if length != height * width * channels:
+            return f"正文长度 {length} 与截图尺寸 {height}x{width}x{channels} 不符"
+        if op == protocol.OP_WEAPON and (height == 0 or width == 0):
+            return "武器区域截图为空"
+        # 姿势检测读取上下两个区域各自的 (3, 3) 像素
+        if op == protocol.OP_POSTURE and (height < 8 or width < 4 or channels < 3):
+            return f"姿势检测截图至少需要 8x4 的RGB像素，收到 {height}x{width}x{channels}"
+        return ""
+
+    def _batch_loop(self):
+        """批处理线程主循环：收到第一个请求后在时间窗口内继续收集，合并打分"""
+        while not self.stop_event.is_set():
+            first = self.requests.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except Empty:
+                    break
+                if item is None:
+                    self.stop_event.set()
+                    break
+                batch.append(item)
+            # 单个批次出错只让该批次中尚未响应的请求失败，批处理线程继续运行
+            answered = set()
+            try:
+                self._process_batch(batch, answered)
+            except Exception as e:
+                print(f"处理识别请求失败: {e}")
+                for index, (conn, send_lock, request_id, _, _) in enumerate(batch):
+                    if index not in answered:
+                        self._send(conn, send_lock, request_id, protocol.STATUS_ERROR, str(e).encode("utf-8"))
+
+    def _process_batch(self, batch, answered=None):
+        """对一批请求打分并逐个返回结果
+
+        Args:
+            batch: [(连接, 发送锁, 请求ID, 操作码, 截图), ...]
+            answered: 记录已发送响应的请求在批次中的下标，出错时只给其余请求返回错误
+        """
+        if answered is None:
+            answered = set()
+        start = time.perf_counter()
+        weapons = [index for index, item in enumerate(batch) if item[3] == protocol.OP_WEAPON]
+        if weapons:
+            recognizer = self.image_processor.recognizers.active
+            try:
+                results = recognizer.classify_batch([batch[index][4] for index in weapons])
+            except Exception as e:
+                print(f"批量识别失败: {e}")
+                for index in weapons:
+                    conn, send_lock, request_id, _, _ = batch[index]
+                    self._send(conn, send_lock, request_id, protocol.STATUS_ERROR, str(e).encode("utf-8"))
+                    answered.add(index)
+                results = []
+            for index, (gun_id, score, scores) in zip(weapons, results):
+                conn, send_lock, request_id, _, _ = batch[index]
+                body = protocol.pack_weapon_result(score >= recognizer.min_score, gun_id, score, scores)
+                self._send(conn, send_lock, request_id, protocol.STATUS_OK, body)
+                answered.add(index)
+
+        for index, (conn, send_lock, request_id, op, roi) in enumerate(batch):
+            if op == protocol.OP_POSTURE:
+                half = roi.shape[0] // 2
+                standing = self.image_processor.is_white(roi[3, 3]) and self.image_processor.is_white(roi[half + 3, 3])
+                self._send(conn, send_lock, request_id, protocol.STATUS_OK, protocol.pack_json(1 if standing else 99))
+                answered.add(index)
+
+        with self.lock:
+            self.request_count += len(batch)
+            self.batch_count += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.batch_latency.record_seconds(time.perf_counter() - start)
+
+    def _respond_control(self, conn, send_lock, request_id, body):
+        """处理控制命令
+
+        Args:
+            conn: 客户端连接
+            send_lock: 该连接的发送锁
+            request_id: 请求ID
+            body: JSON命令 {"cmd": "name" | "cycle" | "stats" | "layout"}
+        """
+        image_processor = self.image_processor
+        try:
+            command = protocol.unpack_json(body).get("cmd")
+            if command == "name":
+                result = {"name": image_processor.get_recognizer_name()}
+            elif command == "cycle":
+                result = {"name": image_processor.cycle_recognizer()}
+            elif command == "stats":
+                result = {"engines": image_processor.get_engine_stats(), "service": self.get_stats()}
+            elif command == "layout":
+                resolution_config = image_processor.resolution_config
+                result = {
+                    "width": resolution_config.width,
+                    "height": resolution_config.height,
+                    "weapon_area": resolution_config.get_weapon_area(1),
+                    "weapon_area_2": resolution_config.get_weapon_area(2),
+                }
+            else:
+                raise ValueError(f"未知的控制命令: {command}")
+        except Exception as e:
+            self._send(conn, send_lock, request_id, protocol.STATUS_ERROR, str(e).encode("utf-8"))
+            return
+        self._send(conn, send_lock, request_id, protocol.STATUS_OK, protocol.pack_json(result))
+
+    def _send(self, conn, send_lock, request_id, status, body):
+        """发送响应，连接已断开时忽略
+
+        Args:
+            conn: 客户端连接
+            send_lock: 该连接的发送锁
+            request_id: 请求ID
+            status: 状态码
+            body: 响应正文
+        """
+        try:
+            with send_lock:
+                conn.sendall(protocol.RESPONSE_HEADER.pack(request_id, status, len(body)) + body)
+        except OSError:
+            pass
+
+    def get_stats(self):
+        """获取服务统计
+
+        Returns:
+            dict: 请求数、批次数、平均和最大批大小及批处理耗时
+        """
+        with self.lock:
+            return {
+                "requests": self.request_count,
+                "batches": self.batch_count,
+                "avg_batch": round(self.request_count / self.batch_count, 2) if self.batch_count else 0.0,
+                "max_batch": self.max_batch_seen,
+                "connections": len(self.connections),
+                "batch_latency": self.batch_latency.to_dict(),
+            }
+
+def main(argv=None):
+    """命令行入口
+
+    Args:
+        argv: 命令行参数
+
+    Returns:
+        int: 退出码
+    """
+    from pubg_assistant.config.resolution_config import ResolutionConfig
+    from pubg_assistant.config.roi_calibration import RoiCalibrator
+    from pubg_assistant.processors.image_processor import ImageProcessor
+
+    parser = argparse.ArgumentParser(description="PUBG Assistant 识别服务")
+    parser.add_argument("--address", default=None, help="监听地址：套接字文件路径或 HOST:PORT")
+    parser.add_argument("--resolution", default=None, help="游戏分辨率，如 2560x1440；为空时使用主显示器的分辨率")
+    parser.add_argument("--engine", default=None, help="使用的识别引擎（orb / template / cascade）")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0, help="合并并发请求的时间窗口（毫秒）")
+    parser.add_argument("--optimize-bank", action="store_true", help="裁剪模板到有效像素范围并合并几乎相同的模板")
+    args = parser.parse_args(argv)
+
+    if args.resolution:
+        width, height = (int(value) for value in args.resolution.lower().split("x"))
+        resolution_config = ResolutionConfig(width, height)
+    else:
+        resolution_config = ResolutionConfig.from_screen()
+    image_processor = ImageProcessor(resolution_config)
+    calibrator = RoiCalibrator(resolution_config, image_processor)
+    calibration = calibrator.load()
+    if calibration:
+        calibrator.apply(calibration)
+    if args.optimize_bank:
+        image_processor.optimize_bank()
+    if args.engine:
+        image_processor.recognizers.set_active(args.engine)
+
+    server = RecognitionServer(image_processor, protocol.parse_address(args.address),
+                               batch_window=args.batch_window_ms / 1000)
+    server.serve_forever()
+    print(f"识别服务统计: {server.get_stats()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())